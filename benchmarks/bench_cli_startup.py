@@ -0,0 +1,70 @@
+"""CLI startup time, and a check that no GUI/imaging module gets imported.
+
+    python benchmarks/bench_cli_startup.py --ulang 10
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "cli.py")
+BATAS_MS = 100
+MODUL_TERLARANG = ("tkinter", "PIL", "numpy")
+
+
+def waktu_terbaik(argumen, ulang):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        subprocess.run([sys.executable, CLI] + argumen, capture_output=True, check=True)
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik * 1000
+
+
+def modul_dimuat(argumen):
+    """Names of the modules loaded by one CLI call (run in a fresh interpreter)."""
+    kode = ("import runpy, sys\n"
+            f"sys.argv = [{CLI!r}] + {argumen!r}\n"
+            "try:\n"
+            f"    runpy.run_path({CLI!r}, run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(' '.join(sys.modules))")
+    keluaran = subprocess.run([sys.executable, "-c", kode], capture_output=True, text=True, cwd=ROOT).stdout
+    return set(keluaran.splitlines()[-1].split()) if keluaran else set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ulang", type=int, default=10)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench_cli_")
+    try:
+        for i in range(100):
+            with open(os.path.join(folder, f"IMG_{i:04d}.jpg"), "wb") as f:
+                f.write(b"\xff\xd8\xff")
+        subprocess.run([sys.executable, CLI, "import", folder], capture_output=True, check=True)
+
+        mulai = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        print(f"bare interpreter:  {(time.perf_counter() - mulai) * 1000:6.1f} ms")
+
+        gagal = False
+        for argumen in (["--help"], ["stats", folder], ["tag", folder, "--pattern", "IMG_00*", "Bench"]):
+            ms = waktu_terbaik(argumen, args.ulang)
+            terlarang = sorted(m for m in modul_dimuat(argumen) if m.split(".")[0] in MODUL_TERLARANG)
+            status = "ok" if ms < BATAS_MS and not terlarang else "GAGAL"
+            gagal = gagal or status != "ok"
+            print(f"cli.py {argumen[0]:<8} {ms:6.1f} ms  {status}" + (f" (imports {', '.join(terlarang)})" if terlarang else ""))
+    finally:
+        shutil.rmtree(folder)
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Near-duplicate detection: hashing throughput and multi-index clustering vs all-pairs.
+
+    python benchmarks/bench_duplikat.py --hash 100000 --gambar 500 --proses 8
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duplikat import AMBANG_MIRIP, AnalisisDuplikat, kelompok_mirip, popcount
+
+
+def buat_hash(jumlah, jumlah_kembar, seed=1):
+    """Random 64-bit hashes, with jumlah_kembar of them given a copy a few bits away."""
+    acak = random.Random(seed)
+    hashes = [acak.getrandbits(64) for _ in range(jumlah)]
+    for i in acak.sample(range(jumlah - 1), jumlah_kembar):
+        hashes[i + 1] = hashes[i]
+        for bit in acak.sample(range(64), acak.randint(0, AMBANG_MIRIP)):
+            hashes[i + 1] ^= 1 << bit
+    return hashes
+
+
+def pasangan_semua(hashes, ambang, blok=1000):
+    """The O(N^2) reference: number of pairs within ambang bits."""
+    nilai = np.array(hashes, dtype=np.uint64)
+    jumlah = 0
+    for mulai in range(0, len(nilai), blok):
+        jarak = popcount(nilai[mulai:mulai + blok, None] ^ nilai[None, :])
+        jumlah += int((jarak <= ambang).sum())
+    return (jumlah - len(nilai)) // 2
+
+
+def buat_gambar(folder, jumlah, ukuran=(1600, 1200), seed=1):
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(jumlah):
+        kasar = rng.integers(0, 255, (12, 16, 3), dtype=np.uint8)
+        img = Image.fromarray(kasar).resize(ukuran, Image.BICUBIC)
+        path = os.path.join(folder, f"IMG_{i:05d}.jpg")
+        img.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hash", type=int, default=100_000, help="hashes to cluster")
+    parser.add_argument("--kembar", type=int, default=2000, help="injected near-duplicate pairs")
+    parser.add_argument("--semua-pasangan", type=int, default=20_000,
+                        help="all-pairs reference is run on this many hashes (it is quadratic)")
+    parser.add_argument("--gambar", type=int, default=200, help="synthetic JPEGs to hash (0 to skip)")
+    parser.add_argument("--proses", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    hashes = buat_hash(args.hash, args.kembar)
+    mulai = time.perf_counter()
+    kelompok = kelompok_mirip(hashes, AMBANG_MIRIP)
+    t_mih = time.perf_counter() - mulai
+    print(f"multi-index clustering: {args.hash} hashes -> {len(kelompok)} clusters in {t_mih:.2f}s")
+
+    n = min(args.semua_pasangan, args.hash)
+    mulai = time.perf_counter()
+    pasangan_semua(hashes[:n], AMBANG_MIRIP)
+    t_semua = time.perf_counter() - mulai
+    perkiraan = t_semua * (args.hash / n) ** 2
+    print(f"all-pairs (vectorized):  {n} hashes in {t_semua:.2f}s, ~{perkiraan:.0f}s extrapolated to {args.hash}")
+
+    if args.gambar:
+        folder = tempfile.mkdtemp(prefix="bench_duplikat_")
+        try:
+            paths = buat_gambar(folder, args.gambar)
+            mulai = time.perf_counter()
+            job = AnalisisDuplikat(paths, jumlah_proses=args.proses).mulai()
+            while not job.selesai:
+                time.sleep(0.05)
+            durasi = time.perf_counter() - mulai
+            print(f"hashing: {args.gambar} JPEGs (1600x1200) with {args.proses} processes "
+                  f"in {durasi:.2f}s = {args.gambar / durasi:.0f} photos/s")
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
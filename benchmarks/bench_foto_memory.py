@@ -0,0 +1,79 @@
+"""Bytes per photo: the original dict-based Foto vs the compact slotted Foto.
+
+    python benchmarks/bench_foto_memory.py --foto 200000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from koleksi import Foto
+
+
+class FotoDict:
+    """The Foto layout before compaction: __dict__, two path strings, a tag list."""
+    def __init__(self, nama_file, path_lengkap, tags=[]):
+        self.nama_file = nama_file
+        self.path_lengkap = path_lengkap
+        self.tags = list(tags)
+
+    def tambah_tag(self, tag_baru):
+        tag_baru = tag_baru.strip().capitalize()
+        if tag_baru and tag_baru not in self.tags:
+            self.tags.append(tag_baru)
+            self.tags.sort()
+            return True
+        return False
+
+
+def data_sintetis(jumlah_foto, jumlah_folder, jumlah_tag, tag_per_foto, seed=1):
+    """(nama_file, path_lengkap, tags) with paths built the way the importer builds them."""
+    acak = random.Random(seed)
+    semua_tag = [f"tag {i:02d}" for i in range(jumlah_tag)]
+    folder = [f"/mnt/nas/arsip/2024/event_{i:04d}" for i in range(jumlah_folder)]
+    for i in range(jumlah_foto):
+        nama = f"IMG_{i:07d}.JPG"
+        yield nama, os.path.join(folder[i % jumlah_folder], nama), acak.sample(semua_tag, tag_per_foto)
+
+
+def ukur_byte_per_foto(kelas, args):
+    gc.collect()
+    tracemalloc.start()
+    sebelum = tracemalloc.get_traced_memory()[0]
+
+    # Strings are created inside the traced window, as they are during a real import,
+    # so whatever each layout keeps alive is counted.
+    daftar = []
+    for nama, path, tags in data_sintetis(args.foto, args.folder, args.tag, args.tag_per_foto):
+        foto = kelas(nama, path)
+        for tag in tags:
+            foto.tambah_tag(tag)
+        daftar.append(foto)
+
+    gc.collect()
+    sesudah = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (sesudah - sebelum) / args.foto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foto", type=int, default=200_000)
+    parser.add_argument("--folder", type=int, default=500)
+    parser.add_argument("--tag", type=int, default=50)
+    parser.add_argument("--tag-per-foto", type=int, default=3)
+    args = parser.parse_args()
+
+    lama = ukur_byte_per_foto(FotoDict, args)
+    baru = ukur_byte_per_foto(Foto, args)
+    print(f"{args.foto} photos, {args.folder} folders, {args.tag_per_foto} of {args.tag} tags each")
+    print(f"  dict Foto    : {lama:7.1f} bytes/photo")
+    print(f"  slotted Foto : {baru:7.1f} bytes/photo  ({lama / baru:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
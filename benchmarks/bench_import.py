@@ -0,0 +1,66 @@
+"""Import scan throughput (files/sec) on a synthetic nested photo archive.
+
+    python benchmarks/bench_import.py --jumlah 100000 --worker 1 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from importer import pindai_folder
+
+KEPALA_JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+
+
+def buat_pohon_sintetis(root, jumlah, file_per_folder=100, folder_per_level=10, rasio_sampah=0.05):
+    """Creates jumlah files nested as <tahun>/<event>/<file>, a few of them non-images named .jpg."""
+    dibuat = 0
+    nomor_folder = 0
+    while dibuat < jumlah:
+        tahun = f"{2000 + nomor_folder // folder_per_level}"
+        event = f"event_{nomor_folder % folder_per_level:03d}"
+        folder = os.path.join(root, tahun, event)
+        os.makedirs(folder, exist_ok=True)
+
+        for i in range(min(file_per_folder, jumlah - dibuat)):
+            sampah = (dibuat % int(1 / rasio_sampah)) == 0 if rasio_sampah else False
+            with open(os.path.join(folder, f"IMG_{dibuat:06d}.jpg"), "wb") as f:
+                f.write(b"not an image" if sampah else KEPALA_JPEG)
+            dibuat += 1
+        nomor_folder += 1
+
+
+def ukur(root, **opsi):
+    mulai = time.perf_counter()
+    jumlah = sum(len(batch) for batch in pindai_folder(root, kedalaman_maks=None, **opsi))
+    durasi = time.perf_counter() - mulai
+    return jumlah, durasi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jumlah", type=int, default=100_000, help="number of synthetic files")
+    parser.add_argument("--worker", type=int, nargs="+", default=[1, 8], help="thread pool sizes to compare")
+    parser.add_argument("--folder", help="reuse an existing tree instead of generating one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_import_") as tmp:
+        root = args.folder
+        if root is None:
+            root = tmp
+            mulai = time.perf_counter()
+            buat_pohon_sintetis(root, args.jumlah)
+            print(f"generated {args.jumlah} files in {time.perf_counter() - mulai:.1f}s")
+
+        for worker in args.worker:
+            for cek_magic in (False, True):
+                jumlah, durasi = ukur(root, jumlah_worker=worker, cek_magic=cek_magic)
+                print(f"workers={worker:<3} magic={str(cek_magic):<5} "
+                      f"files={jumlah:<7} {durasi:6.2f}s  {jumlah / durasi:10.0f} files/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""EXIF metadata: header-only reads vs a full decode, and the stat-keyed cache.
+
+    python benchmarks/bench_metadata.py --gambar 300
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_duplikat import buat_gambar
+from koleksi import Foto
+from metadata import PembacaMetadata, baca_metadata
+
+
+def baca_semua(daftar_foto, cache):
+    pembaca = PembacaMetadata(cache)
+    pembaca.minta(daftar_foto)
+    hasil = []
+    while pembaca.sibuk:
+        hasil += pembaca.ambil_hasil()
+        time.sleep(0.001)
+    pembaca.tutup()
+    return hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gambar", type=int, default=300, help="synthetic JPEGs (4000x3000)")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench_metadata_")
+    try:
+        paths = buat_gambar(folder, args.gambar, ukuran=(4000, 3000))
+
+        mulai = time.perf_counter()
+        for path in paths:
+            with Image.open(path) as img:
+                img.load()
+        t_penuh = time.perf_counter() - mulai
+        print(f"full decode:        {args.gambar / t_penuh:8.0f} files/s")
+
+        mulai = time.perf_counter()
+        for path in paths:
+            baca_metadata(path)
+        t_header = time.perf_counter() - mulai
+        print(f"header only:        {args.gambar / t_header:8.0f} files/s ({t_penuh / t_header:.0f}x)")
+
+        daftar_foto = [Foto(os.path.basename(path), path) for path in paths]
+        mulai = time.perf_counter()
+        hasil = baca_semua(daftar_foto, {})
+        t_pool = time.perf_counter() - mulai
+        print(f"header, thread pool: {args.gambar / t_pool:7.0f} files/s")
+
+        cache = {foto.path_lengkap: (kunci, meta) for foto, meta, kunci in hasil}
+        mulai = time.perf_counter()
+        baca_semua(daftar_foto, cache)
+        t_cache = time.perf_counter() - mulai
+        print(f"cached (stat only): {args.gambar / t_cache:8.0f} files/s")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Sharpness/exposure scoring: reduced-resolution decode vs full decode, and pool throughput.
+
+    python benchmarks/bench_skor.py --gambar 300 --proses 8
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import skor
+from bench_duplikat import buat_gambar
+
+
+def skor_resolusi_penuh(path):
+    """Same measures on the full-size decode, as a naive implementation would do."""
+    with Image.open(path) as img:
+        piksel = np.asarray(img.convert("L"), dtype=np.float32)
+    laplacian = (piksel[1:-1, :-2] + piksel[1:-1, 2:] + piksel[:-2, 1:-1] + piksel[2:, 1:-1]
+                 - 4 * piksel[1:-1, 1:-1])
+    return float(laplacian.var()), float(piksel.mean() / 255)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gambar", type=int, default=200)
+    parser.add_argument("--ukuran", type=int, nargs=2, default=(4000, 3000), metavar=("LEBAR", "TINGGI"))
+    parser.add_argument("--proses", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench_skor_")
+    try:
+        paths = buat_gambar(folder, args.gambar, tuple(args.ukuran))
+        contoh = paths[:min(20, len(paths))]
+
+        for nama, fungsi in (("full decode", skor_resolusi_penuh), ("reduced decode", skor.skor_gambar)):
+            mulai = time.perf_counter()
+            for path in contoh:
+                fungsi(path)
+            per_foto = (time.perf_counter() - mulai) / len(contoh)
+            print(f"{nama:<16} {per_foto * 1000:8.1f} ms/photo (single process)")
+
+        mulai = time.perf_counter()
+        job = skor.PenilaianFoto(paths, jumlah_proses=args.proses).mulai()
+        while not job.selesai:
+            time.sleep(0.05)
+        durasi = time.perf_counter() - mulai
+        print(f"pool: {args.gambar} photos ({args.ukuran[0]}x{args.ukuran[1]}) with {args.proses} processes "
+              f"in {durasi:.2f}s = {args.gambar / durasi:.0f} photos/s")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
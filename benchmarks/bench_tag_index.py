@@ -0,0 +1,96 @@
+"""Tag operations: linear scans over koleksi_foto vs the KoleksiFoto tag index.
+
+    python benchmarks/bench_tag_index.py --foto 100000 --tag 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from koleksi import Foto, KoleksiFoto
+
+
+def buat_foto(jumlah_foto, jumlah_tag, tag_per_foto, seed=1):
+    acak = random.Random(seed)
+    semua_tag = [f"Tag{i:02d}" for i in range(jumlah_tag)]
+    return [Foto(f"IMG_{i:06d}.jpg", f"/foto/IMG_{i:06d}.jpg", acak.sample(semua_tag, tag_per_foto))
+            for i in range(jumlah_foto)], semua_tag
+
+
+def ukur(fungsi, ulang):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        fungsi()
+    return (time.perf_counter() - mulai) / ulang
+
+
+# --- The scans PhotoApp used before the index existed ---
+
+def scan_tag_unik(daftar_foto):
+    tag_unik = set()
+    for foto in daftar_foto:
+        for tag in foto.tags:
+            tag_unik.add(tag)
+    return tag_unik
+
+
+def scan_pilih_ekspor(daftar_foto, tag):
+    return [foto for foto in daftar_foto if tag in foto.tags]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foto", type=int, default=100_000)
+    parser.add_argument("--tag", type=int, default=50)
+    parser.add_argument("--tag-per-foto", type=int, default=3)
+    parser.add_argument("--ulang", type=int, default=5)
+    args = parser.parse_args()
+
+    daftar_foto, semua_tag = buat_foto(args.foto, args.tag, args.tag_per_foto)
+    mulai = time.perf_counter()
+    koleksi = KoleksiFoto(daftar_foto)
+    print(f"{args.foto} photos x {args.tag} tags, index built in {time.perf_counter() - mulai:.3f}s\n")
+
+    tag = semua_tag[0]
+    foto = daftar_foto[len(daftar_foto) // 2]
+    tag_lain = next(t for t in semua_tag if t not in foto.tags)
+
+    def hapus_lalu_hitung_ulang_scan():
+        foto.tambah_tag(tag_lain)
+        foto.hapus_tag(tag_lain)
+        scan_tag_unik(daftar_foto)
+
+    def hapus_lalu_hitung_ulang_indeks():
+        koleksi.tambah_tag(foto, tag_lain)
+        koleksi.hapus_tag(foto, tag_lain)
+        koleksi.tag_unik
+
+    kasus = [
+        ("remove tag + unique set", hapus_lalu_hitung_ulang_scan, hapus_lalu_hitung_ulang_indeks),
+        ("select photos for export", lambda: scan_pilih_ekspor(daftar_foto, tag), lambda: koleksi.foto_dengan_tag(tag)),
+        ("count photos with tag", lambda: len(scan_pilih_ekspor(daftar_foto, tag)), lambda: koleksi.jumlah_tag(tag)),
+    ]
+
+    print(f"{'operation':<28}{'scan':>12}{'index':>12}{'speedup':>10}")
+    for nama, dengan_scan, dengan_indeks in kasus:
+        t_scan = ukur(dengan_scan, args.ulang)
+        t_indeks = ukur(dengan_indeks, args.ulang)
+        print(f"{nama:<28}{t_scan * 1000:10.2f}ms{t_indeks * 1000:10.3f}ms{t_scan / t_indeks:9.0f}x")
+
+    # Removing a criteria tag from every photo mutates the data, so time it once each way.
+    salinan = [Foto(f.nama_file, f.path_lengkap, f.tags) for f in daftar_foto]
+    mulai = time.perf_counter()
+    for f in salinan:
+        f.hapus_tag(tag)
+    t_scan = time.perf_counter() - mulai
+    mulai = time.perf_counter()
+    koleksi.hapus_tag_dari_semua(tag)
+    t_indeks = time.perf_counter() - mulai
+    print(f"{'remove tag from all photos':<28}{t_scan * 1000:10.2f}ms{t_indeks * 1000:10.3f}ms{t_scan / t_indeks:9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Soak test of the preview pipeline: memory and open files must stay flat while navigating.
+
+    python benchmarks/soak_preview.py --jumlah 10000
+    python benchmarks/soak_preview.py --jumlah 2000 --format tif --ukuran 8000x6000
+
+A few images per (format, size) are rendered and hard-linked under many names, so
+every step is a real decode while the folder stays small on disk. GIFs have several
+frames; "tif16" is a 16-bit greyscale TIFF (mode I;16). Navigation goes through PreviewPrefetcher and a bounded PreviewCache as in
+the app, mostly forward with an occasional step back. RSS and open file descriptors
+are sampled as it goes; once the warm-up is over (the cache is full) neither may grow
+beyond the tolerance. With a display, every frame is also put on a label through
+gambar_tk.GambarTk and the number of live Tk images is checked. Exits 1 on failure.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from itertools import zip_longest
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preview import KUALITAS_TINGGI, PreviewCache, PreviewPrefetcher
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+VARIAN_PER_GRUP = 3
+FRAME_GIF = 4
+UKURAN_PRATINJAU = (1000, 700)
+# File extension of formats whose name is not one.
+EKSTENSI = {"tif16": "tif"}
+
+
+def rss_byte():
+    """Current RSS; where there is no /proc, the peak RSS (which must stay flat too)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        if resource is None:
+            return None
+        maks = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maks if sys.platform == "darwin" else maks * 1024
+
+
+def jumlah_fd():
+    for folder in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(folder))
+        except OSError:
+            pass
+    return None
+
+
+def buat_folder(root, jumlah, daftar_format, daftar_ukuran, seed=1):
+    """Returns jumlah paths spread over every (format, size) group, in navigation order.
+
+    The groups are interleaved, so the warm-up already meets every format and size.
+    """
+    rng = np.random.default_rng(seed)
+    grup_grup = [(fmt, ukuran) for fmt in daftar_format for ukuran in daftar_ukuran]
+    per_grup = max(1, jumlah // len(grup_grup))
+    os.makedirs(root)
+    per_format = []
+
+    for fmt, (lebar, tinggi) in grup_grup:
+        varian = []
+        for v in range(VARIAN_PER_GRUP):
+            kasar = rng.integers(0, 255, (tinggi // 100 + 2, lebar // 100 + 2, 3), dtype=np.uint8)
+            img = Image.fromarray(kasar).resize((lebar, tinggi), Image.BICUBIC)
+            path = os.path.join(root, f"_varian_{fmt}_{lebar}x{tinggi}_{v}.{EKSTENSI.get(fmt, fmt)}")
+            if fmt == "tif16":
+                abu = np.asarray(img.convert("L"), dtype=np.uint16) * 257
+                Image.fromarray(abu).save(path)
+            elif fmt == "gif":
+                frame = [img.rotate(90 * i, expand=False).convert("P", palette=Image.ADAPTIVE) for i in range(FRAME_GIF)]
+                frame[0].save(path, save_all=True, append_images=frame[1:], duration=100)
+            else:
+                img.save(path, **({"quality": 90} if fmt == "jpg" else {}))
+            varian.append(path)
+
+        paths = []
+        for i in range(per_grup):
+            path = os.path.join(root, f"{fmt}_{lebar}x{tinggi}_{i:06d}.{EKSTENSI.get(fmt, fmt)}")
+            try:
+                os.link(varian[i % len(varian)], path)
+            except OSError:
+                shutil.copyfile(varian[i % len(varian)], path)
+            paths.append(path)
+        per_format.append(paths)
+    return [path for baris in zip_longest(*per_format) for path in baris if path is not None]
+
+
+def bagian_pemanasan(teks):
+    """argparse type of --pemanasan: a share of the steps, 0 <= x < 1."""
+    nilai = float(teks)
+    if not 0 <= nilai < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 0 and below 1, got {teks}")
+    return nilai
+
+
+def buka_tk():
+    """(root, GambarTk) when a display is available, else (None, None)."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None, None
+    from gambar_tk import GambarTk
+    label = tk.Label(root)
+    label.pack()
+    return root, GambarTk(label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jumlah", type=int, default=10_000, help="navigation steps (and photos)")
+    parser.add_argument("--format", default="jpg,png,tif,gif,tif16")
+    parser.add_argument("--ukuran", default="4000x3000")
+    parser.add_argument("--cache-mb", type=int, default=128)
+    parser.add_argument("--radius", type=int, default=3, help="prefetch radius")
+    parser.add_argument("--sampel", type=int, default=250, help="steps between RSS/FD samples")
+    parser.add_argument("--pemanasan", type=bagian_pemanasan, default=0.1,
+                        help="share of the steps before the baseline (0 <= x < 1)")
+    parser.add_argument("--toleransi-mb", type=float, default=32, help="allowed RSS growth after warm-up")
+    parser.add_argument("--toleransi-fd", type=int, default=2, help="allowed extra open files after warm-up")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    daftar_format = [fmt.strip().lower() for fmt in args.format.split(",") if fmt.strip()]
+    daftar_ukuran = [tuple(int(x) for x in teks.split("x")) for teks in args.ukuran.split(",")]
+    rng = random.Random(args.seed)
+
+    root_folder = tempfile.mkdtemp(prefix="soak_preview_")
+    root_tk, gambar = buka_tk()
+    cache = PreviewCache(batas_byte=args.cache_mb * 1024 * 1024)
+    prefetcher = PreviewPrefetcher(cache)
+    sampel = []
+    try:
+        paths = buat_folder(os.path.join(root_folder, "foto"), args.jumlah, daftar_format, daftar_ukuran, args.seed)
+        print(f"{len(paths)} photos, cache {args.cache_mb} MB, "
+              f"Tk {'on' if gambar is not None else 'off (no display)'}")
+        image_tk_awal = len(root_tk.tk.call("image", "names")) if root_tk is not None else 0
+        image_tk_maks = 0
+
+        mulai = time.perf_counter()
+        index = 0
+        for langkah in range(args.jumlah):
+            # A reviewer mostly moves forward and now and then goes back one.
+            arah = -1 if index > 0 and rng.random() < 0.1 else 1
+            index = min(index + arah, len(paths) - 1)
+            img = prefetcher.muat(paths[index], UKURAN_PRATINJAU, KUALITAS_TINGGI)
+            berikut = range(index + 1, min(index + 1 + args.radius, len(paths)))
+            prefetcher.prefetch([paths[i] for i in berikut], UKURAN_PRATINJAU, KUALITAS_TINGGI)
+
+            if gambar is not None:
+                gambar.tampilkan(img)
+                root_tk.update_idletasks()
+                image_tk_maks = max(image_tk_maks, len(root_tk.tk.call("image", "names")) - image_tk_awal)
+            del img
+
+            if langkah % args.sampel == 0 or langkah == args.jumlah - 1:
+                sampel.append((langkah, rss_byte(), jumlah_fd(), cache.terpakai))
+        durasi = time.perf_counter() - mulai
+    finally:
+        prefetcher.shutdown()
+        if root_tk is not None:
+            root_tk.destroy()
+        shutil.rmtree(root_folder)
+
+    print(f"{args.jumlah} steps in {durasi:.1f}s ({args.jumlah / durasi:.0f} photos/s)\n")
+    print(f"{'step':>8}{'RSS MB':>10}{'FD':>6}{'cache MB':>10}")
+    for langkah, rss, fd, terpakai in sampel:
+        print(f"{langkah:>8}{(rss or 0) / 2**20:>10.1f}{fd if fd is not None else '-':>6}{terpakai / 2**20:>10.1f}")
+
+    batas_pemanasan = int(args.jumlah * args.pemanasan)
+    setelah = [s for s in sampel if s[0] >= batas_pemanasan]
+    if len(setelah) < 2:
+        print(f"\nFAILED: {len(setelah)} sample(s) after the warm-up, nothing to compare; "
+              f"lower --sampel or --pemanasan, or raise --jumlah")
+        return 1
+    dasar = setelah[0]
+    gagal = []
+    if dasar[1] is not None:
+        naik_mb = (max(s[1] for s in setelah) - dasar[1]) / 2**20
+        print(f"\nRSS growth after warm-up: {naik_mb:+.1f} MB (limit {args.toleransi_mb} MB)")
+        if naik_mb > args.toleransi_mb:
+            gagal.append("RSS")
+    if dasar[2] is not None:
+        naik_fd = max(s[2] for s in setelah) - dasar[2]
+        print(f"Open files after warm-up: {naik_fd:+d} (limit {args.toleransi_fd})")
+        if naik_fd > args.toleransi_fd:
+            gagal.append("FD")
+    if gambar is not None:
+        print(f"Tk images alive: at most {image_tk_maks} (pool limit {gambar.batas})")
+        if image_tk_maks > gambar.batas:
+            gagal.append("Tk images")
+
+    if gagal:
+        print("FAILED: " + ", ".join(gagal))
+        return 1
+    print("ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Reproducible benchmark suite: import rate, navigation latency, memory and export throughput.
+
+    python benchmarks/suite.py --jumlah 2000 --format jpg,png,tif --ukuran 1600x1200,4000x3000
+    python benchmarks/suite.py --simpan baseline.json
+    python benchmarks/suite.py --banding baseline.json      # exit 1 on a regression
+
+Synthetic folders are generated from a fixed seed: a few distinct images per
+(format, size) are rendered and copied under many names, so decode costs are real
+while generation stays fast. Run with PHOTOMANAGER_PERF=1 to also get the span
+breakdown (open/decode/resize, thumbstore, export) of everything measured here.
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exporter import ExportJob
+from importer import pindai_folder
+from instrumen import persentil
+from koleksi import Foto, KoleksiFoto
+from preview import KUALITAS_TINGGI, PreviewCache, PreviewPrefetcher, load_preview
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+VARIAN_PER_GRUP = 6
+UKURAN_PRATINJAU = (1000, 700)
+
+# Metrics ending in these are throughputs (larger is better); the rest are costs.
+LEBIH_BESAR_LEBIH_BAIK = ("_per_detik",)
+
+
+def buat_folder(root, jumlah, daftar_format, daftar_ukuran, seed=1):
+    """Writes jumlah photos spread over every (format, size) group; returns {grup: [paths]}."""
+    rng = np.random.default_rng(seed)
+    grup_grup = [(fmt, ukuran) for fmt in daftar_format for ukuran in daftar_ukuran]
+    per_grup = max(1, jumlah // len(grup_grup))
+    hasil = {}
+
+    for fmt, (lebar, tinggi) in grup_grup:
+        nama_grup = f"{fmt}_{lebar}x{tinggi}"
+        folder = os.path.join(root, nama_grup)
+        os.makedirs(folder)
+        varian = []
+        for v in range(VARIAN_PER_GRUP):
+            kasar = rng.integers(0, 255, (tinggi // 100 + 2, lebar // 100 + 2, 3), dtype=np.uint8)
+            img = Image.fromarray(kasar).resize((lebar, tinggi), Image.BICUBIC)
+            path = os.path.join(folder, f"_varian{v}.{fmt}")
+            img.save(path, **({"quality": 90} if fmt == "jpg" else {}))
+            varian.append(path)
+
+        paths = []
+        for i in range(per_grup):
+            path = os.path.join(folder, f"IMG_{i:05d}.{fmt}")
+            shutil.copyfile(varian[i % len(varian)], path)
+            paths.append(path)
+        for path in varian:
+            os.remove(path)
+        hasil[nama_grup] = paths
+    return hasil
+
+
+def ukur_import(root):
+    """Scan + collection build, as the GUI import does."""
+    mulai = time.perf_counter()
+    koleksi = KoleksiFoto()
+    for batch in pindai_folder(root, kedalaman_maks=None, dengan_tanda=True):
+        for nama_file, path, tanda in batch:
+            foto = Foto(nama_file, path)
+            foto.tanda = tanda
+            koleksi.tambah_foto(foto)
+    durasi = time.perf_counter() - mulai
+    return {"import_foto_per_detik": len(koleksi) / durasi, "import_jumlah": len(koleksi)}
+
+
+def ukur_navigasi(paths, langkah, jeda_ms, radius=3):
+    """Steps through paths like a reviewer: show photo i, prefetch the next ones, wait jeda_ms.
+
+    Returns latencies of the cold decode (no cache) and of prefetched navigation.
+    """
+    dingin = []
+    for path in paths[:langkah]:
+        mulai = time.perf_counter()
+        load_preview(path, UKURAN_PRATINJAU, KUALITAS_TINGGI)
+        dingin.append(time.perf_counter() - mulai)
+
+    cache = PreviewCache()
+    prefetcher = PreviewPrefetcher(cache)
+    hangat = []
+    try:
+        for i, path in enumerate(paths[:langkah]):
+            mulai = time.perf_counter()
+            prefetcher.muat(path, UKURAN_PRATINJAU, KUALITAS_TINGGI)
+            hangat.append(time.perf_counter() - mulai)
+            prefetcher.prefetch(paths[i + 1:i + 1 + radius], UKURAN_PRATINJAU, KUALITAS_TINGGI)
+            time.sleep(jeda_ms / 1000)
+    finally:
+        prefetcher.shutdown()
+
+    hasil = {}
+    for nama, sampel in (("dingin", dingin), ("prefetch", hangat)):
+        urut = sorted(sampel)
+        for p in (50, 95, 99):
+            hasil[f"navigasi_{nama}_p{p}_ms"] = persentil(urut, p) * 1000
+    hasil["cache_pratinjau_mb"] = cache.terpakai / 1024 / 1024
+    return hasil
+
+
+def ukur_memori(jumlah, jumlah_tag=20):
+    """Bytes per Foto in a tagged collection (tracemalloc), and the process peak RSS."""
+    gc.collect()
+    tracemalloc.start()
+    awal = tracemalloc.get_traced_memory()[0]
+    koleksi = KoleksiFoto()
+    for i in range(jumlah):
+        foto = koleksi.tambah_foto(Foto(f"IMG_{i:07d}.jpg", f"/foto/sesi_{i // 1000:03d}/IMG_{i:07d}.jpg"))
+        koleksi.tambah_tag(foto, f"Tag {i % jumlah_tag}")
+    terpakai = tracemalloc.get_traced_memory()[0] - awal
+    tracemalloc.stop()
+
+    hasil = {"memori_byte_per_foto": terpakai / jumlah}
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KiB on Linux, in bytes on macOS.
+        hasil["memori_rss_puncak_mb"] = maxrss / 1024 / 1024 if sys.platform == "darwin" else maxrss / 1024
+    return hasil
+
+
+def ukur_ekspor(paths, tujuan, jumlah_worker):
+    daftar_foto = [(os.path.basename(path), path) for path in paths]
+    os.makedirs(tujuan, exist_ok=True)
+    job = ExportJob(daftar_foto, tujuan, jumlah_worker=jumlah_worker, inkremental=False).mulai()
+    while not job.selesai:
+        time.sleep(0.01)
+    laporan = job.laporan
+    return {
+        "ekspor_foto_per_detik": len(laporan.disalin) / laporan.durasi,
+        "ekspor_mb_per_detik": laporan.total_byte / 1024 / 1024 / laporan.durasi,
+    }
+
+
+def banding(hasil, baseline, toleransi):
+    """Lists metrics that got worse than baseline by more than toleransi (a fraction)."""
+    regresi = []
+    for nama, nilai in hasil.items():
+        lama = baseline.get(nama)
+        if not isinstance(lama, (int, float)) or not isinstance(nilai, (int, float)) or not lama:
+            continue
+        if nama.endswith("_jumlah"):
+            continue
+        perubahan = (nilai - lama) / lama
+        if nama.endswith(LEBIH_BESAR_LEBIH_BAIK):
+            perubahan = -perubahan
+        if perubahan > toleransi:
+            regresi.append(f"{nama}: {lama:.2f} -> {nilai:.2f} ({perubahan:+.0%} worse)")
+    return regresi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jumlah", type=int, default=600, help="photos in the synthetic folder")
+    parser.add_argument("--format", default="jpg,png,tif")
+    parser.add_argument("--ukuran", default="1600x1200,4000x3000")
+    parser.add_argument("--langkah", type=int, default=40, help="navigation steps per group")
+    parser.add_argument("--jeda", type=float, default=120, help="simulated dwell per photo (ms)")
+    parser.add_argument("--memori", type=int, default=200_000, help="photos for the memory measurement")
+    parser.add_argument("--worker", type=int, default=4, help="export workers")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--simpan", metavar="JSON", help="write the results here")
+    parser.add_argument("--banding", metavar="JSON", help="compare with an earlier --simpan file")
+    parser.add_argument("--toleransi", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    daftar_format = [fmt.strip().lower() for fmt in args.format.split(",") if fmt.strip()]
+    daftar_ukuran = [tuple(int(x) for x in teks.split("x")) for teks in args.ukuran.split(",")]
+
+    root = tempfile.mkdtemp(prefix="bench_suite_")
+    hasil = {}
+    try:
+        mulai = time.perf_counter()
+        grup = buat_folder(os.path.join(root, "foto"), args.jumlah, daftar_format, daftar_ukuran, args.seed)
+        print(f"generated {sum(map(len, grup.values()))} photos in {len(grup)} groups "
+              f"({time.perf_counter() - mulai:.1f}s)")
+
+        hasil.update(ukur_import(os.path.join(root, "foto")))
+        for nama_grup, paths in grup.items():
+            for nama, nilai in ukur_navigasi(paths, args.langkah, args.jeda).items():
+                hasil[f"{nama_grup}.{nama}"] = nilai
+        semua = [path for paths in grup.values() for path in paths]
+        hasil.update(ukur_ekspor(semua, os.path.join(root, "ekspor"), args.worker))
+        hasil.update(ukur_memori(args.memori))
+    finally:
+        shutil.rmtree(root)
+
+    for nama, nilai in hasil.items():
+        print(f"{nama:<48}{nilai:>12.2f}")
+
+    if args.simpan:
+        with open(args.simpan, "w", encoding="utf-8") as f:
+            json.dump(hasil, f, indent=2)
+    if args.banding:
+        with open(args.banding, encoding="utf-8") as f:
+            regresi = banding(hasil, json.load(f), args.toleransi)
+        if regresi:
+            print("\nREGRESSIONS:\n  " + "\n  ".join(regresi))
+            return 1
+        print("\nno regressions against", args.banding)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
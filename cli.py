@@ -0,0 +1,223 @@
+"""Command-line access to a photo folder's collection, without the GUI.
+
+    python cli.py import  FOLDER [-r|--no-rekursif] [--include GLOB] [--exclude GLOB] [--cek-magic] [--hapus-hilang]
+    python cli.py tag     FOLDER --pattern "IMG_1*.jpg" TAG [--hapus]
+    python cli.py export  FOLDER --tag TAG --ke TUJUAN [--workers 8] [--mode salin|hardlink|reflink]
+    python cli.py export  FOLDER --kueri "Wedding AND NOT Rejected" --ke TUJUAN
+    python cli.py cari    FOLDER "(Ceremony OR Reception) AND NOT Blurry" [--jumlah]
+    python cli.py stats   FOLDER [--json]
+
+Works on the same session (<folder>/.photomanager) as the GUI. Modules are imported
+inside each command so a call only pays for what it uses (never tkinter or PIL).
+"""
+import argparse
+import os
+import sys
+
+
+def _progres(jumlah_selesai, total, eta):
+    if sys.stderr.isatty():
+        teks_eta = f" • sisa ±{int(eta) // 60}:{int(eta) % 60:02d}" if eta is not None else ""
+        print(f"\rMengekspor {jumlah_selesai}/{total} foto{teks_eta}   ", end="", file=sys.stderr, flush=True)
+
+
+def _folder(teks):
+    """argparse type of the FOLDER argument."""
+    if not os.path.isdir(teks):
+        raise argparse.ArgumentTypeError(f"folder tidak ditemukan: {teks}")
+    return teks
+
+
+def _bilangan_minimal(minimal):
+    """argparse type of an integer option that must be at least minimal."""
+    def periksa(teks):
+        try:
+            nilai = int(teks)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bukan bilangan bulat: {teks}") from None
+        if nilai < minimal:
+            raise argparse.ArgumentTypeError(f"harus {minimal} atau lebih: {teks}")
+        return nilai
+    return periksa
+
+
+def _buka_pustaka(folder):
+    """PustakaFoto of an imported folder, or None (after saying so) if it has no session.
+    Only 'import' creates the .photomanager sidecar; reading commands never do."""
+    from pustaka import PustakaFoto
+    from session_db import ada_sesi
+
+    if not ada_sesi(folder):
+        print("Belum ada foto. Jalankan 'import' terlebih dahulu.", file=sys.stderr)
+        return None
+    return PustakaFoto(folder)
+
+
+def perintah_import(args):
+    from pustaka import PustakaFoto
+
+    # Options left out are the ones of the previous import (see PustakaFoto.impor).
+    opsi = {}
+    if args.rekursif is not None:
+        opsi["kedalaman_maks"] = (args.kedalaman or None) if args.rekursif else 0
+    for kunci, nilai in (("include", args.include), ("exclude", args.exclude), ("cek_magic", args.cek_magic)):
+        if nilai is not None:
+            opsi[kunci] = nilai
+    with PustakaFoto(args.folder) as pustaka:
+        hasil = pustaka.impor(hapus_hilang=args.hapus_hilang, **opsi)
+        print(f"{len(pustaka.koleksi)} foto ({hasil.ditambah} baru, {hasil.dihapus} dihapus)")
+    for path, e in hasil.galat:
+        print(f"Tidak dapat dibaca, dilewati: {path} ({e.strerror or e})", file=sys.stderr)
+    if hasil.galat:
+        print(f"Pemindaian tidak lengkap: {hasil.tertahan} foto yang tidak ditemukan tidak dihapus.", file=sys.stderr)
+    elif hasil.tertahan:
+        print(f"Opsi pemindaian berbeda dari impor sebelumnya: {hasil.tertahan} foto yang tidak ditemukan "
+              f"tidak dihapus (pakai --hapus-hilang untuk menghapusnya).", file=sys.stderr)
+    return 0
+
+
+def perintah_tag(args):
+    from koleksi import normalisasi_tag
+
+    args.tag = normalisasi_tag(args.tag)
+    pustaka = _buka_pustaka(args.folder)
+    if pustaka is None:
+        return 1
+    with pustaka:
+        if not pustaka.koleksi:
+            print("Belum ada foto. Jalankan 'import' terlebih dahulu.", file=sys.stderr)
+            return 1
+        if args.hapus:
+            berubah = pustaka.hapus_tag_pola(args.pattern, args.tag)
+            print(f"Tag '{args.tag}' dihapus dari {len(berubah)} foto")
+        else:
+            berubah = pustaka.tag_pola(args.pattern, args.tag)
+            print(f"Tag '{args.tag}' ditambahkan ke {len(berubah)} foto")
+    return 0
+
+
+def perintah_export(args):
+    opsi = {"jumlah_worker": args.workers, "mode": args.mode, "inkremental": not args.semua,
+            "saat_progres": _progres}
+    pustaka = _buka_pustaka(args.folder)
+    if pustaka is None:
+        return 1
+    with pustaka:
+        if args.kueri is not None:
+            try:
+                laporan = pustaka.ekspor_kueri(args.kueri, args.ke, **opsi)
+            except ValueError as e:
+                print(f"Kueri tidak valid: {e}", file=sys.stderr)
+                return 2
+        else:
+            laporan = pustaka.ekspor(args.tag, args.ke, **opsi)
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    if laporan is None:
+        if args.kueri is not None:
+            print(f"Tidak ada foto yang cocok dengan '{args.kueri}'.", file=sys.stderr)
+        else:
+            print(f"Tidak ada foto dengan tag '{args.tag}'.", file=sys.stderr)
+        return 1
+
+    print(f"{len(laporan.disalin)} disalin, {len(laporan.dilewati)} dilewati, {len(laporan.gagal)} gagal "
+          f"-> {laporan.folder_output}")
+    for hasil in laporan.gagal:
+        print(f"  gagal: {hasil.sumber}: {hasil.pesan}", file=sys.stderr)
+    return 1 if laporan.gagal else 0
+
+
+def perintah_cari(args):
+    pustaka = _buka_pustaka(args.folder)
+    if pustaka is None:
+        return 1
+    with pustaka:
+        try:
+            hasil = pustaka.cari(args.kueri)
+        except ValueError as e:
+            print(f"Kueri tidak valid: {e}", file=sys.stderr)
+            return 2
+        if args.jumlah:
+            print(len(hasil))
+        else:
+            for foto in hasil:
+                print(foto.path_lengkap)
+    return 0 if hasil else 1
+
+
+def perintah_stats(args):
+    pustaka = _buka_pustaka(args.folder)
+    if pustaka is None:
+        return 1
+    with pustaka:
+        statistik = pustaka.statistik()
+    if args.json:
+        import json
+        print(json.dumps(statistik, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"Folder:       {statistik['folder']}")
+    print(f"Foto:         {statistik['jumlah_foto']} ({statistik['foto_dinilai']} dinilai)")
+    print(f"Kriteria:     {', '.join(statistik['kriteria']) or '-'}")
+    for tag, jumlah in statistik["tag"].items():
+        print(f"  {tag}: {jumlah}")
+    return 0
+
+
+def buat_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="perintah", required=True)
+
+    p = sub.add_parser("import", help="scan the folder into its session (new files in, missing files out); "
+                                      "options are remembered for the next import")
+    p.add_argument("folder", type=_folder)
+    p.add_argument("-r", "--rekursif", action=argparse.BooleanOptionalAction,
+                   help="include subfolders (default: as in the previous import)")
+    p.add_argument("--kedalaman", type=_bilangan_minimal(0), default=0, help="max subfolder depth with -r (0 = unlimited)")
+    p.add_argument("--include", action="append", metavar="GLOB", help="replaces the previous import's patterns")
+    p.add_argument("--exclude", action="append", metavar="GLOB", help="replaces the previous import's patterns")
+    p.add_argument("--cek-magic", action=argparse.BooleanOptionalAction,
+                   help="reject files that are not images by content")
+    p.add_argument("--hapus-hilang", action="store_true",
+                   help="drop missing photos even when the options differ from the previous import")
+    p.set_defaults(fungsi=perintah_import)
+
+    p = sub.add_parser("tag", help="tag every photo whose file name matches a glob")
+    p.add_argument("folder", type=_folder)
+    p.add_argument("tag")
+    p.add_argument("--pattern", required=True, metavar="GLOB")
+    p.add_argument("--hapus", action="store_true", help="remove the tag instead")
+    p.set_defaults(fungsi=perintah_tag)
+
+    p = sub.add_parser("export", help="copy the photos with a tag (or matching --kueri) to <TUJUAN>/KOLEKSI_<TAG> (a query adds a short hash)")
+    p.add_argument("folder", type=_folder)
+    pilihan = p.add_mutually_exclusive_group(required=True)
+    pilihan.add_argument("--tag")
+    pilihan.add_argument("--kueri", metavar="EKSPRESI", help='tag expression, e.g. "Wedding AND NOT Rejected"')
+    p.add_argument("--ke", required=True, metavar="TUJUAN")
+    p.add_argument("--workers", type=_bilangan_minimal(1), default=4)
+    p.add_argument("--mode", choices=("salin", "hardlink", "reflink"), default="salin")
+    p.add_argument("--semua", action="store_true", help="rewrite files that are already identical")
+    p.set_defaults(fungsi=perintah_export)
+
+    p = sub.add_parser("cari", help="list the photos matching a tag expression (AND, OR, NOT, parentheses)")
+    p.add_argument("folder", type=_folder)
+    p.add_argument("kueri")
+    p.add_argument("--jumlah", action="store_true", help="print only the number of matches")
+    p.set_defaults(fungsi=perintah_cari)
+
+    p = sub.add_parser("stats", help="photo and tag counts")
+    p.add_argument("folder", type=_folder)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(fungsi=perintah_stats)
+
+    return parser
+
+
+def main(argv=None):
+    args = buat_parser().parse_args(argv)
+    return args.fungsi(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from paralel import petakan_per_chunk
+
+# ===============================================
+# PERCEPTUAL HASHES, NEAR-DUPLICATES & BURSTS
+# ===============================================
+
+UKURAN_DCT = 32
+UKURAN_HASH = 8
+
+# Hamming distances (out of 64 bits) below which two photos count as the same shot
+# (pHash) and as consecutive frames of one burst (dHash).
+AMBANG_MIRIP = 6
+AMBANG_BURST = 14
+
+
+def _matriks_dct(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matriks = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matriks[0] /= np.sqrt(2.0)
+    return matriks.astype(np.float32)
+
+
+_DCT = _matriks_dct(UKURAN_DCT)
+
+
+def _bit_ke_int(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def hash_gambar(path):
+    """Returns (aHash, dHash, pHash) of the image at path as 64-bit ints.
+
+    JPEGs are decoded in grayscale at a reduced DCT scale (Image.draft), so a large
+    photo costs a fraction of a full decode.
+    """
+    with Image.open(path) as img:
+        img.draft("L", (UKURAN_DCT * 4, UKURAN_DCT * 4))
+        abu = img.convert("L")
+
+    kecil = np.asarray(abu.resize((UKURAN_HASH, UKURAN_HASH), Image.BOX), dtype=np.float32)
+    ahash = kecil > kecil.mean()
+
+    lebar = np.asarray(abu.resize((UKURAN_HASH + 1, UKURAN_HASH), Image.BOX), dtype=np.float32)
+    dhash = lebar[:, 1:] > lebar[:, :-1]
+
+    piksel = np.asarray(abu.resize((UKURAN_DCT, UKURAN_DCT), Image.BILINEAR), dtype=np.float32)
+    blok = (_DCT @ piksel @ _DCT.T)[:UKURAN_HASH, :UKURAN_HASH]
+    # The DC term only says how bright the image is; leave it out of the median.
+    phash = blok > np.median(blok.ravel()[1:])
+
+    return _bit_ke_int(ahash), _bit_ke_int(dhash), _bit_ke_int(phash)
+
+
+def _hash_chunk(daftar_path):
+    """Worker-process entry point: hashes for a chunk of paths (None where decoding fails)."""
+    hasil = []
+    for path in daftar_path:
+        try:
+            hasil.append(hash_gambar(path))
+        except Exception:
+            hasil.append(None)
+    return hasil
+
+
+# --- Hamming distance, vectorized ---
+_TABEL_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(arr):
+    """Number of set bits per element of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(arr)
+    arr = np.ascontiguousarray(arr)
+    return _TABEL_POPCOUNT[arr.view(np.uint8)].reshape(arr.shape + (8,)).sum(axis=-1)
+
+
+class _UnionFind:
+    def __init__(self, jumlah):
+        self.induk = list(range(jumlah))
+
+    def cari(self, x):
+        while self.induk[x] != x:
+            self.induk[x] = self.induk[self.induk[x]]
+            x = self.induk[x]
+        return x
+
+    def gabung(self, a, b):
+        a, b = self.cari(a), self.cari(b)
+        if a != b:
+            self.induk[max(a, b)] = min(a, b)
+
+    def kelompok(self, anggota):
+        """Groups of 2+ members among anggota, each sorted, ordered by first member."""
+        per_akar = {}
+        for x in anggota:
+            per_akar.setdefault(self.cari(x), []).append(x)
+        return sorted((sorted(g) for g in per_akar.values() if len(g) > 1), key=lambda g: g[0])
+
+
+def kelompok_mirip(hashes, ambang=AMBANG_MIRIP, hashes_cek=None, ambang_cek=None):
+    """Clusters of near-identical hashes (Hamming distance <= ambang), as lists of positions.
+
+    Multi-index hashing: the 64 bits are cut into ambang + 1 segments, and two hashes
+    within ambang bits of each other must agree exactly on at least one segment
+    (pigeonhole). Only hashes sharing a segment value are compared, in vectorized
+    blocks, so the work grows with the bucket sizes instead of N^2. With hashes_cek a
+    candidate pair must also be within ambang_cek on that second hash. None entries
+    (undecodable files) are ignored.
+    """
+    posisi = np.array([i for i, h in enumerate(hashes) if h is not None], dtype=np.int64)
+    uf = _UnionFind(len(hashes))
+    if len(posisi) < 2:
+        return []
+
+    nilai = np.array([hashes[i] for i in posisi], dtype=np.uint64)
+    nilai_cek = None
+    if hashes_cek is not None:
+        nilai_cek = np.array([hashes_cek[i] for i in posisi], dtype=np.uint64)
+
+    jumlah_segmen = min(ambang + 1, 64)
+    batas_bit = np.linspace(0, 64, jumlah_segmen + 1).astype(int)
+
+    for awal, akhir in zip(batas_bit[:-1], batas_bit[1:]):
+        mask = np.uint64((1 << int(akhir - awal)) - 1)
+        kunci = (nilai >> np.uint64(awal)) & mask
+
+        urutan = np.argsort(kunci, kind="stable")
+        kunci_urut = kunci[urutan]
+        awal_grup = np.flatnonzero(np.r_[True, kunci_urut[1:] != kunci_urut[:-1]])
+        akhir_grup = np.r_[awal_grup[1:], len(kunci_urut)]
+
+        for a, b in zip(awal_grup, akhir_grup):
+            if b - a < 2:
+                continue
+            anggota = urutan[a:b]
+            _gabung_dalam_grup(uf, posisi, anggota, nilai, ambang, nilai_cek, ambang_cek)
+
+    return uf.kelompok(posisi.tolist())
+
+
+def _gabung_dalam_grup(uf, posisi, anggota, nilai, ambang, nilai_cek, ambang_cek, blok=512):
+    x = nilai[anggota]
+    x_cek = nilai_cek[anggota] if nilai_cek is not None else None
+
+    # Row blocks keep the distance matrix small even for a huge bucket (e.g. blank frames).
+    for mulai in range(0, len(anggota), blok):
+        jarak = popcount(x[mulai:mulai + blok, None] ^ x[None, :])
+        cocok = jarak <= ambang
+        if x_cek is not None:
+            cocok &= popcount(x_cek[mulai:mulai + blok, None] ^ x_cek[None, :]) <= ambang_cek
+
+        baris, kolom = np.nonzero(cocok)
+        baris += mulai
+        atas = baris < kolom
+        for i, j in zip(posisi[anggota[baris[atas]]].tolist(), posisi[anggota[kolom[atas]]].tolist()):
+            uf.gabung(i, j)
+
+
+def kelompok_burst(hashes, ambang=AMBANG_BURST):
+    """Runs of consecutive photos (collection order) whose dHash stays within ambang.
+
+    Bursts are shot one after another, so only neighbours are compared (O(N)).
+    """
+    uf = _UnionFind(len(hashes))
+    for i in range(1, len(hashes)):
+        a, b = hashes[i - 1], hashes[i]
+        if a is not None and b is not None and bin(a ^ b).count("1") <= ambang:
+            uf.gabung(i - 1, i)
+    return uf.kelompok(range(len(hashes)))
+
+
+class AnalisisDuplikat:
+    """Hashes photos in a process pool, then finds near-duplicates and bursts, off the Tk thread.
+
+    daftar_path is in collection order; results are lists of positions into it.
+    Progress is read with progres(); batalkan() drops chunks that have not started.
+    """
+    def __init__(self, daftar_path, ambang=AMBANG_MIRIP, ambang_burst=AMBANG_BURST, jumlah_proses=None):
+        self.daftar_path = list(daftar_path)
+        self.ambang = ambang
+        self.ambang_burst = ambang_burst
+        self.jumlah_proses = jumlah_proses or os.cpu_count() or 1
+        self.hashes = [None] * len(self.daftar_path)
+        self.kelompok_mirip = []
+        self.kelompok_burst = []
+        self.jumlah_gagal = 0
+        self.error = None
+        self.batal = threading.Event()
+        self.selesai = False
+
+        self._jumlah_selesai = 0
+        self._thread = threading.Thread(target=self._jalankan, name="analisis-duplikat", daemon=True)
+
+    @property
+    def total(self):
+        return len(self.daftar_path)
+
+    def mulai(self):
+        self._thread.start()
+        return self
+
+    def batalkan(self):
+        self.batal.set()
+
+    @property
+    def dibatalkan(self):
+        return self.batal.is_set()
+
+    def progres(self):
+        """Returns (photos hashed, total photos)."""
+        return self._jumlah_selesai, self.total
+
+    def _jalankan(self):
+        try:
+            self._hitung_hash()
+            if not self.dibatalkan:
+                dhash = [h[1] if h else None for h in self.hashes]
+                phash = [h[2] if h else None for h in self.hashes]
+                # pHash finds candidates; dHash must roughly agree too, which weeds out
+                # different shots that merely share the same overall layout.
+                self.kelompok_mirip = kelompok_mirip(phash, self.ambang, dhash, self.ambang * 2)
+                self.kelompok_burst = kelompok_burst(dhash, self.ambang_burst)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.selesai = True
+
+    def _hitung_hash(self):
+        def simpan(awal, hasil):
+            self.hashes[awal:awal + len(hasil)] = hasil
+            self.jumlah_gagal += hasil.count(None)
+            self._jumlah_selesai += len(hasil)
+
+        petakan_per_chunk(_hash_chunk, self.daftar_path, self.jumlah_proses, self.batal, simpan)
@@ -0,0 +1,402 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fileutil import hash_konten
+from instrumen import catat_durasi, hitung, rentang
+
+# ===============================================
+# EXPORT ENGINE (BACKGROUND, PARALLEL COPY)
+# ===============================================
+
+STATUS_DISALIN = "disalin"
+STATUS_DILEWATI = "dilewati"
+STATUS_GAGAL = "gagal"
+STATUS_DIBATALKAN = "dibatalkan"
+
+# How a file ends up in the export folder. Hardlink/reflink fall back to a copy
+# when the destination is on another volume or the filesystem can't do it.
+MODE_SALIN = "salin"
+MODE_HARDLINK = "hardlink"
+MODE_REFLINK = "reflink"
+
+# When is an existing destination "already exported"?
+VERIFIKASI_METADATA = "metadata"   # same size and mtime
+VERIFIKASI_HASH = "hash"           # same content
+
+NAMA_MANIFEST = ".export_manifest.jsonl"
+
+UKURAN_BLOK_SALIN = 1024 * 1024
+
+# Filesystems such as FAT/exFAT and many SMB shares store mtime at 2 s resolution.
+TOLERANSI_MTIME_NS = 2_000_000_000
+
+FICLONE = 0x40049409   # Linux ioctl: share the source's extents (btrfs, XFS, bcachefs)
+
+
+def folder_ekspor_tag(lokasi_dasar, tag):
+    """Export folder of a tag: <lokasi_dasar>/KOLEKSI_<TAG>, without characters unsafe in names."""
+    safe_tag = "".join(c for c in tag if c.isalnum() or c in (' ', '_')).rstrip()
+    return os.path.join(lokasi_dasar, f"KOLEKSI_{safe_tag.upper().replace(' ', '_')}")
+
+
+def folder_ekspor_kueri(lokasi_dasar, teks):
+    """Export folder of a tag query given as its canonical text (kueri.teks_kueri).
+
+    The readable part drops parentheses and quotes, so "(A OR B) AND C" and
+    "A OR (B AND C)" would share it; a short hash of the full text tells them apart.
+    """
+    sidik = hashlib.blake2b(teks.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{folder_ekspor_tag(lokasi_dasar, teks)}_{sidik}"
+
+
+def salin_isi(fsrc, fdst, ukuran):
+    """Copies ukuran bytes between open files, kernel-side where the platform allows.
+
+    Tries copy_file_range (which can reflink on btrfs/XFS/NFS 4.2), then sendfile,
+    then a plain buffered copy, continuing from wherever the previous method stopped.
+    """
+    offset = 0
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while offset < ukuran:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), ukuran - offset, offset, offset)
+                if n == 0:
+                    break
+                offset += n
+        except OSError:
+            pass
+        if offset >= ukuran:
+            return
+
+    if hasattr(os, "sendfile"):
+        try:
+            fdst.seek(offset)
+            while offset < ukuran:
+                n = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, ukuran - offset)
+                if n == 0:
+                    break
+                offset += n
+        except OSError:
+            pass
+        if offset >= ukuran:
+            return
+
+    fsrc.seek(offset)
+    fdst.seek(offset)
+    shutil.copyfileobj(fsrc, fdst, UKURAN_BLOK_SALIN)
+
+
+def salin_file(sumber, tujuan):
+    """shutil.copy2 equivalent built on salin_isi. Returns the number of bytes copied."""
+    with open(sumber, "rb") as fsrc, open(tujuan, "wb") as fdst:
+        ukuran = os.fstat(fsrc.fileno()).st_size
+        salin_isi(fsrc, fdst, ukuran)
+    shutil.copystat(sumber, tujuan)
+    return ukuran
+
+
+def reflink_file(sumber, tujuan):
+    """Copy-on-write clone of sumber; raises OSError where the filesystem can't clone."""
+    import fcntl
+
+    with open(sumber, "rb") as fsrc, open(tujuan, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        ukuran = os.fstat(fsrc.fileno()).st_size
+    shutil.copystat(sumber, tujuan)
+    return ukuran
+
+
+def tulis_file(sumber, tujuan, mode):
+    """Materializes sumber at tujuan (atomically, via a temporary name).
+
+    Returns (bytes written, mode actually used); a hardlink writes no new bytes.
+    """
+    sementara = os.path.join(os.path.dirname(tujuan), f".{os.path.basename(tujuan)}.part")
+    try:
+        if mode == MODE_HARDLINK:
+            try:
+                if os.path.lexists(sementara):
+                    os.remove(sementara)
+                os.link(sumber, sementara)
+                os.replace(sementara, tujuan)
+                return 0, MODE_HARDLINK
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP):
+                    raise
+
+        if mode == MODE_REFLINK:
+            try:
+                ukuran = reflink_file(sumber, sementara)
+                os.replace(sementara, tujuan)
+                return ukuran, MODE_REFLINK
+            except (OSError, ImportError):
+                pass
+
+        ukuran = salin_file(sumber, sementara)
+        os.replace(sementara, tujuan)
+        return ukuran, MODE_SALIN
+    finally:
+        if os.path.lexists(sementara):
+            os.remove(sementara)
+
+
+def sudah_identik(sumber, tujuan, verifikasi=VERIFIKASI_METADATA):
+    """True if tujuan already holds sumber (same inode, or same size and mtime/content)."""
+    try:
+        st_tujuan = os.stat(tujuan)
+    except FileNotFoundError:
+        return False
+    st_sumber = os.stat(sumber)
+
+    if os.path.samestat(st_sumber, st_tujuan):
+        return True
+    if st_sumber.st_size != st_tujuan.st_size:
+        return False
+    if verifikasi == VERIFIKASI_HASH:
+        return hash_konten(sumber) == hash_konten(tujuan)
+    return abs(st_sumber.st_mtime_ns - st_tujuan.st_mtime_ns) < TOLERANSI_MTIME_NS
+
+
+def nama_unik(nama_file, sumber):
+    """Collision-free name derived from the source path, so it is the same on every run."""
+    stem, ext = os.path.splitext(nama_file)
+    sidik = hashlib.blake2b(sumber.encode("utf-8", "surrogateescape"), digest_size=4).hexdigest()
+    return f"{stem}__{sidik}{ext}"
+
+
+class ManifestEkspor:
+    """Append-only JSON-lines record of what each source was exported as.
+
+    It keeps destination names stable between runs and lets an interrupted export
+    resume; it is compacted (rewritten with one line per source) when opened.
+    """
+    def __init__(self, folder_output):
+        self.path = os.path.join(folder_output, NAMA_MANIFEST)
+        self.entri = {}
+        self._lock = threading.Lock()
+
+        try:
+            # A corrupted byte must cost one line, not the export.
+            with open(self.path, encoding="utf-8", errors="replace") as f:
+                for baris in f:
+                    try:
+                        data = json.loads(baris)
+                        self.entri[data["sumber"]] = data
+                    except (ValueError, KeyError, TypeError):
+                        continue   # torn last line after a crash
+        except FileNotFoundError:
+            pass
+
+        sementara = self.path + ".tmp"
+        with open(sementara, "w", encoding="utf-8") as f:
+            for data in self.entri.values():
+                f.write(json.dumps(data) + "\n")
+        os.replace(sementara, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def catat(self, sumber, nama_tujuan):
+        st = os.stat(sumber)
+        data = {"sumber": sumber, "tujuan": nama_tujuan, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        with self._lock:
+            if self.entri.get(sumber) == data:
+                return
+            self.entri[sumber] = data
+            self._file.write(json.dumps(data) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def rencanakan_tujuan(daftar_foto, folder_output, manifest, verifikasi=VERIFIKASI_METADATA):
+    """Assigns every (nama_file, sumber) a destination name without overwriting other sources.
+
+    Names recorded in the manifest win; otherwise a source keeps its own name unless
+    another source (earlier in path order) or an unrelated existing file already has it,
+    in which case it gets nama_unik(). The result only depends on the inputs.
+    """
+    try:
+        sudah_ada = {nama.lower() for nama in os.listdir(folder_output)}
+    except FileNotFoundError:
+        sudah_ada = set()
+
+    pemilik = {data["tujuan"].lower(): sumber for sumber, data in manifest.entri.items()}
+    rencana = []
+
+    for nama_file, sumber in sorted(daftar_foto, key=lambda item: item[1]):
+        data = manifest.entri.get(sumber)
+        if data is not None:
+            nama = data["tujuan"]
+        else:
+            nama = nama_file
+            kunci = nama.lower()
+            dipakai_sumber_lain = pemilik.get(kunci, sumber) != sumber
+            file_asing = False
+            if kunci in sudah_ada and kunci not in pemilik:
+                try:
+                    file_asing = not sudah_identik(sumber, os.path.join(folder_output, nama), verifikasi)
+                except OSError:
+                    # Source gone or unreadable: keep the foreign file, the copy reports the error.
+                    file_asing = True
+            if dipakai_sumber_lain or file_asing:
+                nama = nama_unik(nama_file, sumber)
+
+        pemilik[nama.lower()] = sumber
+        rencana.append((nama, sumber))
+
+    return rencana
+
+
+class HasilEkspor:
+    """Outcome of exporting a single photo."""
+    __slots__ = ("sumber", "tujuan", "status", "byte", "pesan", "mode")
+
+    def __init__(self, sumber, tujuan, status, byte=0, pesan="", mode=None):
+        self.sumber = sumber
+        self.tujuan = tujuan
+        self.status = status
+        self.byte = byte
+        self.pesan = pesan
+        self.mode = mode
+
+    def __repr__(self):
+        return f"HasilEkspor({self.sumber!r}, {self.status!r}, {self.pesan!r})"
+
+
+class LaporanEkspor:
+    """Per-file results of an export run."""
+    def __init__(self, folder_output):
+        self.folder_output = folder_output
+        self.hasil = []
+        self.durasi = 0.0
+
+    def dengan_status(self, status):
+        return [h for h in self.hasil if h.status == status]
+
+    @property
+    def disalin(self):
+        return self.dengan_status(STATUS_DISALIN)
+
+    @property
+    def dilewati(self):
+        return self.dengan_status(STATUS_DILEWATI)
+
+    @property
+    def gagal(self):
+        return self.dengan_status(STATUS_GAGAL)
+
+    @property
+    def total_byte(self):
+        return sum(h.byte for h in self.hasil)
+
+
+class ExportJob:
+    """Copies photos into folder_output on a bounded thread pool, off the Tk thread.
+
+    daftar_foto is a list of (nama_file, path_lengkap). Progress is read with
+    progres(); batalkan() stops queued copies (files already being copied finish).
+    With inkremental=True destinations that already match (see sudah_identik) are
+    skipped, so re-running or resuming an export only transfers what changed.
+    """
+    def __init__(self, daftar_foto, folder_output, jumlah_worker=4, mode=MODE_SALIN,
+                 inkremental=True, verifikasi=VERIFIKASI_METADATA):
+        self.daftar_foto = list(daftar_foto)
+        self.folder_output = folder_output
+        self.jumlah_worker = jumlah_worker
+        self.mode = mode
+        self.inkremental = inkremental
+        self.verifikasi = verifikasi
+        self.manifest = None
+        self.laporan = LaporanEkspor(folder_output)
+        self.batal = threading.Event()
+        self.selesai = False
+
+        self._lock = threading.Lock()
+        self._waktu_mulai = None
+        self._thread = threading.Thread(target=self._jalankan, name="export", daemon=True)
+
+    @property
+    def total(self):
+        return len(self.daftar_foto)
+
+    def mulai(self):
+        self._waktu_mulai = time.monotonic()
+        self._thread.start()
+        return self
+
+    def batalkan(self):
+        self.batal.set()
+
+    @property
+    def dibatalkan(self):
+        return self.batal.is_set()
+
+    def progres(self):
+        """Returns (files done, total files, estimated seconds left or None)."""
+        with self._lock:
+            jumlah_selesai = len(self.laporan.hasil)
+
+        eta = None
+        if jumlah_selesai and self._waktu_mulai is not None:
+            per_file = (time.monotonic() - self._waktu_mulai) / jumlah_selesai
+            eta = per_file * (self.total - jumlah_selesai)
+        return jumlah_selesai, self.total, eta
+
+    def _jalankan(self):
+        def selesai_satu(future):
+            slot.release()
+            with self._lock:
+                self.laporan.hasil.append(future.result())
+
+        try:
+            # At most two tasks per worker are queued so cancelling takes effect quickly.
+            slot = threading.BoundedSemaphore(self.jumlah_worker * 2)
+            self.manifest = ManifestEkspor(self.folder_output)
+            with rentang("ekspor.rencana"):
+                rencana = rencanakan_tujuan(self.daftar_foto, self.folder_output, self.manifest, self.verifikasi)
+            with ThreadPoolExecutor(max_workers=self.jumlah_worker, thread_name_prefix="export") as executor:
+                for nama_tujuan, sumber in rencana:
+                    slot.acquire()
+                    executor.submit(self._salin_satu, nama_tujuan, sumber).add_done_callback(selesai_satu)
+        except Exception as e:
+            # Every photo that got no result of its own fails with the setup error,
+            # so the report never comes back shorter than the selection.
+            with self._lock:
+                sudah = {hasil.sumber for hasil in self.laporan.hasil}
+                self.laporan.hasil.extend(HasilEkspor(sumber, None, STATUS_GAGAL, pesan=str(e))
+                                          for _, sumber in self.daftar_foto if sumber not in sudah)
+        else:
+            catat_durasi("ekspor.total", time.monotonic() - self._waktu_mulai,
+                         atribut={"file": self.total, "mode": self.mode})
+            hitung("ekspor.byte", self.laporan.total_byte)
+        finally:
+            # Whatever went wrong, the UI polling selesai must get its report.
+            if self.manifest is not None:
+                self.manifest.close()
+            self.laporan.durasi = time.monotonic() - self._waktu_mulai
+            self.selesai = True
+
+    def _salin_satu(self, nama_tujuan, sumber):
+        tujuan = os.path.join(self.folder_output, nama_tujuan)
+        if self.batal.is_set():
+            return HasilEkspor(sumber, tujuan, STATUS_DIBATALKAN)
+
+        try:
+            if self.inkremental and sudah_identik(sumber, tujuan, self.verifikasi):
+                hasil = HasilEkspor(sumber, tujuan, STATUS_DILEWATI)
+            else:
+                with rentang("ekspor.file", mode=self.mode):
+                    byte, mode = tulis_file(sumber, tujuan, self.mode)
+                hasil = HasilEkspor(sumber, tujuan, STATUS_DISALIN, byte=byte, mode=mode)
+            self.manifest.catat(sumber, nama_tujuan)
+            return hasil
+        except Exception as e:
+            return HasilEkspor(sumber, tujuan, STATUS_GAGAL, pesan=str(e))
@@ -0,0 +1,24 @@
+import hashlib
+import os
+
+# ===============================================
+# SHARED FILE HELPERS
+# ===============================================
+
+def hash_konten(path, ukuran_blok=1024 * 1024):
+    """BLAKE2b digest of the file contents."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for blok in iter(lambda: f.read(ukuran_blok), b""):
+            h.update(blok)
+    return h.hexdigest()
+
+
+NAMA_FOLDER_SIDECAR = ".photomanager"
+
+
+def folder_sidecar(folder):
+    """Returns (and creates) the hidden sidecar directory next to the imported photos."""
+    path = os.path.join(folder, NAMA_FOLDER_SIDECAR)
+    os.makedirs(path, exist_ok=True)
+    return path
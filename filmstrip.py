@@ -0,0 +1,303 @@
+import math
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+from PIL import ImageTk
+
+# ===============================================
+# VIRTUALIZED FILMSTRIP (CANVAS, LAZY THUMBNAILS)
+# ===============================================
+
+class Filmstrip:
+    """Horizontal thumbnail strip that only materializes the cells currently in view.
+
+    Canvas items for visible cells come from a pool and are re-pointed at other photos
+    while scrolling, so the number of items and live PhotoImages is bounded by the
+    strip's width, not by the collection size. Thumbnails are decoded by background
+    workers, visible cells first (nearest the middle first), and handed back to the
+    Tk thread through after().
+    """
+    LEBAR_SEL = 120
+    TINGGI_SEL = 100
+    UKURAN_THUMB = (110, 76)
+    JUMLAH_WORKER = 2
+    POLL_MS = 40
+    # Decoded (PIL) thumbnails kept for cells that scroll back into view.
+    BATAS_CACHE_THUMB = 1000
+
+    def __init__(self, master, ambil_koleksi, pemuat, saat_klik):
+        """ambil_koleksi() returns the current collection, pemuat(path, ukuran) a PIL
+        thumbnail, saat_klik(index, event) is called when a cell is clicked."""
+        self.ambil_koleksi = ambil_koleksi
+        self.pemuat = pemuat
+        self.saat_klik = saat_klik
+
+        self.frame = ttk.Frame(master)
+        self.canvas = tk.Canvas(self.frame, height=self.TINGGI_SEL + 4, background="#dddddd", highlightthickness=0)
+        self.canvas.pack(fill=tk.X)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self._aksi_scrollbar)
+        self.scrollbar.pack(fill=tk.X)
+
+        self.offset = 0.0
+        self.index_aktif = None
+        # Multi-selection for bulk tagging (positions in the collection).
+        self.pilihan = set()
+        self.jangkar = None
+        self._pool = []
+        self._thumb = OrderedDict()
+
+        self._antrian_kerja = queue.PriorityQueue()
+        self._antrian_hasil = queue.Queue()
+        self._dibutuhkan = frozenset()
+        self._diminta = set()
+        self._generasi = 0
+        self._poll_terjadwal = False
+        for i in range(self.JUMLAH_WORKER):
+            threading.Thread(target=self._worker, name=f"filmstrip-{i}", daemon=True).start()
+
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        self.canvas.bind("<Button-1>", self._aksi_klik)
+        self.canvas.bind("<MouseWheel>", lambda event: self.geser(-1 if event.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda event: self.geser(-1))
+        self.canvas.bind("<Button-5>", lambda event: self.geser(1))
+
+    # --- Geometry & scrolling ---
+    @property
+    def jumlah(self):
+        return len(self.ambil_koleksi())
+
+    def _lebar_total(self):
+        return self.jumlah * self.LEBAR_SEL
+
+    def _lebar_view(self):
+        return max(self.canvas.winfo_width(), 1)
+
+    def _atur_offset(self, offset):
+        batas = max(self._lebar_total() - self._lebar_view(), 0)
+        self.offset = min(max(offset, 0.0), batas)
+        self.render()
+
+    def geser(self, jumlah_sel):
+        self._atur_offset(self.offset + jumlah_sel * self.LEBAR_SEL)
+
+    def _aksi_scrollbar(self, perintah, nilai, satuan=None):
+        if perintah == "moveto":
+            self._atur_offset(float(nilai) * self._lebar_total())
+        elif perintah == "scroll":
+            langkah = self._lebar_view() if satuan == "pages" else self.LEBAR_SEL
+            self._atur_offset(self.offset + int(nilai) * langkah)
+
+    def tampilkan_index(self, index):
+        """Marks index as the current photo and scrolls it into view."""
+        self.index_aktif = index
+        x = index * self.LEBAR_SEL
+        if x < self.offset:
+            self._atur_offset(x)
+        elif x + self.LEBAR_SEL > self.offset + self._lebar_view():
+            self._atur_offset(x + self.LEBAR_SEL - self._lebar_view())
+        else:
+            self.render()
+
+    def reset(self):
+        """Forgets thumbnails and scroll position (a new folder was imported)."""
+        self.offset = 0.0
+        self.index_aktif = None
+        self.segarkan()
+
+    def segarkan(self):
+        """Forgets thumbnails and the selection but keeps scrolling where it was."""
+        self.pilihan = set()
+        self.jangkar = None
+        self._thumb.clear()
+        self._diminta.clear()
+        self._generasi += 1
+        for sel in self._pool:
+            # Same position, possibly another photo: make render() re-label the cell.
+            if sel["index"] is not None:
+                sel["index"] = -1
+        self._atur_offset(self.offset)
+
+    def index_terpakai(self):
+        """Positions the strip keeps state for: selection, anchor, current and decoded thumbnails."""
+        terpakai = self.pilihan | self._thumb.keys()
+        terpakai.update(i for i in (self.jangkar, self.index_aktif) if i is not None)
+        return terpakai
+
+    def perbarui(self, lupakan=()):
+        """Redraws after photos were appended at the end: every position still shows the
+        same photo, so selection, thumbnails and scrolling stay. The thumbnails of the
+        positions in lupakan (rewritten files) are decoded again."""
+        lupakan = set(lupakan)
+        for index in lupakan:
+            self._thumb.pop(index, None)
+        for sel in self._pool:
+            if sel["index"] in lupakan:
+                sel["index"] = -1
+        self._atur_offset(self.offset)
+
+    def petakan_ulang(self, peta):
+        """Carries selection, anchor, current position and thumbnails over to new positions
+        after photos were removed or the order was rebuilt. peta maps old positions to
+        new ones; state at positions missing from it is dropped. Scrolling stays."""
+        self.pilihan = {peta[i] for i in self.pilihan if i in peta}
+        self.jangkar = peta.get(self.jangkar)
+        self.index_aktif = peta.get(self.index_aktif)
+        self._thumb = OrderedDict((peta[i], img) for i, img in self._thumb.items() if i in peta)
+        # Thumbnails still being decoded would land at their old positions.
+        self._diminta.clear()
+        self._generasi += 1
+        for sel in self._pool:
+            if sel["index"] is not None:
+                sel["index"] = -1
+        self._atur_offset(self.offset)
+
+    # --- Selection ---
+    def atur_pilihan(self, indexes):
+        self.pilihan = set(indexes)
+        self.render()
+
+    def pilih_rentang(self, index):
+        """Selects everything between the anchor (the last plain click) and index."""
+        jangkar = index if self.jangkar is None else self.jangkar
+        self.atur_pilihan(range(min(jangkar, index), max(jangkar, index) + 1))
+
+    def balik_pilihan(self, index):
+        self.pilihan ^= {index}
+        self.jangkar = index
+        self.render()
+
+    def thumbnail(self, index):
+        """The decoded thumbnail of index if it is at hand, else None."""
+        return self._thumb.get(index)
+
+    def _aksi_klik(self, event):
+        index = int((event.x + self.offset) // self.LEBAR_SEL)
+        if 0 <= index < self.jumlah:
+            self.saat_klik(index, event)
+
+    # --- Drawing ---
+    def _sel_pool(self, nomor):
+        while len(self._pool) <= nomor:
+            self._pool.append({
+                "kotak": self.canvas.create_rectangle(0, 0, 0, 0, outline="#999999", fill="#f5f5f5"),
+                "gambar": self.canvas.create_image(0, 0, anchor="n"),
+                "teks": self.canvas.create_text(0, 0, anchor="s", font=('Arial', 8)),
+                "index": None,
+                "photo": None,
+            })
+        return self._pool[nomor]
+
+    def warna_sel(self, index):
+        """(outline, fill) of a cell; the current and the selected photos are highlighted."""
+        fill = "#ffe8a8" if index in self.pilihan else "#f5f5f5"
+        if index == self.index_aktif:
+            return "#4a86e8", "#dce8fb" if index not in self.pilihan else fill
+        return "#999999", fill
+
+    def render(self):
+        koleksi = self.ambil_koleksi()
+        jumlah = len(koleksi)
+        lebar_view = self._lebar_view()
+
+        pertama = int(self.offset // self.LEBAR_SEL)
+        terakhir = min(jumlah, math.ceil((self.offset + lebar_view) / self.LEBAR_SEL))
+        terlihat = range(pertama, terakhir)
+
+        for nomor, index in enumerate(terlihat):
+            sel = self._sel_pool(nomor)
+            x = index * self.LEBAR_SEL - self.offset
+            outline, fill = self.warna_sel(index)
+
+            self.canvas.coords(sel["kotak"], x + 2, 2, x + self.LEBAR_SEL - 2, self.TINGGI_SEL + 2)
+            self.canvas.itemconfigure(sel["kotak"], outline=outline, fill=fill, state="normal",
+                                      width=2 if index == self.index_aktif else 1)
+            self.canvas.coords(sel["gambar"], x + self.LEBAR_SEL / 2, 6)
+            self.canvas.coords(sel["teks"], x + self.LEBAR_SEL / 2, self.TINGGI_SEL)
+
+            if sel["index"] != index:
+                sel["index"] = index
+                sel["photo"] = None
+                nama = koleksi[index].nama_file
+                self.canvas.itemconfigure(sel["teks"], text=nama if len(nama) <= 18 else nama[:15] + "...", state="normal")
+                self.canvas.itemconfigure(sel["gambar"], image="", state="normal")
+
+            if sel["photo"] is None and self._thumb.get(index) is not None:
+                self._thumb.move_to_end(index)
+                sel["photo"] = ImageTk.PhotoImage(self._thumb[index])
+                self.canvas.itemconfigure(sel["gambar"], image=sel["photo"])
+
+        # Pool cells beyond the visible range are hidden and drop their PhotoImage.
+        for sel in self._pool[len(terlihat):]:
+            if sel["index"] is not None:
+                sel["index"] = None
+                sel["photo"] = None
+                for item in ("kotak", "gambar", "teks"):
+                    self.canvas.itemconfigure(sel[item], state="hidden")
+                self.canvas.itemconfigure(sel["gambar"], image="")
+
+        total = max(jumlah * self.LEBAR_SEL, 1)
+        self.scrollbar.set(self.offset / total, min((self.offset + lebar_view) / total, 1.0))
+
+        self._minta_thumbnail(koleksi, terlihat)
+
+    # --- Background thumbnail loading ---
+    def _minta_thumbnail(self, koleksi, terlihat):
+        """Queues missing thumbnails for the visible cells, nearest the middle first."""
+        self._dibutuhkan = frozenset(terlihat)
+        tengah = (terlihat.start + terlihat.stop) / 2
+
+        for index in terlihat:
+            if index in self._thumb or index in self._diminta:
+                continue
+            self._diminta.add(index)
+            prioritas = abs(index - tengah)
+            self._antrian_kerja.put((prioritas, self._generasi, index, koleksi[index].path_lengkap))
+
+        if self._diminta and not self._poll_terjadwal:
+            self._poll_terjadwal = True
+            self.canvas.after(self.POLL_MS, self._ambil_hasil)
+
+    def _worker(self):
+        while True:
+            _, generasi, index, path = self._antrian_kerja.get()
+            if generasi != self._generasi or index not in self._dibutuhkan:
+                # Scrolled away (or a new folder) before we got to it.
+                self._antrian_hasil.put((generasi, index, None, True))
+                continue
+            try:
+                img = self.pemuat(path, self.UKURAN_THUMB)
+            except Exception:
+                img = None
+            self._antrian_hasil.put((generasi, index, img, False))
+
+    def _ambil_hasil(self):
+        self._poll_terjadwal = False
+        ada_baru = False
+
+        while True:
+            try:
+                generasi, index, img, dilewati = self._antrian_hasil.get_nowait()
+            except queue.Empty:
+                break
+            if generasi != self._generasi:
+                continue
+            self._diminta.discard(index)
+            if dilewati:
+                # Back in view since it was skipped: the next render asks again.
+                ada_baru = ada_baru or index in self._dibutuhkan
+                continue
+            # A failed decode is remembered as None so it is not retried on every scroll.
+            self._thumb[index] = img
+            ada_baru = True
+
+        while len(self._thumb) > self.BATAS_CACHE_THUMB:
+            self._thumb.popitem(last=False)
+
+        if ada_baru:
+            self.render()
+        elif self._diminta and not self._poll_terjadwal:
+            self._poll_terjadwal = True
+            self.canvas.after(self.POLL_MS, self._ambil_hasil)
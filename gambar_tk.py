@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+from PIL import ImageTk
+
+from instrumen import hitung
+
+# ===============================================
+# REUSED TK IMAGES FOR THE PREVIEW (PASTE, NOT REALLOCATE)
+# ===============================================
+
+class GambarTk:
+    """Shows PIL images on a label through a small, fixed pool of Tk photo images.
+
+    A new frame is pasted into a pooled PhotoImage of the same size and mode, so
+    paging through photos of one camera reuses a single Tk image instead of creating
+    (and leaving to the garbage collector) one per photo. The pool keeps the batas
+    most recently used sizes, enough for landscape and portrait frames side by side;
+    older images are deleted from Tk right away, never the one on screen.
+    """
+    def __init__(self, label, batas=2):
+        self.label = label
+        self.batas = batas
+        self._pool = OrderedDict()   # (mode, size) -> ImageTk.PhotoImage
+
+    def tampilkan(self, img_pil):
+        # Tk photo images hold L, RGB or RGBA; convert anything else once, here.
+        if img_pil.mode not in ("L", "RGB", "RGBA"):
+            transparan = "A" in img_pil.getbands() or "transparency" in img_pil.info
+            img_pil = img_pil.convert("RGBA" if transparan else "RGB")
+
+        kunci = (img_pil.mode, img_pil.size)
+        foto = self._pool.pop(kunci, None)
+        if foto is None:
+            foto = ImageTk.PhotoImage(img_pil)
+            hitung("tampil.photoimage_baru")
+        else:
+            foto.paste(img_pil)
+            hitung("tampil.photoimage_dipakai_ulang")
+        self._pool[kunci] = foto
+        self.label.config(image=foto, text="")
+
+        while len(self._pool) > self.batas:
+            _, lama = self._pool.popitem(last=False)
+            self._hapus(lama)
+
+    def tampilkan_teks(self, teks, **opsi_label):
+        """Shows teks instead of an image; the pool is kept for the next frame."""
+        self.label.config(image="", text=teks, **opsi_label)
+
+    def kosongkan(self):
+        """Clears the label and frees every pooled Tk image."""
+        self.label.config(image="")
+        while self._pool:
+            _, lama = self._pool.popitem()
+            self._hapus(lama)
+
+    def __len__(self):
+        return len(self._pool)
+
+    def _hapus(self, foto):
+        # ImageTk deletes the Tk image in __del__; do it now rather than whenever the
+        # last reference goes (its __del__ then finds the image gone and does nothing).
+        try:
+            self.label.tk.call("image", "delete", str(foto))
+        except Exception:
+            pass
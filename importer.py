@@ -0,0 +1,210 @@
+import fnmatch
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumen import hitung, rentang
+
+# ===============================================
+# FOLDER SCANNING (BACKGROUND, STREAMING)
+# ===============================================
+
+TIPE_FOTO = ('.jpg', '.jpeg', '.png', '.gif', '.tif')
+
+# Photos are handed to the UI in batches of this size so the main screen can open
+# as soon as the first batch exists.
+UKURAN_BATCH = 500
+
+# Leading bytes of every format in TIPE_FOTO; used by the optional content sniff.
+MAGIC_BYTES = (
+    b"\xff\xd8\xff",           # JPEG
+    b"\x89PNG\r\n\x1a\n",     # PNG
+    b"GIF87a", b"GIF89a",       # GIF
+    b"II*\x00", b"MM\x00*",     # TIFF (little / big endian)
+)
+PANJANG_MAGIC = max(len(m) for m in MAGIC_BYTES)
+
+
+def cek_magic_bytes(path):
+    """True if the file starts with the signature of a supported image format."""
+    try:
+        with open(path, "rb") as f:
+            kepala = f.read(PANJANG_MAGIC)
+    except OSError:
+        return False
+    return kepala.startswith(MAGIC_BYTES)
+
+
+def tanda_file(stat):
+    """(inode, size, mtime_ns): a file whose tanda is unchanged is assumed unchanged."""
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def cocok_pola(nama, path_relatif, pola_pola):
+    return any(fnmatch.fnmatch(nama, pola) or fnmatch.fnmatch(path_relatif, pola) for pola in pola_pola)
+
+
+def pindai_folder(folder_path, tipe_foto=TIPE_FOTO, ukuran_batch=UKURAN_BATCH, batal=None,
+                  kedalaman_maks=0, include=(), exclude=(), cek_magic=False, jumlah_worker=8,
+                  dengan_tanda=False, galat=None):
+    """Yields lists of (nama_file, path_lengkap) for the photo files under folder_path.
+
+    kedalaman_maks=0 reads only folder_path itself, None walks every subfolder. Folders
+    are listed in parallel on a thread pool. include/exclude are glob patterns matched
+    against the name or the path relative to folder_path (exclude also prunes folders).
+    Hidden folders such as the .photomanager sidecar are never entered. With
+    dengan_tanda=True the entries are (nama_file, path_lengkap, tanda_file(stat)), the
+    stat being taken by the same worker that listed the folder.
+
+    An unreadable folder_path raises. Subfolders (or files) that cannot be read are
+    skipped; pass a list as galat to have each appended as (path, OSError), since
+    a scan that skipped something must not be taken as the complete contents.
+    """
+    include, exclude = tuple(include), tuple(exclude)
+    antrian = queue.Queue()
+    berhenti = threading.Event()
+
+    def harus_berhenti():
+        return berhenti.is_set() or (batal is not None and batal.is_set())
+
+    def baca_direktori(path, path_relatif, kedalaman):
+        try:
+            batch = []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if harus_berhenti():
+                        break
+
+                    relatif = f"{path_relatif}/{entry.name}" if path_relatif else entry.name
+
+                    if entry.is_dir(follow_symlinks=False):
+                        boleh_turun = kedalaman_maks is None or kedalaman < kedalaman_maks
+                        if boleh_turun and not entry.name.startswith(".") and not cocok_pola(entry.name, relatif, exclude):
+                            antrian.put(("folder", entry.path, relatif, kedalaman + 1))
+                        continue
+
+                    if not entry.name.lower().endswith(tipe_foto) or not entry.is_file():
+                        continue
+                    if include and not cocok_pola(entry.name, relatif, include):
+                        continue
+                    if exclude and cocok_pola(entry.name, relatif, exclude):
+                        continue
+                    if cek_magic and not cek_magic_bytes(entry.path):
+                        continue
+
+                    if dengan_tanda:
+                        try:
+                            batch.append((entry.name, entry.path, tanda_file(entry.stat())))
+                        except FileNotFoundError:
+                            # Deleted between listing and stat.
+                            continue
+                        except OSError as e:
+                            antrian.put(("galat", entry.path, e))
+                            continue
+                    else:
+                        batch.append((entry.name, entry.path))
+                    if len(batch) >= ukuran_batch:
+                        antrian.put(("foto", batch))
+                        batch = []
+
+            if batch:
+                antrian.put(("foto", batch))
+        except OSError as e:
+            # Only a bad root aborts the scan; an unreadable subfolder is reported.
+            antrian.put(("error", e) if kedalaman == 0 else ("galat", path, e))
+        finally:
+            antrian.put(("selesai",))
+
+    executor = ThreadPoolExecutor(max_workers=jumlah_worker, thread_name_prefix="scan")
+    try:
+        executor.submit(baca_direktori, folder_path, "", 0)
+        tugas_berjalan = 1
+        terkumpul = []
+
+        while tugas_berjalan:
+            if harus_berhenti():
+                return
+            try:
+                pesan = antrian.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            jenis = pesan[0]
+            if jenis == "folder":
+                tugas_berjalan += 1
+                executor.submit(baca_direktori, *pesan[1:])
+            elif jenis == "foto":
+                terkumpul.extend(pesan[1])
+            elif jenis == "error":
+                raise pesan[1]
+            elif jenis == "galat":
+                if galat is not None:
+                    galat.append(pesan[1:])
+            else:
+                tugas_berjalan -= 1
+
+            # Hand over full batches, or whatever is there whenever the scanners go quiet.
+            while len(terkumpul) >= ukuran_batch:
+                yield terkumpul[:ukuran_batch]
+                terkumpul = terkumpul[ukuran_batch:]
+            if terkumpul and antrian.empty():
+                yield terkumpul
+                terkumpul = []
+
+        if terkumpul:
+            yield terkumpul
+    finally:
+        berhenti.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ImportWorker:
+    """Runs a folder scan on a background thread and passes batches to the UI through a queue."""
+    def __init__(self, folder_path, **opsi_pindai):
+        self.folder_path = folder_path
+        self.opsi_pindai = opsi_pindai
+        self.batal = threading.Event()
+        self.error = None
+        # (path, OSError) of the subfolders the scan had to skip.
+        self.galat = []
+        self.selesai = False
+        self._antrian = queue.Queue()
+        self._thread = threading.Thread(target=self._jalankan, name="import", daemon=True)
+
+    def mulai(self):
+        self._thread.start()
+        return self
+
+    def _jalankan(self):
+        try:
+            with rentang("import.pindai", folder=self.folder_path):
+                for batch in pindai_folder(self.folder_path, batal=self.batal, galat=self.galat,
+                                           **self.opsi_pindai):
+                    hitung("import.foto", len(batch))
+                    self._antrian.put(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._antrian.put(None)
+
+    def ambil_batch(self):
+        """Returns every batch produced so far without blocking (call from the Tk thread)."""
+        hasil = []
+        while True:
+            try:
+                batch = self._antrian.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                self.selesai = True
+                break
+            hasil.append(batch)
+        return hasil
+
+    def batalkan(self):
+        self.batal.set()
+
+    @property
+    def dibatalkan(self):
+        return self.batal.is_set()
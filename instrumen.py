@@ -0,0 +1,201 @@
+import atexit
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# ===============================================
+# PERFORMANCE INSTRUMENTATION (SPANS, COUNTERS, HISTOGRAMS)
+# ===============================================
+#
+# Off unless PHOTOMANAGER_PERF is set:
+#   PHOTOMANAGER_PERF=1            summary table on stderr at exit
+#   PHOTOMANAGER_PERF=hasil.json   summary as JSON, plus hasil.trace.json for
+#                                  chrome://tracing / Perfetto
+# When off, rentang() hands out one shared no-op object and diukur() returns the
+# function unchanged, so instrumented code pays a global lookup and nothing else.
+
+VAR_LINGKUNGAN = "PHOTOMANAGER_PERF"
+AKTIF = bool(os.environ.get(VAR_LINGKUNGAN))
+
+# Durations kept per span for percentiles, and trace events kept overall (oldest dropped).
+BATAS_SAMPEL = 10_000
+BATAS_TRACE = 200_000
+
+_lock = threading.Lock()
+_durasi = {}      # nama -> deque of seconds (latest BATAS_SAMPEL)
+_total = {}       # nama -> [jumlah, total detik, maks detik]
+_counter = {}     # nama -> int
+_trace = deque(maxlen=BATAS_TRACE)
+_t0 = time.perf_counter()
+
+
+class _RentangKosong:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_KOSONG = _RentangKosong()
+
+
+class _Rentang:
+    __slots__ = ("nama", "atribut", "mulai")
+
+    def __init__(self, nama, atribut):
+        self.nama = nama
+        self.atribut = atribut
+
+    def __enter__(self):
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        selesai = time.perf_counter()
+        catat_durasi(self.nama, selesai - self.mulai, self.mulai, self.atribut)
+        return False
+
+
+def rentang(nama, **atribut):
+    """Timing span: `with rentang("preview.decode", path=path): ...`."""
+    if not AKTIF:
+        return _KOSONG
+    return _Rentang(nama, atribut)
+
+
+def diukur(nama):
+    """Decorator form of rentang(); a no-op (the function itself) when instrumentation is off."""
+    def dekorator(fungsi):
+        if not AKTIF:
+            return fungsi
+
+        def terbungkus(*args, **kwargs):
+            with _Rentang(nama, None):
+                return fungsi(*args, **kwargs)
+        terbungkus.__name__ = fungsi.__name__
+        terbungkus.__doc__ = fungsi.__doc__
+        terbungkus.__wrapped__ = fungsi
+        return terbungkus
+    return dekorator
+
+
+def catat_durasi(nama, detik, mulai=None, atribut=None):
+    """Records a duration measured elsewhere (e.g. across two Tk callbacks)."""
+    if not AKTIF:
+        return
+    if mulai is None:
+        mulai = time.perf_counter() - detik
+    with _lock:
+        sampel = _durasi.get(nama)
+        if sampel is None:
+            sampel = _durasi[nama] = deque(maxlen=BATAS_SAMPEL)
+            _total[nama] = [0, 0.0, 0.0]
+        sampel.append(detik)
+        total = _total[nama]
+        total[0] += 1
+        total[1] += detik
+        total[2] = max(total[2], detik)
+        _trace.append((nama, mulai, detik, threading.get_ident(), atribut))
+
+
+def hitung(nama, jumlah=1):
+    """Adds jumlah to a counter (cache hits, bytes written, ...)."""
+    if not AKTIF:
+        return
+    with _lock:
+        _counter[nama] = _counter.get(nama, 0) + jumlah
+
+
+def persentil(nilai_urut, p):
+    """p-th percentile (0..100) of an already sorted list, nearest-rank."""
+    if not nilai_urut:
+        return None
+    indeks = min(len(nilai_urut) - 1, max(0, math.ceil(p / 100 * len(nilai_urut)) - 1))
+    return nilai_urut[indeks]
+
+
+def ringkasan():
+    """{"rentang": {nama: {jumlah, total_ms, p50_ms, p95_ms, p99_ms, maks_ms}}, "counter": {...}}.
+
+    Percentiles cover the latest BATAS_SAMPEL samples of each span; jumlah, total and
+    maks cover all of them.
+    """
+    with _lock:
+        salinan = {nama: sorted(sampel) for nama, sampel in _durasi.items()}
+        total = {nama: list(nilai) for nama, nilai in _total.items()}
+        counter = dict(_counter)
+
+    hasil = {}
+    for nama in sorted(salinan):
+        urut = salinan[nama]
+        jumlah, detik, maks = total[nama]
+        hasil[nama] = {
+            "jumlah": jumlah,
+            "total_ms": detik * 1000,
+            "p50_ms": persentil(urut, 50) * 1000,
+            "p95_ms": persentil(urut, 95) * 1000,
+            "p99_ms": persentil(urut, 99) * 1000,
+            "maks_ms": maks * 1000,
+        }
+    return {"rentang": hasil, "counter": dict(sorted(counter.items()))}
+
+
+def reset():
+    with _lock:
+        _durasi.clear()
+        _total.clear()
+        _counter.clear()
+        _trace.clear()
+
+
+def simpan_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(ringkasan(), f, indent=2)
+
+
+def simpan_trace(path):
+    """Writes the spans in Chrome trace event format (chrome://tracing, ui.perfetto.dev)."""
+    with _lock:
+        peristiwa = list(_trace)
+    pid = os.getpid()
+    events = []
+    for nama, mulai, detik, tid, atribut in peristiwa:
+        event = {"name": nama, "cat": nama.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+                 "ts": (mulai - _t0) * 1e6, "dur": detik * 1e6}
+        if atribut:
+            event["args"] = {kunci: str(nilai) for kunci, nilai in atribut.items()}
+        events.append(event)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def format_tabel(data=None):
+    """The summary as a plain-text table."""
+    data = data or ringkasan()
+    baris = [f"{'span':<28}{'n':>8}{'total ms':>12}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+    for nama, r in data["rentang"].items():
+        baris.append(f"{nama:<28}{r['jumlah']:>8}{r['total_ms']:>12.1f}{r['p50_ms']:>9.2f}"
+                     f"{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['maks_ms']:>9.2f}")
+    for nama, nilai in data["counter"].items():
+        baris.append(f"{nama:<28}{nilai:>8}")
+    return "\n".join(baris)
+
+
+def _saat_keluar():
+    tujuan = os.environ.get(VAR_LINGKUNGAN, "")
+    if tujuan.lower().endswith(".json"):
+        simpan_json(tujuan)
+        simpan_trace(tujuan[:-len(".json")] + ".trace.json")
+    else:
+        print(format_tabel(), file=sys.stderr)
+
+
+if AKTIF:
+    atexit.register(_saat_keluar)
@@ -0,0 +1,393 @@
+import bisect
+import fnmatch
+import os
+import re
+from collections import namedtuple
+
+# ===============================================
+# BAGIAN 1: DEFINISI CLASS FOTO (OBJECT) & KOLEKSI
+# ===============================================
+
+def normalisasi_tag(tag):
+    """Canonical spelling of a tag, e.g. ' pernikahan ' -> 'Pernikahan'."""
+    return tag.strip().capitalize()
+
+
+class TabelIntern:
+    """Append-only string <-> small int table, so repeated strings are stored once."""
+    __slots__ = ("_ke_id", "_nilai")
+
+    def __init__(self):
+        self._ke_id = {}
+        self._nilai = []
+
+    def id_dari(self, nilai):
+        id_nilai = self._ke_id.get(nilai)
+        if id_nilai is None:
+            id_nilai = self._ke_id[nilai] = len(self._nilai)
+            self._nilai.append(nilai)
+        return id_nilai
+
+    def cari_id(self, nilai):
+        """Id of nilai, or None if it was never interned (does not add it)."""
+        return self._ke_id.get(nilai)
+
+    def nilai(self, id_nilai):
+        return self._nilai[id_nilai]
+
+    def __len__(self):
+        return len(self._nilai)
+
+
+# Header metadata of a photo (see metadata.py). waktu is "YYYY-MM-DD HH:MM:SS" so it
+# sorts as text; lebar/tinggi are as displayed (after orientation). Any field may be None.
+MetadataFoto = namedtuple("MetadataFoto", "waktu kamera lensa iso lebar tinggi orientasi")
+
+
+# Shared by every Foto: folders are stored once per directory, tags once per name.
+TABEL_DIREKTORI = TabelIntern()
+TABEL_TAG = TabelIntern()
+
+
+class Foto:
+    """Blueprint for a Photo object (Model Data).
+
+    Kept compact for collections of hundreds of thousands of photos: no __dict__,
+    the path is an interned folder id plus the file name (nama_file is always the
+    basename of path_lengkap), and tags are a sorted tuple of interned tag ids.
+    skor is None or (sharpness, clipped fraction, brightness), see skor.py; meta is None
+    until the header has been read, then a MetadataFoto. tanda is the file's
+    (inode, size, mtime_ns) when it was scanned, used to detect changes on re-scan.
+    """
+    __slots__ = ("id", "_id_direktori", "_nama", "_tag_ids", "skor", "meta", "tanda")
+
+    def __init__(self, nama_file, path_lengkap, tags=[]):
+        direktori, nama = os.path.split(path_lengkap)
+        self.id = None
+        self._id_direktori = TABEL_DIREKTORI.id_dari(direktori)
+        self._nama = nama
+        self._tag_ids = ()
+        self.skor = None
+        self.meta = None
+        self.tanda = None
+        for tag in tags:
+            self.tambah_tag(tag)
+
+    @property
+    def nama_file(self):
+        return self._nama
+
+    @property
+    def path_lengkap(self):
+        return os.path.join(TABEL_DIREKTORI.nilai(self._id_direktori), self._nama)
+
+    @property
+    def tags(self):
+        """Tag names in alphabetical order (a new list; change tags via the methods)."""
+        return sorted(TABEL_TAG.nilai(i) for i in self._tag_ids)
+
+    def punya_tag(self, tag):
+        id_tag = TABEL_TAG.cari_id(tag)
+        if id_tag is None:
+            return False
+        posisi = bisect.bisect_left(self._tag_ids, id_tag)
+        return posisi < len(self._tag_ids) and self._tag_ids[posisi] == id_tag
+
+    def tambah_tag(self, tag_baru):
+        """Method to add a tag to the photo."""
+        tag_baru = normalisasi_tag(tag_baru)
+        if not tag_baru:
+            return False
+
+        id_tag = TABEL_TAG.id_dari(tag_baru)
+        posisi = bisect.bisect_left(self._tag_ids, id_tag)
+        if posisi < len(self._tag_ids) and self._tag_ids[posisi] == id_tag:
+            return False
+        self._tag_ids = self._tag_ids[:posisi] + (id_tag,) + self._tag_ids[posisi:]
+        return True
+    
+    def hapus_tag(self, tag_yang_dihapus):
+        """Method to remove a tag from the photo."""
+        id_tag = TABEL_TAG.cari_id(tag_yang_dihapus)
+        if id_tag is None:
+            return False
+
+        posisi = bisect.bisect_left(self._tag_ids, id_tag)
+        if posisi < len(self._tag_ids) and self._tag_ids[posisi] == id_tag:
+            self._tag_ids = self._tag_ids[:posisi] + self._tag_ids[posisi + 1:]
+            return True
+        return False
+
+    def get_info(self):
+        """Returns basic information string (Tags are displayed separately)."""
+        info = f"File: {self.nama_file}\n"
+        meta = self.meta
+        if meta is None:
+            return info
+        if meta.waktu:
+            info += f"Diambil: {meta.waktu}\n"
+        if meta.kamera:
+            info += f"Kamera: {meta.kamera}\n"
+        if meta.lensa:
+            info += f"Lensa: {meta.lensa}\n"
+        if meta.iso:
+            info += f"ISO: {meta.iso}\n"
+        if meta.lebar and meta.tinggi:
+            info += f"Dimensi: {meta.lebar} x {meta.tinggi}\n"
+        return info
+
+
+def index_cocok_pola(daftar_foto, pola):
+    """Positions in daftar_foto of the photos whose file name matches the glob pola (case-insensitive)."""
+    cocok = re.compile(fnmatch.translate(pola), re.IGNORECASE).match
+    return [i for i, foto in enumerate(daftar_foto) if cocok(foto.nama_file)]
+
+
+class KoleksiFoto:
+    """Ordered photo collection with an inverted tag index.
+
+    The index maps tag -> set of photo ids, so the unique-tag set, per-tag counts and
+    "which photos have tag X" cost O(1) / O(matches) instead of a scan of every Foto.
+    Tags must be changed through tambah_tag/hapus_tag here (not on Foto directly) to
+    keep the index in sync. Ids grow with insertion order, so sorted ids follow the
+    collection order.
+
+    Listeners registered with tambah_pengamat are called as fn(jenis, foto, tag) after
+    every change: "foto+" and "foto-" (tag None), "tag+", "tag-" and "tag-semua" (foto None).
+    """
+    def __init__(self, daftar_foto=()):
+        self._foto = []
+        self._foto_per_id = {}
+        self._indeks_tag = {}
+        self._id_berikutnya = 0
+        self._pengamat = []
+        # camera -> photo ids, and the capture-time order (rebuilt lazily when stale).
+        self._indeks_kamera = {}
+        self._urut_waktu = None
+        self.extend(daftar_foto)
+
+    def tambah_pengamat(self, fungsi):
+        self._pengamat.append(fungsi)
+
+    def hapus_pengamat(self, fungsi):
+        self._pengamat.remove(fungsi)
+
+    def _beri_tahu(self, jenis, foto, tag=None):
+        for fungsi in self._pengamat:
+            fungsi(jenis, foto, tag)
+
+    # --- Sequence protocol (navigation code indexes the collection like a list) ---
+    def __len__(self):
+        return len(self._foto)
+
+    def __getitem__(self, index):
+        return self._foto[index]
+
+    def __iter__(self):
+        return iter(self._foto)
+
+    def __bool__(self):
+        return bool(self._foto)
+
+    # --- Photos ---
+    def tambah_foto(self, foto):
+        foto.id = self._id_berikutnya
+        self._id_berikutnya += 1
+        self._foto.append(foto)
+        self._foto_per_id[foto.id] = foto
+        for tag in foto.tags:
+            self._indeks_tag.setdefault(tag, set()).add(foto.id)
+        if foto.meta is not None:
+            self._indeks_kamera.setdefault(foto.meta.kamera, set()).add(foto.id)
+        self._urut_waktu = None
+        self._beri_tahu("foto+", foto)
+        return foto
+
+    def extend(self, daftar_foto):
+        for foto in daftar_foto:
+            self.tambah_foto(foto)
+
+    def hapus_foto_banyak(self, daftar_foto):
+        """Removes photos (files gone from disk) in one pass over the list; returns those removed."""
+        dihapus = [foto for foto in daftar_foto if self._foto_per_id.get(foto.id) is foto]
+        if not dihapus:
+            return []
+        ids = {foto.id for foto in dihapus}
+        self._foto = [foto for foto in self._foto if foto.id not in ids]
+
+        for foto in dihapus:
+            del self._foto_per_id[foto.id]
+            for tag in foto.tags:
+                ids_tag = self._indeks_tag[tag]
+                ids_tag.discard(foto.id)
+                if not ids_tag:
+                    del self._indeks_tag[tag]
+            if foto.meta is not None:
+                ids_kamera = self._indeks_kamera[foto.meta.kamera]
+                ids_kamera.discard(foto.id)
+                if not ids_kamera:
+                    del self._indeks_kamera[foto.meta.kamera]
+        self._urut_waktu = None
+
+        for foto in dihapus:
+            self._beri_tahu("foto-", foto)
+        return dihapus
+
+    def berisi(self, foto):
+        """True while foto is part of the collection (not removed since it was added)."""
+        return self._foto_per_id.get(foto.id) is foto
+
+    def foto_dengan_id(self, id_foto):
+        return self._foto_per_id[id_foto]
+
+    @property
+    def ids_semua(self):
+        """Ids of every photo (a live set-like view)."""
+        return self._foto_per_id.keys()
+
+    # --- Metadata ---
+    def atur_metadata(self, foto, meta):
+        """Sets foto.meta and keeps the camera index and capture-time order in sync."""
+        if foto.meta is not None:
+            ids = self._indeks_kamera.get(foto.meta.kamera)
+            if ids is not None:
+                ids.discard(foto.id)
+                if not ids:
+                    del self._indeks_kamera[foto.meta.kamera]
+        foto.meta = meta
+        if meta is not None:
+            self._indeks_kamera.setdefault(meta.kamera, set()).add(foto.id)
+        self._urut_waktu = None
+
+    @property
+    def kamera_unik(self):
+        """Every camera model seen so far (None = no camera in the EXIF data)."""
+        return self._indeks_kamera.keys()
+
+    def ids_dengan_kamera(self, kamera):
+        """Ids of the photos taken with kamera (a live set; do not modify)."""
+        return self._indeks_kamera.get(kamera, frozenset())
+
+    def foto_dengan_kamera(self, kamera):
+        """Photos taken with kamera, in collection order."""
+        return [self._foto_per_id[i] for i in sorted(self.ids_dengan_kamera(kamera))]
+
+    def urut_waktu(self):
+        """Photos ordered by capture time; those without one follow in collection order."""
+        if self._urut_waktu is None:
+            def kunci(foto):
+                waktu = foto.meta.waktu if foto.meta is not None else None
+                return (waktu is None, waktu or "", foto.id)
+            self._urut_waktu = sorted(self._foto, key=kunci)
+        return self._urut_waktu
+
+    # --- Tags ---
+    def tambah_tag(self, foto, tag):
+        """Adds tag to foto and to the index. Returns False if foto already had it."""
+        tag = normalisasi_tag(tag)
+        if not foto.tambah_tag(tag):
+            return False
+        self._indeks_tag.setdefault(tag, set()).add(foto.id)
+        self._beri_tahu("tag+", foto, tag)
+        return True
+
+    def hapus_tag(self, foto, tag):
+        """Removes tag from foto and from the index. Returns False if foto didn't have it."""
+        if not foto.hapus_tag(tag):
+            return False
+        ids = self._indeks_tag[tag]
+        ids.discard(foto.id)
+        if not ids:
+            del self._indeks_tag[tag]
+        self._beri_tahu("tag-", foto, tag)
+        return True
+
+    def tambah_tag_banyak(self, daftar_foto, tag):
+        """Adds tag to every photo in daftar_foto in one pass; returns the photos that changed."""
+        tag = normalisasi_tag(tag)
+        if not tag:
+            return []
+        berubah = [foto for foto in daftar_foto if foto.tambah_tag(tag)]
+        if berubah:
+            self._indeks_tag.setdefault(tag, set()).update(foto.id for foto in berubah)
+        for foto in berubah:
+            self._beri_tahu("tag+", foto, tag)
+        return berubah
+
+    def hapus_tag_banyak(self, daftar_foto, tag):
+        """Removes tag from every photo in daftar_foto in one pass; returns the photos that changed."""
+        berubah = [foto for foto in daftar_foto if foto.hapus_tag(tag)]
+        if berubah:
+            ids = self._indeks_tag[tag]
+            ids.difference_update(foto.id for foto in berubah)
+            if not ids:
+                del self._indeks_tag[tag]
+        for foto in berubah:
+            self._beri_tahu("tag-", foto, tag)
+        return berubah
+
+    def hapus_tag_dari_semua(self, tag):
+        """Removes tag from every photo that has it; returns those photos."""
+        # The index says every one of these photos carries the tag: drop its id from
+        # their tuples directly instead of a lookup and bisect per photo (Foto.hapus_tag).
+        id_tag = TABEL_TAG.cari_id(tag)
+        terdampak = [self._foto_per_id[i] for i in sorted(self._indeks_tag.pop(tag, ()))]
+        for foto in terdampak:
+            tag_ids = foto._tag_ids
+            posisi = tag_ids.index(id_tag)
+            foto._tag_ids = tag_ids[:posisi] + tag_ids[posisi + 1:]
+        self._beri_tahu("tag-semua", None, tag)
+        return terdampak
+
+    def ids_dengan_tag(self, tag):
+        """Ids of the photos carrying tag (a live set; do not modify)."""
+        return self._indeks_tag.get(tag, frozenset())
+
+    def foto_dengan_tag(self, tag):
+        """Photos carrying tag, in collection order."""
+        return [self._foto_per_id[i] for i in sorted(self.ids_dengan_tag(tag))]
+
+    def index_cocok_pola(self, pola):
+        """Positions of the photos whose file name matches the glob pola (case-insensitive)."""
+        return index_cocok_pola(self._foto, pola)
+
+    def jumlah_tag(self, tag):
+        """Number of photos carrying tag (the tag's reference count)."""
+        return len(self._indeks_tag.get(tag, ()))
+
+    @property
+    def tag_unik(self):
+        """Every tag used by at least one photo (a live view of the index keys)."""
+        return self._indeks_tag.keys()
+
+    def bangun_ulang_indeks(self):
+        """Rebuilds the index from Foto.tags, for tags edited outside this class."""
+        self._indeks_tag = {}
+        for foto in self._foto:
+            for tag in foto.tags:
+                self._indeks_tag.setdefault(tag, set()).add(foto.id)
+
+
+class TampilanKoleksi:
+    """A review order over a KoleksiFoto: some or all of its photos, in any order.
+
+    Indexes like the collection itself (len, [i], iteration), so navigation code can
+    walk either one.
+    """
+    def __init__(self, daftar_foto):
+        self._foto = list(daftar_foto)
+
+    def __len__(self):
+        return len(self._foto)
+
+    def __getitem__(self, index):
+        return self._foto[index]
+
+    def __iter__(self):
+        return iter(self._foto)
+
+    def __bool__(self):
+        return bool(self._foto)
+
+    def index_cocok_pola(self, pola):
+        return index_cocok_pola(self._foto, pola)
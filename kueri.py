@@ -0,0 +1,299 @@
+import re
+from collections import OrderedDict
+
+from koleksi import index_cocok_pola, normalisasi_tag
+
+# ===============================================
+# TAG QUERIES (BOOLEAN EXPRESSIONS OVER THE TAG INDEX)
+# ===============================================
+#
+#   Wedding AND Portrait AND NOT Rejected
+#   (Ceremony OR Reception) AND NOT "Blurry shot"
+#
+# AND, OR and NOT are case-insensitive (&, | and ! work too); NOT binds tightest,
+# then AND, then OR. Consecutive words form one tag ("Golden hour"); quote a tag
+# that contains a keyword or a parenthesis. Tags are normalised like everywhere
+# else, so "wedding" finds "Wedding".
+#
+# A parsed query is a nested tuple: ("tag", name), ("not", x), ("and", (x, y, ...))
+# or ("or", (x, y, ...)). Tuples are hashable, so equivalent spellings share a cache entry.
+
+KATA_KUNCI = {"and": "and", "&": "and", "or": "or", "|": "or", "not": "not", "!": "not"}
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([&|!])|([^\s()"&|!]+))')
+
+# Results kept by MesinKueri (least recently used dropped first).
+BATAS_CACHE = 64
+
+
+def _token(teks):
+    """Yields (jenis, nilai, posisi): jenis is "(", ")", "and", "or", "not", "kata" (a bare
+    word) or "dikutip" (a quoted tag)."""
+    posisi = 0
+    teks = teks.rstrip()
+    while posisi < len(teks):
+        cocok = _TOKEN.match(teks, posisi)
+        if cocok is None:
+            kutip = teks.index('"', posisi)
+            raise ValueError(f"Unclosed quote at position {kutip + 1}")
+        buka, tutup, dikutip, simbol, kata = cocok.groups()
+        awal = cocok.start(cocok.lastindex)
+        if buka or tutup:
+            yield buka or tutup, None, awal
+        elif dikutip is not None:
+            yield "dikutip", dikutip, awal
+        elif simbol:
+            yield KATA_KUNCI[simbol], None, awal
+        elif kata.lower() in KATA_KUNCI:
+            yield KATA_KUNCI[kata.lower()], None, awal
+        else:
+            yield "kata", kata, awal
+        posisi = cocok.end()
+
+
+class _Pengurai:
+    """Recursive-descent parser: or := and (OR and)*, and := not (AND not)*,
+    not := NOT not | ( or ) | tag."""
+    def __init__(self, teks):
+        self.token = list(_token(teks))
+        self.posisi = 0
+
+    def lihat(self):
+        return self.token[self.posisi][0] if self.posisi < len(self.token) else None
+
+    def ambil(self):
+        token = self.token[self.posisi]
+        self.posisi += 1
+        return token
+
+    def galat(self, pesan):
+        if self.posisi < len(self.token):
+            return ValueError(f"{pesan} at position {self.token[self.posisi][2] + 1}")
+        return ValueError(f"{pesan} at the end of the query")
+
+    def urai(self):
+        if not self.token:
+            raise ValueError("Empty query")
+        hasil = self.atau()
+        if self.lihat() is not None:
+            raise self.galat("Unexpected input")
+        return hasil
+
+    def atau(self):
+        anak = [self.dan()]
+        while self.lihat() == "or":
+            self.ambil()
+            anak.append(self.dan())
+        return _gabung("or", anak)
+
+    def dan(self):
+        anak = [self.tidak()]
+        while self.lihat() == "and":
+            self.ambil()
+            anak.append(self.tidak())
+        return _gabung("and", anak)
+
+    def tidak(self):
+        jenis = self.lihat()
+        if jenis == "not":
+            self.ambil()
+            isi = self.tidak()
+            # NOT NOT x is x.
+            return isi[1] if isi[0] == "not" else ("not", isi)
+        if jenis == "(":
+            self.ambil()
+            isi = self.atau()
+            if self.lihat() != ")":
+                raise self.galat("Missing ')'")
+            self.ambil()
+            return isi
+        if jenis in ("kata", "dikutip"):
+            kata = [self.ambil()[1]]
+            while jenis == "kata" and self.lihat() == "kata":
+                kata.append(self.ambil()[1])
+            tag = normalisasi_tag(" ".join(kata))
+            if not tag:
+                raise self.galat("Empty tag")
+            return ("tag", tag)
+        raise self.galat("Expected a tag")
+
+
+def _gabung(operator, anak):
+    """("and"/"or", children) with nested same-operator nodes flattened and duplicates dropped."""
+    datar = []
+    for node in anak:
+        for isi in (node[1] if node[0] == operator else (node,)):
+            if isi not in datar:
+                datar.append(isi)
+    return datar[0] if len(datar) == 1 else (operator, tuple(datar))
+
+
+def urai_kueri(teks):
+    """Parses a tag expression; raises ValueError with the position of the problem."""
+    return _Pengurai(teks).urai()
+
+
+def teks_kueri(node, _induk=None):
+    """Canonical text of a parsed query, e.g. 'Wedding AND NOT Rejected'."""
+    jenis = node[0]
+    if jenis == "tag":
+        nama = node[1]
+        perlu_kutip = any(bagian.lower() in KATA_KUNCI or not re.fullmatch(r'[^\s()"&|!]+', bagian)
+                          for bagian in nama.split(" "))
+        return f'"{nama}"' if perlu_kutip else nama
+    if jenis == "not":
+        return "NOT " + teks_kueri(node[1], "not")
+    teks = f" {jenis.upper()} ".join(teks_kueri(anak, jenis) for anak in node[1])
+    # Only OR inside AND/NOT, or any operator inside NOT, needs parentheses.
+    return f"({teks})" if _induk == "not" or (_induk == "and" and jenis == "or") else teks
+
+
+def tag_kueri(node):
+    """Every tag name a parsed query refers to."""
+    if node[0] == "tag":
+        return {node[1]}
+    if node[0] == "not":
+        return tag_kueri(node[1])
+    return set().union(*(tag_kueri(anak) for anak in node[1]))
+
+
+def cocok_kueri(node, foto):
+    """Whether a single photo matches (used to update cached results one photo at a time)."""
+    jenis = node[0]
+    if jenis == "tag":
+        return foto.punya_tag(node[1])
+    if jenis == "not":
+        return not cocok_kueri(node[1], foto)
+    if jenis == "and":
+        return all(cocok_kueri(anak, foto) for anak in node[1])
+    return any(cocok_kueri(anak, foto) for anak in node[1])
+
+
+def _evaluasi(node, koleksi):
+    """Ids matching node. May return one of the collection's live index sets: callers
+    that keep or modify the result copy it first."""
+    jenis = node[0]
+    if jenis == "tag":
+        return koleksi.ids_dengan_tag(node[1])
+    if jenis == "not":
+        return koleksi.ids_semua - _evaluasi(node[1], koleksi)
+    if jenis == "or":
+        return set().union(*(_evaluasi(anak, koleksi) for anak in node[1]))
+
+    # AND: intersect the positive terms smallest first, then subtract the negated
+    # ones, so "A AND NOT B" never materialises the complement of B.
+    positif = sorted((_evaluasi(anak, koleksi) for anak in node[1] if anak[0] != "not"), key=len)
+    negatif = [anak[1] for anak in node[1] if anak[0] == "not"]
+    hasil = set(positif[0]).intersection(*positif[1:]) if positif else set(koleksi.ids_semua)
+    for anak in negatif:
+        if not hasil:
+            break
+        hasil -= _evaluasi(anak, koleksi)
+    return hasil
+
+
+def evaluasi_kueri(node, koleksi):
+    """Set of the ids of the photos in koleksi matching a parsed query (a new set)."""
+    hasil = _evaluasi(node, koleksi)
+    return set(hasil) if node[0] == "tag" else hasil
+
+
+class HasilKueri:
+    """Photos matching a query, in collection order, as a read-only sequence.
+
+    Holds the sorted ids only and looks the photos up in the collection on access,
+    so a filter over a large collection costs one int per match. Indexes like
+    KoleksiFoto and TampilanKoleksi, so navigation code can walk it the same way.
+    """
+    def __init__(self, koleksi, ids):
+        self._koleksi = koleksi
+        self._ids = sorted(ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._koleksi.foto_dengan_id(i) for i in self._ids[index]]
+        return self._koleksi.foto_dengan_id(self._ids[index])
+
+    def __iter__(self):
+        return map(self._koleksi.foto_dengan_id, self._ids)
+
+    def __bool__(self):
+        return bool(self._ids)
+
+    def index_cocok_pola(self, pola):
+        return index_cocok_pola(self, pola)
+
+
+class MesinKueri:
+    """Evaluates tag queries against a KoleksiFoto and caches the results.
+
+    Registered as a collection listener, it keeps cached results exact without
+    re-evaluating them: a tag added to or removed from one photo re-tests that photo
+    against the cached queries using that tag, new photos are tested against every
+    cached query and removed photos are dropped from all of them. Only "tag-semua"
+    (a criteria tag deleted everywhere) evicts the queries that use the tag.
+    """
+    def __init__(self, koleksi, batas_cache=BATAS_CACHE):
+        self.koleksi = koleksi
+        self.batas_cache = batas_cache
+        self._cache = OrderedDict()   # node -> set of ids
+        self._tag = {}                # node -> tags it refers to
+        koleksi.tambah_pengamat(self.pengamat_koleksi)
+
+    def lepas(self):
+        """Stops following the collection (and drops the cache)."""
+        self.koleksi.hapus_pengamat(self.pengamat_koleksi)
+        self.kosongkan()
+
+    def kosongkan(self):
+        """Drops every cached result, e.g. after KoleksiFoto.bangun_ulang_indeks()."""
+        self._cache.clear()
+        self._tag.clear()
+
+    def ids(self, kueri):
+        """Ids matching kueri (text or parsed); a cached set, do not modify."""
+        node = urai_kueri(kueri) if isinstance(kueri, str) else kueri
+        hasil = self._cache.get(node)
+        if hasil is not None:
+            self._cache.move_to_end(node)
+            return hasil
+
+        hasil = self._cache[node] = evaluasi_kueri(node, self.koleksi)
+        self._tag[node] = tag_kueri(node)
+        if len(self._cache) > self.batas_cache:
+            lama, _ = self._cache.popitem(last=False)
+            del self._tag[lama]
+        return hasil
+
+    def hasil(self, kueri):
+        """The matching photos as a HasilKueri (a snapshot: later tag changes do not move it)."""
+        return HasilKueri(self.koleksi, self.ids(kueri))
+
+    def jumlah(self, kueri):
+        return len(self.ids(kueri))
+
+    def pengamat_koleksi(self, jenis, foto, tag):
+        """Listener for KoleksiFoto.tambah_pengamat: keeps the cached results current."""
+        if not self._cache:
+            return
+        if jenis in ("tag+", "tag-"):
+            for node, ids in self._cache.items():
+                if tag in self._tag[node]:
+                    if cocok_kueri(node, foto):
+                        ids.add(foto.id)
+                    else:
+                        ids.discard(foto.id)
+        elif jenis == "foto+":
+            for node, ids in self._cache.items():
+                if cocok_kueri(node, foto):
+                    ids.add(foto.id)
+        elif jenis == "foto-":
+            for ids in self._cache.values():
+                ids.discard(foto.id)
+        elif jenis == "tag-semua":
+            for node in [node for node, tags in self._tag.items() if tag in tags]:
+                del self._cache[node]
+                del self._tag[node]
@@ -0,0 +1,155 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import ExifTags, Image
+
+from koleksi import MetadataFoto
+
+# ===============================================
+# EXIF METADATA (HEADER-ONLY READS, CACHED BY STAT)
+# ===============================================
+
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_ORIENTASI = 0x0112
+TAG_DATETIME = 0x0132
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_ISO = 0x8827
+TAG_LENS_MODEL = 0xA434
+
+
+def _teks(nilai):
+    """EXIF strings are often NUL-padded; empty ones become None."""
+    if isinstance(nilai, bytes):
+        nilai = nilai.decode("utf-8", "replace")
+    if not isinstance(nilai, str):
+        return None
+    return nilai.replace("\x00", "").strip() or None
+
+
+def _waktu(nilai):
+    """"2024:05:01 10:22:03" -> "2024-05-01 10:22:03" (sorts as text), None if malformed."""
+    nilai = _teks(nilai)
+    if not nilai or len(nilai) < 19 or not nilai[:4].isdigit():
+        return None
+    return nilai[:4] + "-" + nilai[5:7] + "-" + nilai[8:10] + nilai[10:19]
+
+
+def baca_exif(img):
+    """img.getexif() without decoding pixels.
+
+    For a PNG whose header has no eXIf chunk, Pillow would load the whole image to look
+    for one after the pixel data; such a PNG is treated as having no EXIF instead.
+    """
+    if img.format == "PNG" and "exif" not in img.info:
+        return Image.Exif()
+    return img.getexif()
+
+
+def baca_metadata(path):
+    """Returns the MetadataFoto of the image at path.
+
+    Image.open only parses the header (pixels are decoded lazily and never here), so
+    this reads a few KB of a JPEG regardless of its resolution.
+    """
+    with Image.open(path) as img:
+        exif = baca_exif(img)
+        ifd_exif = exif.get_ifd(ExifTags.IFD.Exif)
+        lebar, tinggi = img.size
+
+    orientasi = exif.get(TAG_ORIENTASI, 1)
+    if orientasi in (5, 6, 7, 8):
+        lebar, tinggi = tinggi, lebar
+
+    make, model = _teks(exif.get(TAG_MAKE)), _teks(exif.get(TAG_MODEL))
+    if make and model and model.lower().startswith(make.split()[0].lower()):
+        # "Canon" + "Canon EOS R6" -> "Canon EOS R6"
+        make = None
+    kamera = " ".join(bagian for bagian in (make, model) if bagian) or None
+
+    iso = ifd_exif.get(TAG_ISO)
+    if isinstance(iso, tuple):
+        iso = iso[0] if iso else None
+
+    return MetadataFoto(
+        waktu=_waktu(ifd_exif.get(TAG_DATETIME_ORIGINAL)) or _waktu(exif.get(TAG_DATETIME)),
+        kamera=kamera,
+        lensa=_teks(ifd_exif.get(TAG_LENS_MODEL)),
+        iso=int(iso) if isinstance(iso, (int, float)) else None,
+        lebar=lebar,
+        tinggi=tinggi,
+        orientasi=orientasi,
+    )
+
+
+def kunci_stat(path):
+    """(size, mtime_ns) of path: a cached entry is valid while this is unchanged."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PembacaMetadata:
+    """Reads metadata of photos on a thread pool, off the Tk thread.
+
+    cache is {path_lengkap: ((size, mtime_ns), MetadataFoto)}, e.g. SesiDB.muat_meta();
+    a file whose stat still matches is not opened at all. Results are collected with
+    ambil_hasil() as (foto, meta, kunci) tuples, where kunci is the new (size, mtime_ns)
+    for freshly read entries (to be persisted) and None for cache hits.
+    """
+    def __init__(self, cache=None, jumlah_worker=4):
+        self.cache = cache if cache is not None else {}
+        self._executor = ThreadPoolExecutor(max_workers=jumlah_worker, thread_name_prefix="metadata")
+        self._hasil = queue.Queue()
+        self._jumlah_antri = 0
+        self._lock = threading.Lock()
+        self._tutup = False
+
+    def minta(self, daftar_foto):
+        """Queues daftar_foto (one task per call, so pass photos in batches)."""
+        daftar_foto = list(daftar_foto)
+        if not daftar_foto or self._tutup:
+            return
+        with self._lock:
+            self._jumlah_antri += 1
+        self._executor.submit(self._kerjakan, daftar_foto)
+
+    @property
+    def sibuk(self):
+        """True while requested photos are still being read or their results not collected."""
+        return self._jumlah_antri > 0 or not self._hasil.empty()
+
+    def ambil_hasil(self):
+        hasil = []
+        while True:
+            try:
+                hasil.append(self._hasil.get_nowait())
+            except queue.Empty:
+                return hasil
+
+    def _kerjakan(self, daftar_foto):
+        try:
+            for foto in daftar_foto:
+                if self._tutup:
+                    return
+                path = foto.path_lengkap
+                try:
+                    kunci = kunci_stat(path)
+                    tersimpan = self.cache.get(path)
+                    if tersimpan is not None and tuple(tersimpan[0]) == kunci:
+                        self._hasil.put((foto, tersimpan[1], None))
+                        continue
+                    meta = baca_metadata(path)
+                except Exception:
+                    # Unreadable header: the photo simply has no metadata.
+                    continue
+                self._hasil.put((foto, meta, kunci))
+        finally:
+            with self._lock:
+                self._jumlah_antri -= 1
+
+    def tutup(self):
+        """Stops reading; queued batches are dropped."""
+        self._tutup = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
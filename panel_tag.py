@@ -0,0 +1,122 @@
+import tkinter as tk
+from tkinter import ttk
+
+# ===============================================
+# POOLED TAG PANELS (NO DESTROY-AND-REBUILD)
+# ===============================================
+
+class _BarisTag:
+    __slots__ = ("frame", "utama", "tag")
+
+
+class DaftarTag:
+    """A column of tag rows (tag + "X" button) whose widgets are reused, not recreated.
+
+    perbarui() only records the wanted tags; the widgets are touched once, on the next
+    idle tick, however many updates came in before it. Row i always shows the i-th tag,
+    so a change reconfigures just the rows whose text differs. Surplus rows are
+    unpacked and kept for later.
+    """
+    def __init__(self, master, teks_kosong, aksi_hapus, aksi_klik=None, opsi_frame=None):
+        """aksi_hapus(tag) runs on "X"; with aksi_klik(tag) the tag itself is a button."""
+        self.master = master
+        self.aksi_hapus = aksi_hapus
+        self.aksi_klik = aksi_klik
+        self.opsi_frame = opsi_frame or {}
+
+        self.label_kosong = ttk.Label(master, text=teks_kosong)
+        self._baris = []
+        self._jumlah_tampil = 0
+        self._tertunda = None
+        self._terjadwal = False
+
+    def perbarui(self, tags):
+        """Schedules the panel to show tags (in the given order)."""
+        self._tertunda = list(tags)
+        if not self._terjadwal:
+            self._terjadwal = True
+            self.master.after_idle(self._terapkan)
+
+    def _buat_baris(self):
+        baris = _BarisTag()
+        baris.tag = None
+        baris.frame = ttk.Frame(self.master, **self.opsi_frame)
+
+        if self.aksi_klik is not None:
+            baris.utama = ttk.Button(baris.frame, style='Tag.TButton', command=lambda: self.aksi_klik(baris.tag))
+        else:
+            baris.utama = ttk.Label(baris.frame, padding=3)
+        baris.utama.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        ttk.Button(baris.frame,
+                   text="X",
+                   width=3,
+                   style='Danger.TButton',
+                   command=lambda: self.aksi_hapus(baris.tag)
+                   ).pack(side=tk.RIGHT)
+        return baris
+
+    def _terapkan(self):
+        self._terjadwal = False
+        tags = self._tertunda
+
+        if tags:
+            self.label_kosong.pack_forget()
+        elif self._jumlah_tampil or not self.label_kosong.winfo_manager():
+            self.label_kosong.pack(anchor='w', padx=5, pady=5)
+
+        while len(self._baris) < len(tags):
+            self._baris.append(self._buat_baris())
+
+        for i, tag in enumerate(tags):
+            baris = self._baris[i]
+            if baris.tag != tag:
+                baris.tag = tag
+                baris.utama.config(text=tag)
+            if i >= self._jumlah_tampil:
+                baris.frame.pack(fill=tk.X, pady=2, padx=2)
+
+        for baris in self._baris[len(tags):self._jumlah_tampil]:
+            baris.frame.pack_forget()
+        self._jumlah_tampil = len(tags)
+
+
+class MenuTag:
+    """Keeps an OptionMenu's entries in sync with a tag set, editing only what changed.
+
+    Like DaftarTag, updates are coalesced to one per idle tick. The entries are sorted,
+    so only the tail after the first difference is replaced (a new tag that sorts last
+    costs one add_command).
+    """
+    def __init__(self, option_menu, var, teks_default):
+        self.option_menu = option_menu
+        self.var = var
+        self.teks_default = teks_default
+        self._opsi = [teks_default]
+        self._sumber = ()
+        self._terjadwal = False
+
+    def perbarui(self, tags):
+        """Schedules the menu to list tags; tags may be a live view, it is read when applied."""
+        self._sumber = tags
+        if not self._terjadwal:
+            self._terjadwal = True
+            self.option_menu.after_idle(self._terapkan)
+
+    def _terapkan(self):
+        self._terjadwal = False
+        opsi = [self.teks_default] + sorted(self._sumber)
+
+        sama = 0
+        while sama < min(len(opsi), len(self._opsi)) and opsi[sama] == self._opsi[sama]:
+            sama += 1
+
+        if sama < len(opsi) or sama < len(self._opsi):
+            menu = self.option_menu["menu"]
+            menu.delete(sama, "end")
+            for tag in opsi[sama:]:
+                menu.add_command(label=tag, command=tk._setit(self.var, tag))
+            self._opsi = opsi
+
+        if self.var.get() not in opsi:
+            self.var.set(self.teks_default)
@@ -0,0 +1,31 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ===============================================
+# PROCESS POOL FOR PER-PHOTO PIXEL ANALYSIS
+# ===============================================
+
+# Paths per task sent to a worker process; large enough to amortize the IPC.
+UKURAN_CHUNK = 64
+
+
+def petakan_per_chunk(fungsi_chunk, daftar, jumlah_proses, batal, saat_hasil, ukuran_chunk=UKURAN_CHUNK):
+    """Runs fungsi_chunk(list) over chunks of daftar in a process pool.
+
+    saat_hasil(awal, hasil) is called in the calling thread as each chunk finishes (in
+    any order), awal being the chunk's offset in daftar. fungsi_chunk must be a
+    module-level function. Returns False if batal (an Event) stopped the run early.
+    """
+    # "spawn" so the workers don't inherit the GUI's threads and Tk state via fork().
+    konteks = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jumlah_proses, mp_context=konteks) as executor:
+        futures = {}
+        for awal in range(0, len(daftar), ukuran_chunk):
+            futures[executor.submit(fungsi_chunk, daftar[awal:awal + ukuran_chunk])] = awal
+
+        for future in as_completed(futures):
+            if batal.is_set():
+                executor.shutdown(wait=False, cancel_futures=True)
+                return False
+            saat_hasil(futures[future], future.result())
+    return True
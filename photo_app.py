@@ -2,71 +2,162 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import filedialog
 import os 
-import shutil 
 import random
-from PIL import Image, ImageTk 
+import sqlite3
+import time
+from PIL import Image
 
-# ===============================================
-# BAGIAN 1: DEFINISI CLASS FOTO (OBJECT)
-# ===============================================
+from koleksi import Foto, KoleksiFoto, TampilanKoleksi
+from preview import KUALITAS_CEPAT, KUALITAS_TINGGI, PreviewCache, PreviewPrefetcher, load_preview
+from thumbstore import ThumbnailStore
+from importer import ImportWorker
+from session_db import SesiDB
+from exporter import MODE_HARDLINK, MODE_REFLINK, MODE_SALIN, ExportJob, folder_ekspor_kueri, folder_ekspor_tag
+from filmstrip import Filmstrip
+from gambar_tk import GambarTk
+from panel_tag import DaftarTag, MenuTag
+from duplikat import AnalisisDuplikat
+from skor import MODE_TINJAU, MODE_URUTAN_FOLDER, PenilaianFoto, urutan_tinjau
+from metadata import PembacaMetadata
+from sinkron import SinkronFolder
+from pustaka import lengkapi_opsi_pindai
+from kueri import HasilKueri, MesinKueri, teks_kueri, urai_kueri
+from instrumen import catat_durasi, diukur, rentang
 
-class Foto:
-    """Blueprint for a Photo object (Model Data)."""
-    def __init__(self, nama_file, path_lengkap, tags=[]):
-        self.nama_file = nama_file
-        self.path_lengkap = path_lengkap 
-        self.tags = list(tags)
-
-    def tambah_tag(self, tag_baru):
-        """Method to add a tag to the photo."""
-        tag_baru = tag_baru.strip().capitalize()
-        if tag_baru and tag_baru not in self.tags:
-            self.tags.append(tag_baru)
-            self.tags.sort() 
-            return True
-        return False
-    
-    def hapus_tag(self, tag_yang_dihapus):
-        """Method to remove a tag from the photo."""
-        if tag_yang_dihapus in self.tags:
-            self.tags.remove(tag_yang_dihapus)
-            return True
-        return False
-
-    def get_info(self):
-        """Returns basic information string (Tags are displayed separately)."""
-        return (f"File: {self.nama_file}\n")
-    
 # ===============================================
 # BAGIAN 2: DEFINISI CLASS PHOTOAPP (GUI APPLICATION & COLLECTION LOGIC)
 # ===============================================
 
 class PhotoApp:
-    def __init__(self, master):
+    # Navigation faster than this counts as scrolling (fast previews); once the cursor
+    # has rested this long the current photo is re-rendered in full quality.
+    SETTLE_MS = 200
+    # Background decodes of the photo on screen are polled this often; window resizes
+    # re-render once they have stopped for RESIZE_MS.
+    RENDER_POLL_MS = 15
+    RESIZE_MS = 150
+    IMPORT_POLL_MS = 50
+    META_POLL_MS = 100
+    # Failing session writes (retried by SesiDB) are checked for this often.
+    SESI_POLL_MS = 1000
+    # The folder watcher re-scans the imported folder this often (when switched on).
+    PANTAU_MS = 3000
+    EXPORT_POLL_MS = 200
+    # Warnings from background work stay in the status bar this long.
+    PESAN_MS = 8000
+    EXPORT_WORKERS = 4
+    # Review orders on top of skor.MODE_TINJAU, and the camera filter's "no filter" entry.
+    MODE_WAKTU_AMBIL = "Waktu pengambilan"
+    SEMUA_KAMERA = "Semua kamera"
+    TANPA_KAMERA = "Kamera tidak diketahui"
+
+    def __init__(self, master, cache_mb=256, prefetch_radius=3, kualitas_pratinjau="otomatis"):
         self.master = master
         master.title("Photo Tagging System (Klasifikasi Foto)")
         master.geometry("1200x800") 
 
-        self.koleksi_foto = []
+        self.koleksi_foto = KoleksiFoto()
+        # Review order that navigation walks: the collection itself, or a sorted/filtered
+        # TampilanKoleksi of it. index_foto_saat_ini and filmstrip positions refer to it.
+        self.tampilan_foto = self.koleksi_foto
         self.index_foto_saat_ini = 0
-        self.foto_tk = None 
+        # Tk images of the preview label, pasted into rather than re-created (gambar_tk.py).
+        self.gambar_tk = None
+        
+        # Tag-expression filter (kueri.py): the parsed query narrowing the review order,
+        # or None. Results are cached by the engine and kept current as tags change.
+        self.mesin_kueri = MesinKueri(self.koleksi_foto)
+        self.kueri_aktif = None
+        
+        # Decoded previews are cached (LRU, bounded by cache_mb) and the next/previous
+        # prefetch_radius photos are prepared in the background while the user reviews.
+        self.preview_cache = PreviewCache(batas_byte=cache_mb * 1024 * 1024)
+        self.prefetcher = PreviewPrefetcher(self.preview_cache)
+        self.prefetch_radius = prefetch_radius
+        self.arah_navigasi = 1
+        
+        # "otomatis" switches between fast and high quality; KUALITAS_CEPAT/KUALITAS_TINGGI pin it.
+        self.kualitas_pratinjau = kualitas_pratinjau
+        self.waktu_navigasi_terakhir = 0.0
+        self.sedang_scroll = False
+        self._after_settle = None
+        
+        # Only the latest render request counts: older ones see a stale token and stop.
+        # The frame on screen (path, PIL image, box) doubles as the stand-in while the
+        # next frame of the same photo (resize, full quality) decodes.
+        self._token_render = 0
+        self._sumber_tampil = None
+        self._ukuran_area = None
+        self._after_resize = None
+        # When the current navigation started, until its first frame is on screen (instrumen.py).
+        self._waktu_navigasi = None
+        
+        # Persistent thumbnails in a sidecar file next to the imported folder (see thumbstore.py).
+        self.thumb_store = None
+        
+        # Tags and criteria survive restarts in the folder's session database (session_db.py).
+        self.sesi = None
+        self.tag_tersimpan = {}
+        self.skor_tersimpan = {}
+        self.meta_tersimpan = {}
+        
+        # EXIF headers are read in the background as photos arrive (see metadata.py).
+        self.pembaca_meta = None
+        
+        # Background folder scan / export in progress (see importer.py, exporter.py),
+        # polled from the Tk loop.
+        self.import_worker = None
+        self.export_job = None
+        self.analisis_job = None
+        self.penilaian_job = None
+        
+        # The imported folder and its scan options, for incremental re-scans (sinkron.py).
+        # opsi_import_tersimpan are those of the last complete import, also kept in the
+        # session as "opsi_pindai" (see pustaka.PustakaFoto.impor): a re-scan with other
+        # options removes nothing. A re-scan started by the watcher runs silently (sinkron_diam).
+        self.folder_aktif = None
+        self.opsi_import_aktif = {}
+        self.opsi_import_tersimpan = None
+        self.sinkron_job = None
+        self.sinkron_diam = False
+        self._meta_dipantau = False
         
         self.kriteria_tag_list = set() 
-        self.tag_unik_koleksi = set() 
         self.kelompok_tag_var = tk.StringVar(self.master)
         
+        self.buat_status_bar()
         self.buat_layar_utama()
         self.buat_beranda()
         
         self.tampilkan_layar(self.frame_beranda)
         
         self.binding_keyboard()
+        master.protocol("WM_DELETE_WINDOW", self.aksi_tutup_aplikasi)
+
 
+    def aksi_tutup_aplikasi(self):
+        """Stops background workers before closing the window."""
+        if self.import_worker is not None:
+            self.import_worker.batalkan()
+        if self.export_job is not None:
+            self.export_job.batalkan()
+        if self.analisis_job is not None:
+            self.analisis_job.batalkan()
+        if self.penilaian_job is not None:
+            self.penilaian_job.batalkan()
+        if self.sinkron_job is not None:
+            self.sinkron_job.batalkan()
+        self.prefetcher.shutdown()
+        self.tutup_pembaca_meta()
+        self.tutup_thumb_store()
+        self.tutup_sesi()
+        self.master.destroy()
 
     # --- Keyboard Binding Method (Shortcut) ---
     def binding_keyboard(self):
         self.master.bind("<Right>", lambda event: self.selanjutnya())
         self.master.bind("<Left>", lambda event: self.sebelumnya())
+        self.master.bind("<Escape>", lambda event: self.aksi_batal_progres())
 
 
     # --- Screen Transition Method ---
@@ -92,6 +183,46 @@ class PhotoApp:
                    style='Accent.TButton' 
                    ).pack(pady=30, ipadx=20, ipady=10)
         
+        # --- Import Options ---
+        frame_opsi = ttk.LabelFrame(self.frame_beranda, text="Opsi Impor", padding=10)
+        frame_opsi.pack(pady=10)
+        
+        self.opsi_rekursif_var = tk.BooleanVar(self.master, value=False)
+        ttk.Checkbutton(frame_opsi, text="Sertakan subfolder", variable=self.opsi_rekursif_var).grid(row=0, column=0, sticky='w')
+        
+        ttk.Label(frame_opsi, text="Kedalaman maks (0 = tanpa batas):").grid(row=0, column=1, sticky='e', padx=(20, 5))
+        self.opsi_kedalaman_var = tk.StringVar(self.master, value="0")
+        ttk.Spinbox(frame_opsi, from_=0, to=99, width=5, textvariable=self.opsi_kedalaman_var).grid(row=0, column=2, sticky='w')
+        
+        ttk.Label(frame_opsi, text="Sertakan hanya (glob, pisahkan koma):").grid(row=1, column=0, sticky='w', pady=(8, 0))
+        self.opsi_include_var = tk.StringVar(self.master)
+        ttk.Entry(frame_opsi, textvariable=self.opsi_include_var, width=30).grid(row=1, column=1, columnspan=2, sticky='we', pady=(8, 0))
+        
+        ttk.Label(frame_opsi, text="Kecualikan (glob, pisahkan koma):").grid(row=2, column=0, sticky='w', pady=(4, 0))
+        self.opsi_exclude_var = tk.StringVar(self.master)
+        ttk.Entry(frame_opsi, textvariable=self.opsi_exclude_var, width=30).grid(row=2, column=1, columnspan=2, sticky='we', pady=(4, 0))
+        
+        self.opsi_magic_var = tk.BooleanVar(self.master, value=False)
+        ttk.Checkbutton(frame_opsi, text="Periksa isi file (tolak file yang bukan gambar)", 
+                        variable=self.opsi_magic_var).grid(row=3, column=0, columnspan=3, sticky='w', pady=(8, 0))
+
+    def opsi_import(self):
+        """Collects the scan options from the Opsi Impor panel for importer.pindai_folder."""
+        kedalaman_maks = 0
+        if self.opsi_rekursif_var.get():
+            try:
+                kedalaman_maks = int(self.opsi_kedalaman_var.get()) or None
+            except ValueError:
+                kedalaman_maks = None
+
+        pisah = lambda teks: [pola.strip() for pola in teks.split(",") if pola.strip()]
+        return {
+            "kedalaman_maks": kedalaman_maks,
+            "include": pisah(self.opsi_include_var.get()),
+            "exclude": pisah(self.opsi_exclude_var.get()),
+            "cek_magic": self.opsi_magic_var.get(),
+        }
+        
     # --- Function/Method to Create Main Screen GUI Elements (3 Columns) ---
     def buat_layar_utama(self):
         self.frame_utama = ttk.Frame(self.master)
@@ -104,7 +235,17 @@ class PhotoApp:
         ttk.Button(self.frame_kontrol, 
                    text="← Kembali ke Import", 
                    command=lambda: self.tampilkan_layar(self.frame_beranda)
-                   ).pack(fill=tk.X, pady=(0, 20))
+                   ).pack(fill=tk.X, pady=(0, 5))
+        
+        # Incremental re-scan of the imported folder (new card dumps keep existing tags)
+        ttk.Button(self.frame_kontrol, 
+                   text="↻ Pindai Ulang Folder", 
+                   command=self.aksi_sinkron_folder).pack(fill=tk.X, pady=2)
+        self.pantau_folder_var = tk.BooleanVar(self.master, value=False)
+        ttk.Checkbutton(self.frame_kontrol, 
+                        text="Pantau file baru otomatis", 
+                        variable=self.pantau_folder_var, 
+                        command=self.aksi_ubah_pantau_folder).pack(anchor='w', pady=(2, 20))
         
         # --- PHOTO CONTROL ---
         ttk.Label(self.frame_kontrol, text="PHOTO CONTROL", font=('Montserrat', 12, 'bold')).pack(anchor='w', pady=(0, 5))
@@ -119,6 +260,36 @@ class PhotoApp:
         ttk.Label(self.frame_kontrol, text="Tag Kriteria yang Tersedia:", font=('Montserrat', 10)).pack(anchor='w', pady=(10, 5))
         self.frame_tag_kriteria_list = ttk.Frame(self.frame_kontrol, padding=5, relief="groove", borderwidth=2)
         self.frame_tag_kriteria_list.pack(fill=tk.X, pady=5)
+        self.daftar_tag_kriteria = DaftarTag(self.frame_tag_kriteria_list, 
+                                             "Tambahkan tag di atas.", 
+                                             aksi_hapus=self.aksi_hapus_kriteria_tag, 
+                                             aksi_klik=self.aksi_terapkan_tag, 
+                                             opsi_frame={"relief": "solid"})
+        
+        # C2. Bulk selection: criteria tags go to every selected photo
+        frame_massal = ttk.LabelFrame(self.frame_kontrol, text="Tag Massal", padding=5)
+        frame_massal.pack(fill=tk.X, pady=5)
+        
+        self.label_pilihan = ttk.Label(frame_massal, wraplength=210)
+        self.label_pilihan.pack(anchor='w')
+        
+        frame_n = ttk.Frame(frame_massal)
+        frame_n.pack(fill=tk.X, pady=2)
+        ttk.Label(frame_n, text="N berikutnya:").pack(side=tk.LEFT)
+        self.pilih_n_var = tk.StringVar(self.master, value="10")
+        ttk.Spinbox(frame_n, from_=1, to=100000, textvariable=self.pilih_n_var, width=6).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_n, text="Pilih", width=5, command=self.aksi_pilih_n_berikutnya).pack(side=tk.RIGHT)
+        
+        frame_pola = ttk.Frame(frame_massal)
+        frame_pola.pack(fill=tk.X, pady=2)
+        ttk.Label(frame_pola, text="Pola nama:").pack(side=tk.LEFT)
+        self.pilih_pola_var = tk.StringVar(self.master, value="*.jpg")
+        entry_pola = ttk.Entry(frame_pola, textvariable=self.pilih_pola_var, width=8)
+        entry_pola.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        entry_pola.bind("<Return>", lambda event: self.aksi_pilih_pola())
+        ttk.Button(frame_pola, text="Pilih", width=5, command=self.aksi_pilih_pola).pack(side=tk.RIGHT)
+        
+        ttk.Button(frame_massal, text="Bersihkan Pilihan", command=self.aksi_bersihkan_pilihan).pack(fill=tk.X, pady=(4, 0))
         
         # D. Navigation
         ttk.Separator(self.frame_kontrol, orient='horizontal').pack(fill=tk.X, pady=10)
@@ -139,6 +310,14 @@ class PhotoApp:
         
         ttk.Label(self.frame_tengah, text="PHOTO REVIEW", font=('Montserrat', 14, 'bold')).pack(pady=5)
         
+        # Thumbnail strip of the whole collection; only the visible cells exist (filmstrip.py).
+        self.filmstrip = Filmstrip(self.frame_tengah,
+                                   ambil_koleksi=lambda: self.tampilan_foto,
+                                   pemuat=lambda path, ukuran: self.prefetcher.pemuat(path, ukuran, KUALITAS_CEPAT),
+                                   saat_klik=self.aksi_klik_filmstrip)
+        self.filmstrip.frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+        self.update_label_pilihan()
+        
         # ## [FIX] Mengganti ttk.Label menjadi tk.Label agar width dan height berfungsi
         self.image_label = tk.Label(self.frame_tengah, 
                                      background="#eeeeee", 
@@ -147,6 +326,8 @@ class PhotoApp:
                                      width=100, 
                                      height=40) 
         self.image_label.pack(padx=10, pady=10, fill=tk.BOTH, expand=True) 
+        self.gambar_tk = GambarTk(self.image_label)
+        self.frame_tengah.bind("<Configure>", self.aksi_ubah_ukuran)
 
 
         # 3. Info Frame (Right)
@@ -159,11 +340,21 @@ class PhotoApp:
         
         self.label_filename = ttk.Label(self.frame_info_kanan, text="File Name: -", wraplength=230)
         self.label_filename.pack(anchor='w', pady=1)
+        
+        self.label_skor = ttk.Label(self.frame_info_kanan, text="Skor: -", wraplength=230)
+        self.label_skor.pack(anchor='w', pady=1)
+        
+        self.label_meta = ttk.Label(self.frame_info_kanan, text="", wraplength=230)
+        self.label_meta.pack(anchor='w', pady=1)
 
         ttk.Label(self.frame_info_kanan, text="Tags Applied:").pack(anchor='w', pady=(5, 1))
 
         self.frame_tag_metadata = ttk.Frame(self.frame_info_kanan)
         self.frame_tag_metadata.pack(fill=tk.X, pady=5)
+        self.daftar_tag_metadata = DaftarTag(self.frame_tag_metadata, 
+                                             "- Belum ada tag -", 
+                                             aksi_hapus=self.aksi_hapus_tag_foto, 
+                                             opsi_frame={"borderwidth": 1, "relief": "solid", "style": 'TagInfo.TFrame'})
         
         # --- PHOTO GROUP ---
         ttk.Separator(self.frame_info_kanan, orient='horizontal').pack(fill=tk.X, pady=10)
@@ -177,68 +368,578 @@ class PhotoApp:
             "Pilih Tag" 
         )
         self.kelompok_tag_dropdown.pack(fill=tk.X, pady=2)
+        self.menu_kelompok_tag = MenuTag(self.kelompok_tag_dropdown, self.kelompok_tag_var, "Pilih Tag")
+        
+        # Export options: how files are written and whether unchanged ones are skipped
+        frame_mode = ttk.Frame(self.frame_info_kanan)
+        frame_mode.pack(fill=tk.X, pady=(8, 2))
+        ttk.Label(frame_mode, text="Mode:").pack(side=tk.LEFT)
+        self.mode_ekspor_var = tk.StringVar(self.master, value=MODE_SALIN)
+        ttk.Combobox(frame_mode, 
+                     textvariable=self.mode_ekspor_var, 
+                     values=(MODE_SALIN, MODE_HARDLINK, MODE_REFLINK), 
+                     state="readonly", 
+                     width=12).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        
+        self.ekspor_inkremental_var = tk.BooleanVar(self.master, value=True)
+        ttk.Checkbutton(self.frame_info_kanan, 
+                        text="Lewati file yang sudah identik", 
+                        variable=self.ekspor_inkremental_var).pack(anchor='w', pady=2)
         
         ttk.Button(self.frame_info_kanan, 
                    text="EXPORT A COPY", 
                    style='Accent.TButton',
-                   command=self.aksi_tombol_kelompokkan).pack(fill=tk.X, pady=10)
+                   command=self.aksi_tombol_kelompokkan).pack(fill=tk.X, pady=(10, 2))
+        ttk.Button(self.frame_info_kanan, 
+                   text="Ekspor Hasil Filter Tag", 
+                   command=self.aksi_ekspor_kueri).pack(fill=tk.X, pady=(2, 10))
+        
+        # --- GROUP SUGGESTIONS (near-duplicates & bursts, see duplikat.py) ---
+        ttk.Separator(self.frame_info_kanan, orient='horizontal').pack(fill=tk.X, pady=10)
+        ttk.Label(self.frame_info_kanan, text="SARAN KELOMPOK", font=('Montserrat', 12, 'bold')).pack(anchor='w', pady=(0, 5))
+        ttk.Button(self.frame_info_kanan, 
+                   text="Cari Duplikat & Burst", 
+                   command=self.aksi_analisis_duplikat).pack(fill=tk.X, pady=2)
+        
+        # --- REVIEW ORDER (sharpness/exposure scores, see skor.py) ---
+        ttk.Separator(self.frame_info_kanan, orient='horizontal').pack(fill=tk.X, pady=10)
+        ttk.Label(self.frame_info_kanan, text="URUTAN TINJAU", font=('Montserrat', 12, 'bold')).pack(anchor='w', pady=(0, 5))
+        ttk.Button(self.frame_info_kanan, 
+                   text="Nilai Ketajaman & Eksposur", 
+                   command=self.aksi_nilai_foto).pack(fill=tk.X, pady=2)
+        self.mode_tinjau_var = tk.StringVar(self.master, value=MODE_URUTAN_FOLDER)
+        combo_tinjau = ttk.Combobox(self.frame_info_kanan, 
+                                    textvariable=self.mode_tinjau_var, 
+                                    values=MODE_TINJAU[:1] + (self.MODE_WAKTU_AMBIL,) + MODE_TINJAU[1:], 
+                                    state="readonly")
+        combo_tinjau.pack(fill=tk.X, pady=2)
+        combo_tinjau.bind("<<ComboboxSelected>>", lambda event: self.aksi_ubah_mode_tinjau())
+        
+        # Camera filter, combined with the review order; the list is filled when opened.
+        self.filter_kamera_var = tk.StringVar(self.master, value=self.SEMUA_KAMERA)
+        self.combo_kamera = ttk.Combobox(self.frame_info_kanan, 
+                                         textvariable=self.filter_kamera_var, 
+                                         values=(self.SEMUA_KAMERA,), 
+                                         state="readonly", 
+                                         postcommand=self.perbarui_pilihan_kamera)
+        self.combo_kamera.pack(fill=tk.X, pady=2)
+        self.combo_kamera.bind("<<ComboboxSelected>>", lambda event: self.aksi_ubah_mode_tinjau())
+        
+        # Tag filter, e.g. "Wedding AND Portrait AND NOT Rejected" (see kueri.py).
+        frame_kueri = ttk.Frame(self.frame_info_kanan)
+        frame_kueri.pack(fill=tk.X, pady=2)
+        ttk.Label(frame_kueri, text="Filter tag:").pack(side=tk.LEFT)
+        self.kueri_var = tk.StringVar(self.master)
+        entry_kueri = ttk.Entry(frame_kueri, textvariable=self.kueri_var, width=12)
+        entry_kueri.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        entry_kueri.bind("<Return>", lambda event: self.aksi_terapkan_kueri())
+        ttk.Button(frame_kueri, text="✕", width=2, command=self.aksi_hapus_kueri).pack(side=tk.RIGHT)
+        ttk.Button(frame_kueri, text="Filter", width=6, command=self.aksi_terapkan_kueri).pack(side=tk.RIGHT, padx=(0, 2))
 
     # ===============================================
     # METHOD PEMELIHARAAN TAG UNIK GLOBAL
     # ===============================================
 
+    @property
+    def tag_unik_koleksi(self):
+        """All unique tags present across ALL photos, maintained by the collection's tag index."""
+        return self.koleksi_foto.tag_unik
+
     def recalculate_unique_collection_tags(self):
-        """Regenerates the set of all unique tags present across ALL photos in the collection."""
-        new_unique_tags = set()
-        for foto in self.koleksi_foto:
-            for tag in foto.tags:
-                new_unique_tags.add(tag)
-        self.tag_unik_koleksi = new_unique_tags
+        """Regenerates the tag index (and so the unique tag set) from scratch."""
+        self.koleksi_foto.bangun_ulang_indeks()
+        self.mesin_kueri.kosongkan()
         
+    # --- Persistent Thumbnail Store ---
+    def buka_thumb_store(self, folder_path):
+        """Serves previews from the folder's thumbnail store; falls back to direct decoding
+        when the sidecar cannot be created (e.g. a read-only share)."""
+        self.tutup_thumb_store()
+        try:
+            self.thumb_store = ThumbnailStore(folder_path)
+            self.prefetcher.pemuat = self.thumb_store.muat_pratinjau
+        except (OSError, sqlite3.Error) as e:
+            self.tampilkan_pesan(f"Thumbnail tidak disimpan (folder .photomanager tidak dapat dibuat): {e}")
+
+    def tutup_thumb_store(self):
+        self.prefetcher.pemuat = load_preview
+        if self.thumb_store is not None:
+            self.thumb_store.close()
+            self.thumb_store = None
+
+    # --- Persistent Tagging Session ---
+    def buka_sesi(self, folder_path):
+        """Opens the folder's session database and restores its criteria tags; the photo
+        tags are re-applied as the import delivers each photo."""
+        self.tutup_sesi()
+        try:
+            self.sesi = SesiDB(folder_path)
+            self.kriteria_tag_list, self.tag_tersimpan = self.sesi.muat()
+            self.skor_tersimpan = self.sesi.muat_skor()
+            self.meta_tersimpan = self.sesi.muat_meta()
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showwarning("Sesi Tidak Tersedia",
+                                   f"Tag dan kriteria untuk folder ini tidak akan disimpan: {e}")
+            if self.sesi is not None:
+                # The database opened but could not be read: stop its writer thread.
+                try:
+                    self.sesi.close()
+                except (OSError, sqlite3.Error):
+                    pass
+                self.sesi = None
+            return
+        self.koleksi_foto.tambah_pengamat(self.sesi.pengamat_koleksi)
+        self.pantau_sesi(self.sesi)
+
+    def pantau_sesi(self, sesi):
+        """Keeps a warning in the status bar while the session's writes fail; SesiDB
+        retries them, so the warning goes away by itself once the disk recovers."""
+        if self.sesi is not sesi:
+            return
+        if sesi.error is not None:
+            self.tampilkan_pesan(f"Sesi belum tersimpan ({sesi.jumlah_tertunda} perubahan menunggu): {sesi.error}")
+        self.master.after(self.SESI_POLL_MS, self.pantau_sesi, sesi)
+
+    def tutup_sesi(self):
+        self.tag_tersimpan = {}
+        self.skor_tersimpan = {}
+        self.meta_tersimpan = {}
+        if self.sesi is not None:
+            self.sesi.close()
+            self.sesi = None
+
     # --- File and Import Logic Method ---
     def aksi_import_folder(self):
-        """Opens folder dialog and loads photos into the collection."""
+        """Opens folder dialog and streams photos into the collection from a background scan."""
+        if self.proses_latar_berjalan():
+            messagebox.showwarning("Warning", "Proses lain masih berjalan. Tunggu hingga selesai atau batalkan.")
+            return
+
         folder_path = filedialog.askdirectory(title="Pilih Folder Foto")
         if not folder_path:
             return
 
-        self.koleksi_foto = [] 
-        self.tag_unik_koleksi = set() 
+        if self.koleksi_foto and os.path.abspath(folder_path) == os.path.abspath(self.folder_aktif or ""):
+            # Same folder again: only pick up what changed, keeping tags and scores.
+            self.opsi_import_aktif = lengkapi_opsi_pindai(self.opsi_import())
+            self.tampilkan_layar(self.frame_utama)
+            self.mulai_sinkron(diam=False)
+            return
+
+        if self.import_worker is not None:
+            self.import_worker.batalkan()
+
+        self.koleksi_foto = KoleksiFoto() 
+        self.mesin_kueri = MesinKueri(self.koleksi_foto)
+        self.tampilan_foto = self.koleksi_foto
+        self.mode_tinjau_var.set(MODE_URUTAN_FOLDER)
+        self.filter_kamera_var.set(self.SEMUA_KAMERA)
+        self.kueri_aktif = None
+        self.kueri_var.set("")
         self.kriteria_tag_list = set() 
+        self.index_foto_saat_ini = 0
+        self.filmstrip.reset()
+        self.gambar_tk.kosongkan()
+        self.update_label_pilihan()
+        self.buka_sesi(folder_path)
         
-        foto_ditemukan = 0
-        tipe_foto = ('.jpg', '.jpeg', '.png', '.gif', '.tif')
+        self.tutup_pembaca_meta()
+        self.pembaca_meta = PembacaMetadata(self.meta_tersimpan)
+        self.folder_aktif = folder_path
+        self.opsi_import_aktif = lengkapi_opsi_pindai(self.opsi_import())
+        self.opsi_import_tersimpan = None
+        if self.sesi is not None:
+            tersimpan = self.sesi.muat_pengaturan("opsi_pindai")
+            if tersimpan is not None:
+                self.opsi_import_tersimpan = lengkapi_opsi_pindai(tersimpan)
+        self.import_worker = ImportWorker(folder_path, dengan_tanda=True, **self.opsi_import_aktif).mulai()
+        self.mulai_progres("Membaca folder...", self.aksi_batalkan_import)
+        self.master.after(self.IMPORT_POLL_MS, self.proses_batch_import, self.import_worker)
+        self._meta_dipantau = False
+        self.minta_metadata(())
 
-        try:
-            for file_name in os.listdir(folder_path):
-                if file_name.lower().endswith(tipe_foto):
-                    full_path = os.path.join(folder_path, file_name)
-                    
-                    foto = Foto(file_name, full_path)
-                    self.koleksi_foto.append(foto)
-                    
-                    for tag in foto.tags:
-                        self.tag_unik_koleksi.add(tag)
-                    
-                    foto_ditemukan += 1
+    @diukur("import.batch")
+    def proses_batch_import(self, worker):
+        """Moves newly scanned photos into the collection; reschedules itself until the scan ends."""
+        if worker is not self.import_worker:
+            return
 
-        except Exception as e:
-             messagebox.showerror("Import Error", f"Terjadi kesalahan saat membaca folder: {e}")
-             return
+        koleksi_kosong = not self.koleksi_foto
+        ada_tag_tersimpan = False
+        for batch in worker.ambil_batch():
+            foto_baru = []
+            for file_name, full_path, tanda in batch:
+                # Tags saved by an earlier session come back with the photo.
+                tags = self.tag_tersimpan.get(full_path, ())
+                ada_tag_tersimpan = ada_tag_tersimpan or bool(tags)
+                foto = Foto(file_name, full_path, tags)
+                foto.skor = self.skor_tersimpan.get(full_path)
+                foto.tanda = tanda
+                foto_baru.append(self.koleksi_foto.tambah_foto(foto))
+            self.minta_metadata(foto_baru)
 
-        if foto_ditemukan > 0:
+        if koleksi_kosong and self.koleksi_foto:
+            # First batch: open the main screen while the rest keeps arriving.
+            self.buka_thumb_store(worker.folder_path)
             self.tampilkan_layar(self.frame_utama)
-            self.index_foto_saat_ini = 0
             self.update_tag_kriteria_view() 
             self.update_dropdown_photo_group()
             self.tampilkan_foto_saat_ini()
-            messagebox.showinfo("Import Success", f"🎉 {foto_ditemukan} foto berhasil diimpor.")
-        else:
-            messagebox.showwarning("Warning", "Tidak ada file foto (JPG/PNG/GIF/TIF) yang ditemukan.")
-            self.tampilkan_layar(self.frame_beranda) 
-            
-        # Panggil update status setelah koleksi terisi (apapun hasilnya)
+        elif ada_tag_tersimpan:
+            self.update_dropdown_photo_group()
+
+        foto_ditemukan = len(self.koleksi_foto)
         self.update_status_display()
+        self.filmstrip.render()
+
+        if not worker.selesai:
+            self.perbarui_progres(f"Mengimpor... {foto_ditemukan} foto ditemukan")
+            self.master.after(self.IMPORT_POLL_MS, self.proses_batch_import, worker)
+            return
+
+        self.import_worker = None
+        self.selesai_progres()
+
+        if worker.error is not None:
+             messagebox.showerror("Import Error", f"Terjadi kesalahan saat membaca folder: {worker.error}")
+        elif worker.dibatalkan:
+            messagebox.showinfo("Import Dibatalkan", f"Impor dihentikan. {foto_ditemukan} foto sempat diimpor.")
+        elif foto_ditemukan > 0:
+            pesan = f"🎉 {foto_ditemukan} foto berhasil diimpor."
+            if worker.galat:
+                pesan += f"\n\n{len(worker.galat)} subfolder tidak dapat dibaca dan dilewati."
+            messagebox.showinfo("Import Success", pesan)
+
+        if worker.error is None and not worker.dibatalkan and not worker.galat:
+            self.simpan_opsi_import(self.opsi_import_aktif)
+
+        if foto_ditemukan == 0:
+            if worker.error is None and not worker.dibatalkan:
+                messagebox.showwarning("Warning", "Tidak ada file foto (JPG/PNG/GIF/TIF) yang ditemukan.")
+            self.tampilkan_layar(self.frame_beranda) 
+
+    # --- EXIF Metadata (background reads) ---
+    def minta_metadata(self, daftar_foto):
+        """Queues photos for the metadata reader and makes sure its results are being polled."""
+        if self.pembaca_meta is None:
+            return
+        self.pembaca_meta.minta(daftar_foto)
+        if not self._meta_dipantau:
+            self._meta_dipantau = True
+            self.master.after(self.META_POLL_MS, self.proses_hasil_metadata, self.pembaca_meta)
+
+    def proses_hasil_metadata(self, pembaca):
+        """Applies metadata read so far; reschedules itself while the reader has work."""
+        if pembaca is not self.pembaca_meta:
+            return
+
+        foto_saat_ini = self.tampilan_foto[self.index_foto_saat_ini] if self.tampilan_foto else None
+        for foto, meta, kunci in pembaca.ambil_hasil():
+            if not self.koleksi_foto.berisi(foto):
+                # Removed by a re-scan while its header was being read.
+                continue
+            self.koleksi_foto.atur_metadata(foto, meta)
+            if kunci is not None and self.sesi is not None:
+                self.sesi.catat_meta(foto.path_lengkap, kunci, meta)
+            if foto is foto_saat_ini:
+                self.perbarui_label_meta(foto)
+
+        if pembaca.sibuk or self.import_worker is not None:
+            self.master.after(self.META_POLL_MS, self.proses_hasil_metadata, pembaca)
+        else:
+            self._meta_dipantau = False
+
+    def tutup_pembaca_meta(self):
+        if self.pembaca_meta is not None:
+            self.pembaca_meta.tutup()
+            self.pembaca_meta = None
+
+    def perbarui_label_meta(self, foto):
+        meta = foto.meta
+        if meta is None:
+            self.label_meta.config(text="")
+            return
+        baris = []
+        if meta.waktu:
+            baris.append(f"Diambil: {meta.waktu}")
+        if meta.kamera or meta.lensa:
+            baris.append(" • ".join(bagian for bagian in (meta.kamera, meta.lensa) if bagian))
+        detail = [f"{meta.lebar} x {meta.tinggi}"] if meta.lebar and meta.tinggi else []
+        if meta.iso:
+            detail.append(f"ISO {meta.iso}")
+        if detail:
+            baris.append(" • ".join(detail))
+        self.label_meta.config(text="\n".join(baris))
+
+    def perbarui_pilihan_kamera(self):
+        """Fills the camera filter with the cameras seen so far (called as the list opens)."""
+        kamera = sorted(k for k in self.koleksi_foto.kamera_unik if k is not None)
+        if None in self.koleksi_foto.kamera_unik:
+            kamera.append(self.TANPA_KAMERA)
+        self.combo_kamera.config(values=[self.SEMUA_KAMERA] + kamera)
+
+    # --- Incremental Re-scan & Folder Watcher ---
+    def aksi_sinkron_folder(self):
+        """Re-scans the imported folder and applies only the files that changed."""
+        if not self.folder_aktif:
+            return
+        if self.proses_latar_berjalan():
+            messagebox.showwarning("Warning", "Proses lain masih berjalan. Tunggu hingga selesai atau batalkan.")
+            return
+        self.mulai_sinkron(diam=False)
+
+    def mulai_sinkron(self, diam):
+        """Starts a background re-scan; diam=True (the watcher) shows no progress or dialogs."""
+        dikenal = {foto.path_lengkap: foto.tanda for foto in self.koleksi_foto}
+        job = SinkronFolder(self.folder_aktif, dikenal, **self.opsi_import_aktif).mulai()
+        self.sinkron_job = job
+        self.sinkron_diam = diam
+        if not diam:
+            self.mulai_progres("Memindai ulang folder...", self.aksi_batalkan_sinkron)
+        self.master.after(self.IMPORT_POLL_MS, self.pantau_sinkron, job, diam)
+
+    def pantau_sinkron(self, job, diam):
+        if not job.selesai:
+            self.master.after(self.IMPORT_POLL_MS, self.pantau_sinkron, job, diam)
+            return
+        if job is not self.sinkron_job:
+            # A watcher scan that gave way to another job.
+            return
+
+        self.sinkron_job = None
+        if not diam:
+            self.selesai_progres()
+
+        if job.error is not None:
+            if diam:
+                self.tampilkan_pesan(f"Pemantauan folder: gagal memindai ulang ({job.error})")
+            else:
+                messagebox.showerror("Pindai Ulang Error", f"Terjadi kesalahan saat membaca folder: {job.error}")
+            return
+        if job.perubahan is None:
+            return
+
+        # A partial scan (job.sebagian) carries no removals, see sinkron.bandingkan; nor
+        # does one whose options differ from the last complete import's, as in
+        # PustakaFoto.impor: a narrower scan would drop every photo outside it.
+        perubahan = job.perubahan
+        tertahan = 0
+        if job.opsi_pindai != self.opsi_import_tersimpan and perubahan.hilang:
+            tertahan = len(perubahan.hilang)
+            perubahan = perubahan._replace(hilang=[])
+        self.terapkan_perubahan(perubahan)
+        if not job.sebagian and not tertahan:
+            self.simpan_opsi_import(job.opsi_pindai)
+
+        peringatan = []
+        if job.sebagian:
+            peringatan.append(f"{len(job.galat)} subfolder tidak dapat dibaca; foto di dalamnya tidak dihapus.")
+        if tertahan and not diam:
+            # The watcher keeps scanning with these options; saying so once is enough.
+            peringatan.append(f"{tertahan} foto tidak ditemukan dengan opsi impor ini dan tidak dihapus; "
+                              "impor ulang dengan opsi sebelumnya untuk menghapusnya.")
+        peringatan = "\n".join(peringatan)
+        if diam:
+            if peringatan:
+                self.tampilkan_pesan(peringatan)
+        else:
+            messagebox.showinfo("Pindai Ulang", 
+                                f"{len(perubahan.baru)} foto baru, {len(perubahan.berubah)} diperbarui, "
+                                f"{len(perubahan.pindah)} dipindah, {len(perubahan.hilang)} dihapus."
+                                + (f"\n\n{peringatan}" if peringatan else ""))
+
+    def simpan_opsi_import(self, opsi):
+        """Records opsi as the scan options the collection was built with."""
+        self.opsi_import_tersimpan = opsi
+        if self.sesi is not None:
+            self.sesi.simpan_pengaturan("opsi_pindai", opsi)
+
+    def terapkan_perubahan(self, perubahan):
+        """Applies a sinkron.PerubahanFolder to the collection, keeping tags of the photos
+        that stay (and of moved ones), the review position, and the filmstrip's selection,
+        thumbnails and scrolling where possible."""
+        if not any(perubahan):
+            return
+
+        foto_per_path = {foto.path_lengkap: foto for foto in self.koleksi_foto}
+        foto_sebelumnya = self.tampilan_foto[self.index_foto_saat_ini] if self.tampilan_foto else None
+        # The photos at the positions the filmstrip keeps state for, to find them again.
+        foto_terpakai = {i: self.tampilan_foto[i] for i in self.filmstrip.index_terpakai()
+                         if i < len(self.tampilan_foto)}
+        dibaca_ulang = []
+        dihapus = [foto_per_path[path] for path in perubahan.hilang if path in foto_per_path]
+        pengganti = {}      # moved photo -> the Foto at its new path
+        ditulis_ulang = set()
+
+        for file_name, full_path, tanda in perubahan.baru:
+            foto = Foto(file_name, full_path)
+            foto.tanda = tanda
+            dibaca_ulang.append(self.koleksi_foto.tambah_foto(foto))
+
+        for path_lama, file_name, full_path, tanda in perubahan.pindah:
+            lama = foto_per_path.get(path_lama)
+            if lama is None:
+                continue
+            foto = Foto(file_name, full_path)
+            foto.tanda = tanda
+            foto.skor = lama.skor
+            self.koleksi_foto.tambah_foto(foto)
+            for tag in lama.tags:
+                self.koleksi_foto.tambah_tag(foto, tag)
+            if foto.skor is not None and self.sesi is not None:
+                self.sesi.catat_skor(full_path, foto.skor)
+            dibaca_ulang.append(foto)
+            dihapus.append(lama)
+            pengganti[lama] = foto
+
+        for path, tanda in perubahan.berubah:
+            foto = foto_per_path.get(path)
+            if foto is None:
+                continue
+            # Rewritten (e.g. edited elsewhere): scores and metadata no longer apply.
+            foto.tanda = tanda
+            foto.skor = None
+            self.koleksi_foto.atur_metadata(foto, None)
+            if self.sesi is not None:
+                self.sesi.hapus_skor(path)
+            dibaca_ulang.append(foto)
+            ditulis_ulang.add(foto)
+
+        self.koleksi_foto.hapus_foto_banyak(dihapus)
+        self.minta_metadata(dibaca_ulang)
+        self.update_dropdown_photo_group()
+
+        if not self.koleksi_foto:
+            self.tampilan_foto = self.koleksi_foto
+            self.index_foto_saat_ini = 0
+            self.tampilkan_layar(self.frame_beranda)
+            return
+        foto_saat_ini = pengganti.get(foto_sebelumnya, foto_sebelumnya)
+        foto_terpakai = {i: pengganti.get(foto, foto) for i, foto in foto_terpakai.items()}
+        if self.tampilan_foto is not self.koleksi_foto:
+            # Sorted or filtered: new photos can land anywhere in the rebuilt order.
+            self.aksi_ubah_mode_tinjau(foto_saat_ini, foto_terpakai)
+            return
+
+        if dihapus:
+            posisi = self.petakan_filmstrip(foto_terpakai)
+            self.index_foto_saat_ini = posisi.get(foto_saat_ini.id if foto_saat_ini is not None else None,
+                                                  min(self.index_foto_saat_ini, len(self.koleksi_foto) - 1))
+        else:
+            # Only appended (or rewritten in place): every position holds the same photo.
+            self.filmstrip.perbarui(lupakan=[i for i, foto in foto_terpakai.items() if foto in ditulis_ulang])
+
+        self.update_label_pilihan()
+        if self.koleksi_foto[self.index_foto_saat_ini] is foto_sebelumnya and foto_sebelumnya not in ditulis_ulang:
+            # Same photo on screen: leave the preview and the filmstrip's scrolling alone.
+            self.update_status_display()
+        else:
+            self.tampilkan_foto_saat_ini()
+
+    def petakan_filmstrip(self, foto_terpakai):
+        """Moves the filmstrip's selection and thumbnails to where their photos now are in
+        the review order; foto_terpakai is {old position: photo}. Returns {photo id: position}."""
+        posisi = {foto.id: i for i, foto in enumerate(self.tampilan_foto)}
+        self.filmstrip.petakan_ulang({i: posisi[foto.id] for i, foto in foto_terpakai.items() if foto.id in posisi})
+        return posisi
+
+    def aksi_batalkan_sinkron(self):
+        if self.sinkron_job is not None:
+            self.sinkron_job.batalkan()
+            self.perbarui_progres("Membatalkan pindai ulang...")
+
+    def aksi_ubah_pantau_folder(self):
+        if self.pantau_folder_var.get():
+            self.master.after(self.PANTAU_MS, self.pantau_folder)
+
+    def pantau_folder(self):
+        """Watcher tick: a silent re-scan picks up files arriving while the user keeps tagging."""
+        if not self.pantau_folder_var.get():
+            return
+        if self.folder_aktif and self.koleksi_foto and self.sinkron_job is None and not self.proses_latar_berjalan():
+            self.mulai_sinkron(diam=True)
+        self.master.after(self.PANTAU_MS, self.pantau_folder)
+
+    def aksi_batalkan_import(self):
+        if self.import_worker is not None:
+            self.import_worker.batalkan()
+            self.perbarui_progres("Membatalkan impor...")
+
+    # --- Background Job Progress (Status Bar) ---
+    def buat_status_bar(self):
+        """Status bar along the bottom of the window, shown only while a background job runs."""
+        self.frame_progres = ttk.Frame(self.master, padding=(10, 5))
+        
+        self.label_progres = ttk.Label(self.frame_progres, text="", font=('Arial', 10))
+        self.label_progres.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.tombol_batal_progres = ttk.Button(self.frame_progres, text="Batalkan", command=self.aksi_batal_progres)
+        self.tombol_batal_progres.pack(side=tk.RIGHT, padx=(10, 0))
+        
+        self.progress_bar = ttk.Progressbar(self.frame_progres, length=300)
+        self.progress_bar.pack(side=tk.RIGHT)
+        
+        self.aksi_batal_saat_ini = None
+        
+        # One-line warnings that should not interrupt the review (tampilkan_pesan).
+        self.frame_pesan = ttk.Frame(self.master, padding=(10, 2))
+        self.label_pesan = ttk.Label(self.frame_pesan, text="", font=('Arial', 10), foreground="#a04000")
+        self.label_pesan.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self._after_pesan = None
+
+    def tampilkan_pesan(self, teks):
+        """Shows a warning in the status bar; it hides itself after PESAN_MS."""
+        self.label_pesan.config(text=teks)
+        if not self.frame_pesan.winfo_ismapped():
+            self.frame_pesan.pack(side=tk.BOTTOM, fill=tk.X)
+        if self._after_pesan is not None:
+            self.master.after_cancel(self._after_pesan)
+        self._after_pesan = self.master.after(self.PESAN_MS, self.sembunyikan_pesan)
+
+    def sembunyikan_pesan(self):
+        self._after_pesan = None
+        self.frame_pesan.pack_forget()
+
+    def mulai_progres(self, teks, aksi_batal, maksimum=None):
+        """Shows the status bar; without maksimum the bar runs in indeterminate mode."""
+        self.aksi_batal_saat_ini = aksi_batal
+        self.label_progres.config(text=teks)
+        
+        if maksimum is None:
+            self.progress_bar.config(mode="indeterminate")
+            self.progress_bar.start(15)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", maximum=max(maksimum, 1), value=0)
+        
+        if not self.frame_progres.winfo_ismapped():
+            self.frame_progres.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def perbarui_progres(self, teks, nilai=None):
+        self.label_progres.config(text=teks)
+        if nilai is not None:
+            self.progress_bar.config(value=nilai)
+
+    def selesai_progres(self):
+        self.aksi_batal_saat_ini = None
+        self.progress_bar.stop()
+        self.frame_progres.pack_forget()
+
+    def proses_latar_berjalan(self):
+        """True while an import, export, analysis or re-scan job owns the status bar.
+
+        A silent re-scan of the folder watcher gives way instead: it is cancelled here
+        and runs again on the watcher's next tick.
+        """
+        if self.sinkron_job is not None and self.sinkron_diam:
+            self.sinkron_job.batalkan()
+            self.sinkron_job = None
+        return any(job is not None for job in (self.import_worker, self.export_job, self.analisis_job, 
+                                               self.penilaian_job, self.sinkron_job))
+
+    def aksi_batal_progres(self):
+        if self.aksi_batal_saat_ini is not None:
+            self.aksi_batal_saat_ini()
 
 
     # --- Tag Criteria Method (Left Control Panel) ---
@@ -252,6 +953,8 @@ class PhotoApp:
 
         if tag_baru not in self.kriteria_tag_list:
             self.kriteria_tag_list.add(tag_baru)
+            if self.sesi is not None:
+                self.sesi.tambah_kriteria(tag_baru)
             self.update_tag_kriteria_view() 
             self.tag_entry.delete(0, tk.END)
         else:
@@ -269,85 +972,87 @@ class PhotoApp:
             return 
             
         self.kriteria_tag_list.discard(tag_kriteria)
+        if self.sesi is not None:
+            self.sesi.hapus_kriteria(tag_kriteria)
         self.update_tag_kriteria_view()
         
-        is_current_photo_affected = False
-        
-        for i, foto in enumerate(self.koleksi_foto):
-            if foto.hapus_tag(tag_kriteria):
-                if i == self.index_foto_saat_ini:
-                    is_current_photo_affected = True
-                    
-        self.tag_unik_koleksi.discard(tag_kriteria)
-        self.update_dropdown_photo_group()
-
-        if is_current_photo_affected:
-            self.tampilkan_foto_saat_ini()
+        self.koleksi_foto.hapus_tag_dari_semua(tag_kriteria)
+        self.segarkan_tag_tampilan()
             
         messagebox.showinfo("Kriteria Dihapus", 
                             f"Tag Kriteria '{tag_kriteria}' berhasil dihapus dari daftar DAN SEMUA FOTO.")
 
 
     def update_tag_kriteria_view(self):
-        """Recreates the tag criteria buttons in Photo Control."""
-        for widget in self.frame_tag_kriteria_list.winfo_children():
-            widget.destroy()
-            
-        if not self.kriteria_tag_list:
-            ttk.Label(self.frame_tag_kriteria_list, text="Tambahkan tag di atas.").pack(anchor='w', padx=5, pady=5)
-            return
-            
-        sorted_kriteria = sorted(list(self.kriteria_tag_list))
-        
-        for tag in sorted_kriteria:
-            frame_tag = ttk.Frame(self.frame_tag_kriteria_list, relief="solid")
-            frame_tag.pack(fill=tk.X, pady=2, padx=2)
-            
-            ttk.Button(frame_tag, 
-                       text=tag, 
-                       style='Tag.TButton', 
-                       command=lambda t=tag: self.aksi_terapkan_tag(t)
-                       ).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                           
-            ttk.Button(frame_tag, 
-                       text="X", 
-                       width=3, 
-                       style='Danger.TButton',
-                       command=lambda t=tag: self.aksi_hapus_kriteria_tag(t)
-                       ).pack(side=tk.RIGHT)
+        """Refreshes the tag criteria buttons in Photo Control (pooled rows, see panel_tag.py)."""
+        self.daftar_tag_kriteria.perbarui(sorted(self.kriteria_tag_list))
                            
     def aksi_terapkan_tag(self, tag_yang_diterapkan):
-        """Applies a tag from the criteria to the current photo."""
-        if not self.koleksi_foto: return
+        """Applies a tag from the criteria to the selected photos, or to the current photo."""
+        if not self.tampilan_foto: return
+
+        if self.filmstrip.pilihan:
+            self.terapkan_tag_ke_pilihan(tag_yang_diterapkan)
+            return
 
-        foto_saat_ini = self.koleksi_foto[self.index_foto_saat_ini]
+        foto_saat_ini = self.tampilan_foto[self.index_foto_saat_ini]
         
-        if foto_saat_ini.tambah_tag(tag_yang_diterapkan):
-            self.tag_unik_koleksi.add(tag_yang_diterapkan)
-            self.update_dropdown_photo_group()
-            self.tampilkan_foto_saat_ini() 
+        if self.koleksi_foto.tambah_tag(foto_saat_ini, tag_yang_diterapkan):
+            self.segarkan_tag_tampilan()
         else:
             messagebox.showwarning("Warning", f"Tag '{tag_yang_diterapkan}' sudah ada di foto ini.")
             
+    def terapkan_tag_ke_pilihan(self, tag):
+        """Tags every selected photo in one batch and refreshes the panels once."""
+        daftar_foto = [self.tampilan_foto[i] for i in sorted(self.filmstrip.pilihan)]
+        berubah = self.koleksi_foto.tambah_tag_banyak(daftar_foto, tag)
+        self.segarkan_tag_tampilan()
+        messagebox.showinfo("Tag Massal", 
+                            f"Tag '{tag}' diterapkan ke {len(berubah)} foto "
+                            f"({len(daftar_foto) - len(berubah)} sudah memilikinya).")
+
+    def segarkan_tag_tampilan(self):
+        """Refreshes tag panels after tags changed; the image itself is not reloaded."""
+        self.update_dropdown_photo_group()
+        if self.tampilan_foto:
+            self.perbarui_tampilan_tag_metadata(self.tampilan_foto[self.index_foto_saat_ini])
+
+    # --- Bulk Selection Method (Tag Massal) ---
+    def aksi_pilih_n_berikutnya(self):
+        """Selects the current photo and the ones after it, N in total."""
+        try:
+            jumlah = int(self.pilih_n_var.get())
+        except ValueError:
+            messagebox.showwarning("Warning", "Jumlah foto harus berupa angka.")
+            return
+        awal = self.index_foto_saat_ini
+        self.filmstrip.atur_pilihan(range(awal, min(awal + max(jumlah, 0), len(self.tampilan_foto))))
+        self.update_label_pilihan()
+
+    def aksi_pilih_pola(self):
+        """Selects every photo whose file name matches the glob in the pattern field."""
+        pola = self.pilih_pola_var.get().strip()
+        if not pola:
+            messagebox.showwarning("Warning", "Pola nama file tidak boleh kosong.")
+            return
+        self.filmstrip.atur_pilihan(self.tampilan_foto.index_cocok_pola(pola))
+        self.update_label_pilihan()
+
+    def aksi_bersihkan_pilihan(self):
+        self.filmstrip.atur_pilihan(())
+        self.update_label_pilihan()
+
+    def update_label_pilihan(self):
+        jumlah = len(self.filmstrip.pilihan)
+        if jumlah:
+            self.label_pilihan.config(text=f"{jumlah} foto terpilih - klik tag kriteria untuk menerapkan")
+        else:
+            self.label_pilihan.config(text="Tidak ada pilihan (tag ke foto saat ini)")
+
     # --- Grouping Logic Method ---
     def update_dropdown_photo_group(self):
         """Updates the option list in the Photo Group Dropdown based on the unique tag collection."""
-        tag_list = sorted(list(self.tag_unik_koleksi))
-        
-        options = ["Pilih Tag"] + tag_list
-        
-        menu = self.kelompok_tag_dropdown["menu"]
-        menu.delete(0, "end")
-        
-        for tag in options:
-            menu.add_command(label=tag, command=tk._setit(self.kelompok_tag_var, tag))
-
-        current_selection = self.kelompok_tag_var.get()
-        if current_selection not in options:
-            self.kelompok_tag_var.set("Pilih Tag")
-        elif current_selection == "Pilih Tag" and len(options) > 1:
-            pass
-
+        self.menu_kelompok_tag.perbarui(self.tag_unik_koleksi)
 
     def aksi_tombol_kelompokkan(self):
         kriteria = self.kelompok_tag_var.get().strip()
@@ -356,20 +1061,37 @@ class PhotoApp:
              return
         self.aksi_pindahkan_file(kriteria)
 
-    def aksi_pindahkan_file(self, kriteria_tag):
-        """Menyalin file dengan kriteria tag ke folder baru yang dipilih pengguna."""
+    def aksi_ekspor_kueri(self):
+        """Exports the photos matching the tag filter, e.g. 'Wedding AND NOT Rejected'."""
+        try:
+            kueri = urai_kueri(self.kueri_var.get())
+        except ValueError as e:
+            messagebox.showwarning("Warning", f"Filter tag tidak valid: {e}")
+            return
+        self.aksi_pindahkan_file(teks_kueri(kueri), kueri)
+
+    def aksi_pindahkan_file(self, kriteria_tag, kueri=None):
+        """Menyalin file dengan kriteria tag ke folder baru yang dipilih pengguna.
+
+        With kueri (a parsed tag filter) the photos matching it are copied instead, and
+        kriteria_tag is its text, used for the folder name."""
         if kriteria_tag == "Pilih Tag":
             return
 
+        if self.proses_latar_berjalan():
+            messagebox.showwarning("Warning", "Proses lain masih berjalan. Tunggu hingga selesai atau batalkan.")
+            return
+
         lokasi_dasar = filedialog.askdirectory(title=f"Pilih Folder Tujuan untuk Tag: {kriteria_tag}")
         
         if not lokasi_dasar:
             messagebox.showwarning("Dibatalkan", "Operasi penyalinan dibatalkan oleh pengguna.")
             return
 
-        safe_tag = "".join(c for c in kriteria_tag if c.isalnum() or c in (' ', '_')).rstrip()
-        nama_folder_tag = f"KOLEKSI_{safe_tag.upper().replace(' ', '_')}"
-        folder_output = os.path.join(lokasi_dasar, nama_folder_tag)
+        if kueri is None:
+            folder_output = folder_ekspor_tag(lokasi_dasar, kriteria_tag)
+        else:
+            folder_output = folder_ekspor_kueri(lokasi_dasar, kriteria_tag)
         
         if not os.path.exists(folder_output):
             try:
@@ -378,27 +1100,265 @@ class PhotoApp:
                 messagebox.showerror("Folder Error", f"Gagal membuat folder di lokasi yang dipilih: {e}")
                 return
             
-        foto_disalin = 0
-        tag_kapital = kriteria_tag.strip().capitalize()
-        
-        for foto in self.koleksi_foto: 
-            if tag_kapital in foto.tags:
-                try:
-                    tujuan_path = os.path.join(folder_output, foto.nama_file)
-                    shutil.copy2(foto.path_lengkap, tujuan_path) 
-                    foto_disalin += 1
-                except Exception as e:
-                    print(f"Failed to copy {foto.nama_file}: {e}")
-                    
-        if foto_disalin > 0:
-            messagebox.showinfo("Grouping Complete", 
-                                 f"✅ {foto_disalin} foto dengan tag '{kriteria_tag}' berhasil dikelompokkan (disalin) ke:\n{folder_output}")
+        if kueri is None:
+            tag_kapital = kriteria_tag.strip().capitalize()
+            daftar_foto = [(foto.nama_file, foto.path_lengkap) for foto in self.koleksi_foto.foto_dengan_tag(tag_kapital)]
         else:
+            daftar_foto = [(foto.nama_file, foto.path_lengkap) for foto in self.mesin_kueri.hasil(kueri)]
+                    
+        if not daftar_foto:
             messagebox.showwarning("Not Found", f"Tidak ada foto dengan tag '{kriteria_tag}' yang ditemukan.")
+            return
+
+        self.export_job = ExportJob(daftar_foto, folder_output, 
+                                    jumlah_worker=self.EXPORT_WORKERS, 
+                                    mode=self.mode_ekspor_var.get(), 
+                                    inkremental=self.ekspor_inkremental_var.get()).mulai()
+        self.mulai_progres(f"Mengekspor 0/{len(daftar_foto)} foto...", self.aksi_batalkan_ekspor, maksimum=len(daftar_foto))
+        self.master.after(self.EXPORT_POLL_MS, self.pantau_ekspor, self.export_job, kriteria_tag)
+
+    def pantau_ekspor(self, job, kriteria_tag):
+        """Updates the progress/ETA display and reports the result once the export job ends."""
+        jumlah_selesai, total, eta = job.progres()
+        
+        if not job.selesai:
+            teks_eta = f" • sisa ±{int(eta) // 60}:{int(eta) % 60:02d}" if eta is not None else ""
+            self.perbarui_progres(f"Mengekspor {jumlah_selesai}/{total} foto{teks_eta}", nilai=jumlah_selesai)
+            self.master.after(self.EXPORT_POLL_MS, self.pantau_ekspor, job, kriteria_tag)
+            return
+
+        self.export_job = None
+        self.selesai_progres()
+        
+        laporan = job.laporan
+        foto_disalin = len(laporan.disalin)
+        foto_dilewati = len(laporan.dilewati)
+        gagal = laporan.gagal
+        
+        pesan = f"✅ {foto_disalin} foto dengan tag '{kriteria_tag}' berhasil dikelompokkan (disalin) ke:\n{laporan.folder_output}"
+        if foto_dilewati:
+            pesan += f"\n\n{foto_dilewati} foto dilewati karena sudah ada dan identik."
+        if job.dibatalkan:
+            pesan += f"\n\nEkspor dibatalkan: {total - foto_disalin - foto_dilewati - len(gagal)} foto belum disalin."
+        if gagal:
+            daftar_gagal = "\n".join(f"• {os.path.basename(h.sumber)}: {h.pesan}" for h in gagal[:10])
+            if len(gagal) > 10:
+                daftar_gagal += f"\n... dan {len(gagal) - 10} lainnya"
+            pesan += f"\n\n{len(gagal)} foto gagal disalin:\n{daftar_gagal}"
+
+        if gagal:
+            messagebox.showwarning("Grouping Complete", pesan)
+        else:
+            messagebox.showinfo("Grouping Complete", pesan)
+
+    def aksi_batalkan_ekspor(self):
+        if self.export_job is not None:
+            self.export_job.batalkan()
+            self.perbarui_progres("Membatalkan ekspor...")
+
+    # --- Near-Duplicate & Burst Analysis Method ---
+    def aksi_analisis_duplikat(self):
+        """Hashes every photo in the background and suggests tags for similar shots."""
+        if not self.koleksi_foto:
+            return
+        if self.proses_latar_berjalan():
+            messagebox.showwarning("Warning", "Proses lain masih berjalan. Tunggu hingga selesai atau batalkan.")
+            return
+
+        job = AnalisisDuplikat([foto.path_lengkap for foto in self.koleksi_foto]).mulai()
+        self.analisis_job = job
+        self.mulai_progres("Menganalisis kemiripan foto...", self.aksi_batalkan_analisis, maksimum=job.total)
+        self.master.after(self.EXPORT_POLL_MS, self.pantau_analisis, job, self.koleksi_foto)
+
+    def pantau_analisis(self, job, koleksi):
+        """Polls the analysis job; when it ends, offers the clusters as tags."""
+        jumlah_selesai, total = job.progres()
+        if not job.selesai:
+            self.perbarui_progres(f"Menganalisis {jumlah_selesai}/{total} foto", nilai=jumlah_selesai)
+            self.master.after(self.EXPORT_POLL_MS, self.pantau_analisis, job, koleksi)
+            return
+
+        self.analisis_job = None
+        self.selesai_progres()
+
+        if koleksi is not self.koleksi_foto:
+            return
+        if job.error is not None:
+            messagebox.showerror("Analisis Error", f"Analisis gagal: {job.error}")
+            return
+        if job.dibatalkan:
+            messagebox.showinfo("Analisis Dibatalkan", "Analisis kemiripan dihentikan.")
+            return
+
+        jumlah_mirip = sum(len(grup) for grup in job.kelompok_mirip)
+        jumlah_burst = sum(len(grup) for grup in job.kelompok_burst)
+        pesan = (f"{len(job.kelompok_mirip)} kelompok foto hampir identik ({jumlah_mirip} foto)\n"
+                 f"{len(job.kelompok_burst)} rangkaian burst ({jumlah_burst} foto)")
+        if job.jumlah_gagal:
+            pesan += f"\n\n{job.jumlah_gagal} foto tidak dapat dibaca dan dilewati."
+
+        if not job.kelompok_mirip and not job.kelompok_burst:
+            messagebox.showinfo("Saran Kelompok", pesan)
+            return
+        if not messagebox.askyesno("Saran Kelompok", pesan + "\n\nTandai kelompok ini dengan tag 'Mirip NNN' / 'Burst NNN'?"):
+            return
+
+        for awalan, daftar_kelompok in (("Mirip", job.kelompok_mirip), ("Burst", job.kelompok_burst)):
+            for nomor, grup in enumerate(daftar_kelompok, 1):
+                self.koleksi_foto.tambah_tag_banyak([koleksi[i] for i in grup], f"{awalan} {nomor:03d}")
+        self.segarkan_tag_tampilan()
+
+    def aksi_batalkan_analisis(self):
+        if self.analisis_job is not None:
+            self.analisis_job.batalkan()
+            self.perbarui_progres("Membatalkan analisis...")
+
+    # --- Quality Scoring & Review Order Method ---
+    def aksi_nilai_foto(self):
+        """Scores sharpness/exposure in the background for every photo that has no score yet."""
+        if not self.koleksi_foto:
+            return
+        if self.proses_latar_berjalan():
+            messagebox.showwarning("Warning", "Proses lain masih berjalan. Tunggu hingga selesai atau batalkan.")
+            return
+
+        daftar_foto = [foto for foto in self.koleksi_foto if foto.skor is None]
+        if not daftar_foto:
+            messagebox.showinfo("Penilaian Foto", "Semua foto sudah dinilai.")
+            return
+
+        job = PenilaianFoto([foto.path_lengkap for foto in daftar_foto]).mulai()
+        self.penilaian_job = job
+        self.mulai_progres("Menilai ketajaman & eksposur...", self.aksi_batalkan_penilaian, maksimum=job.total)
+        self.master.after(self.EXPORT_POLL_MS, self.pantau_penilaian, job, daftar_foto)
+
+    def pantau_penilaian(self, job, daftar_foto):
+        jumlah_selesai, total = job.progres()
+        if not job.selesai:
+            self.perbarui_progres(f"Menilai {jumlah_selesai}/{total} foto", nilai=jumlah_selesai)
+            self.master.after(self.EXPORT_POLL_MS, self.pantau_penilaian, job, daftar_foto)
+            return
+
+        self.penilaian_job = None
+        self.selesai_progres()
+
+        # Whatever was scored is kept, also after a cancel.
+        jumlah_dinilai = 0
+        for foto, skor in zip(daftar_foto, job.skor):
+            if skor is None:
+                continue
+            foto.skor = skor
+            jumlah_dinilai += 1
+            if self.sesi is not None:
+                self.sesi.catat_skor(foto.path_lengkap, skor)
+
+        if self.tampilan_foto:
+            self.perbarui_label_skor(self.tampilan_foto[self.index_foto_saat_ini])
+        if self.mode_tinjau_var.get() != MODE_URUTAN_FOLDER:
+            self.aksi_ubah_mode_tinjau()
+
+        if job.error is not None:
+            messagebox.showerror("Penilaian Error", f"Penilaian gagal: {job.error}")
+            return
+        pesan = f"{jumlah_dinilai} foto dinilai."
+        if job.dibatalkan:
+            pesan = f"Penilaian dibatalkan. {pesan}"
+        elif job.jumlah_gagal:
+            pesan += f"\n{job.jumlah_gagal} foto tidak dapat dibaca."
+        messagebox.showinfo("Penilaian Foto", pesan)
+
+    def aksi_batalkan_penilaian(self):
+        if self.penilaian_job is not None:
+            self.penilaian_job.batalkan()
+            self.perbarui_progres("Membatalkan penilaian...")
+
+    def aksi_ubah_mode_tinjau(self, foto_saat_ini=None, foto_terpakai=None):
+        """Rebuilds the review order for the selected mode, staying on the current photo
+        (or on foto_saat_ini) if it is in it. With foto_terpakai (see petakan_filmstrip)
+        the filmstrip keeps its selection and thumbnails instead of starting over."""
+        if not self.koleksi_foto:
+            return
+
+        if foto_saat_ini is None and self.tampilan_foto:
+            foto_saat_ini = self.tampilan_foto[self.index_foto_saat_ini]
+        mode = self.mode_tinjau_var.get()
+        if mode == self.MODE_WAKTU_AMBIL:
+            daftar_foto = self.koleksi_foto.urut_waktu()
+        else:
+            posisi = urutan_tinjau([foto.skor for foto in self.koleksi_foto], mode)
+            daftar_foto = None if posisi is None else [self.koleksi_foto[i] for i in posisi]
+
+        # Camera and tag filters are id sets a photo must be in.
+        filter_ids = []
+        kamera = self.filter_kamera_var.get()
+        if kamera != self.SEMUA_KAMERA:
+            filter_ids.append(self.koleksi_foto.ids_dengan_kamera(None if kamera == self.TANPA_KAMERA else kamera))
+        if self.kueri_aktif is not None:
+            filter_ids.append(self.mesin_kueri.ids(self.kueri_aktif))
+        if filter_ids and daftar_foto is None:
+            # Folder order: the view is the intersection itself, no photo list is built.
+            filter_ids.sort(key=len)
+            daftar_foto = HasilKueri(self.koleksi_foto, [i for i in filter_ids[0] if all(i in ids for ids in filter_ids[1:])])
+        elif filter_ids:
+            daftar_foto = [foto for foto in daftar_foto if all(foto.id in ids for ids in filter_ids)]
+
+        if daftar_foto is None:
+            self.tampilan_foto = self.koleksi_foto
+        elif not daftar_foto:
+            if mode in (MODE_URUTAN_FOLDER, self.MODE_WAKTU_AMBIL):
+                messagebox.showinfo("Urutan Tinjau", "Tidak ada foto yang cocok dengan filter.")
+            else:
+                messagebox.showinfo("Urutan Tinjau", "Tidak ada foto yang cocok. Jalankan penilaian foto terlebih dahulu.")
+            self.mode_tinjau_var.set(MODE_URUTAN_FOLDER)
+            self.filter_kamera_var.set(self.SEMUA_KAMERA)
+            self.kueri_aktif = None
+            self.kueri_var.set("")
+            self.tampilan_foto = self.koleksi_foto
+        elif isinstance(daftar_foto, HasilKueri):
+            self.tampilan_foto = daftar_foto
+        else:
+            self.tampilan_foto = TampilanKoleksi(daftar_foto)
+
+        if foto_terpakai is None:
+            self.index_foto_saat_ini = next((i for i, foto in enumerate(self.tampilan_foto) if foto is foto_saat_ini), 0)
+            self.filmstrip.reset()
+        else:
+            posisi = self.petakan_filmstrip(foto_terpakai)
+            self.index_foto_saat_ini = posisi.get(foto_saat_ini.id if foto_saat_ini is not None else None, 0)
+        self.update_label_pilihan()
+        self.tampilkan_foto_saat_ini()
+
+    def aksi_terapkan_kueri(self):
+        """Narrows the review order to the photos matching the tag filter (empty = all)."""
+        teks = self.kueri_var.get().strip()
+        if not teks:
+            self.aksi_hapus_kueri()
+            return
+        try:
+            kueri = urai_kueri(teks)
+        except ValueError as e:
+            messagebox.showwarning("Warning", f"Filter tag tidak valid: {e}")
+            return
+        self.kueri_aktif = kueri
+        self.kueri_var.set(teks_kueri(kueri))
+        self.aksi_ubah_mode_tinjau()
+
+    def aksi_hapus_kueri(self):
+        self.kueri_var.set("")
+        if self.kueri_aktif is not None:
+            self.kueri_aktif = None
+            self.aksi_ubah_mode_tinjau()
+
+    def perbarui_label_skor(self, foto):
+        if foto.skor is None:
+            self.label_skor.config(text="Skor: belum dinilai")
+            return
+        ketajaman, kliping, kecerahan = foto.skor
+        self.label_skor.config(text=f"Ketajaman: {ketajaman:.0f} • Terpotong: {kliping:.1%} • Terang: {kecerahan:.0%}")
 
     # Method untuk memperbarui status display (Contoh: 1/20)
     def update_status_display(self):
-        total_foto = len(self.koleksi_foto)
+        total_foto = len(self.tampilan_foto)
         
         if total_foto > 0:
             # Indeks dimulai dari 0, jadi kita tambahkan 1 untuk tampilan pengguna
@@ -412,102 +1372,220 @@ class PhotoApp:
     # --- Navigation & Display Control Method ---    
     def tampilkan_foto_saat_ini(self):
         """Loads the image, resizes it, and displays the info."""
-        if not self.koleksi_foto:
+        if not self.tampilan_foto:
             return
 
-        foto_saat_ini = self.koleksi_foto[self.index_foto_saat_ini]
+        foto_saat_ini = self.tampilan_foto[self.index_foto_saat_ini]
+        self._waktu_navigasi = time.perf_counter()
         
         # --- A. Display Metadata (Text Info) ---
-        self.label_filename.config(text=f"File Name: {foto_saat_ini.nama_file}")
-        self.perbarui_tampilan_tag_metadata(foto_saat_ini)
+        with rentang("tampil.info"):
+            self.label_filename.config(text=f"File Name: {foto_saat_ini.nama_file}")
+            self.perbarui_label_skor(foto_saat_ini)
+            self.perbarui_label_meta(foto_saat_ini)
+            self.perbarui_tampilan_tag_metadata(foto_saat_ini)
 
 
         # --- B. Display Image (Pillow Logic) ---
-        try:
-            img_pil = Image.open(foto_saat_ini.path_lengkap)
-                        
-            self.frame_tengah.update_idletasks() 
-            
-            CONTAINER_PADDING = 40
-            
-            max_width = self.frame_tengah.winfo_width() - CONTAINER_PADDING
-            max_height = self.frame_tengah.winfo_height() - CONTAINER_PADDING 
-            
-            
-            if max_width < 100 or max_height < 100:
-                max_width = 640 
-                max_height = 700 
-                
-                if self.master.winfo_width() > 100:
-                     max_width = self.master.winfo_width() - 500 
-                     max_height = self.master.winfo_height() - 100 
-
-
-            lebar_asli, tinggi_asli = img_pil.size
-            rasio_lebar = max_width / lebar_asli
-            rasio_tinggi = max_height / tinggi_asli
-            rasio = min(rasio_lebar, rasio_tinggi)
-            
-            if rasio > 1:
-                rasio = 1
-
-            lebar_baru = int(lebar_asli * rasio)
-            tinggi_baru = int(tinggi_asli * rasio)
-            
-            img_pil = img_pil.resize((lebar_baru, tinggi_baru), Image.LANCZOS)
-            
-            self.foto_tk = ImageTk.PhotoImage(img_pil)
-            self.image_label.config(image=self.foto_tk, text="")
-            
-        except Exception as e:
-            self.image_label.config(image='', text=f"Gagal memuat gambar: {e}", background="#ffdddd")
+        self.tampilkan_gambar(foto_saat_ini)
+        with rentang("tampil.filmstrip"):
+            self.filmstrip.tampilkan_index(self.index_foto_saat_ini)
             
         # Panggil update status setiap foto ditampilkan
         self.update_status_display()
-            
-    def perbarui_tampilan_tag_metadata(self, foto):
-        """Removes and recreates the applied Tag display in Metadata Info (Right Panel)."""
+
+    def tampilkan_gambar(self, foto, kualitas=None):
+        """Shows the preview of foto: a cached frame at once, otherwise a stand-in while the
+        frame decodes in the background. Only the most recent request is ever shown."""
+        if kualitas is None:
+            kualitas = self.pilih_kualitas_pratinjau()
+
+        ukuran_maks = self.hitung_ukuran_pratinjau()
+        path = foto.path_lengkap
+        self._token_render += 1
         
-        for widget in self.frame_tag_metadata.winfo_children():
-            widget.destroy()
-            
-        if not foto.tags:
-            ttk.Label(self.frame_tag_metadata, text="- Belum ada tag -").pack(anchor='w', padx=5)
+        img_pil = self.prefetcher.dari_cache(path, ukuran_maks, KUALITAS_TINGGI)
+        if img_pil is not None:
+            kualitas = KUALITAS_TINGGI
+        elif kualitas == KUALITAS_CEPAT:
+            img_pil = self.prefetcher.dari_cache(path, ukuran_maks, KUALITAS_CEPAT)
+        
+        if img_pil is not None:
+            self.pasang_pratinjau(path, img_pil, ukuran_maks, kualitas)
             return
 
-        for tag in foto.tags:
-            frame_tag = ttk.Frame(self.frame_tag_metadata, borderwidth=1, relief="solid", style='TagInfo.TFrame')
-            frame_tag.pack(fill=tk.X, pady=2, padx=2)
+        self.tampilkan_pengganti(foto, ukuran_maks)
+        future = self.prefetcher.minta(path, ukuran_maks, kualitas)
+        self.master.after(self.RENDER_POLL_MS, self.cek_render, self._token_render, future, path, ukuran_maks, kualitas)
+
+    def cek_render(self, token, future, path, ukuran_maks, kualitas):
+        """Puts a finished background decode on screen, unless a newer request replaced it."""
+        if token != self._token_render:
+            return
+        if future.cancelled():
+            # A prefetch for other photos dropped it before it ran; it is still wanted.
+            future = self.prefetcher.minta(path, ukuran_maks, kualitas)
+        if not future.done():
+            self.master.after(self.RENDER_POLL_MS, self.cek_render, token, future, path, ukuran_maks, kualitas)
+            return
+
+        try:
+            img_pil = future.result()
+        except Exception as e:
+            self._sumber_tampil = None
+            self.gambar_tk.tampilkan_teks(f"Gagal memuat gambar: {e}", background="#ffdddd")
+            return
+        self.pasang_pratinjau(path, img_pil, ukuran_maks, kualitas)
+
+    def pasang_pratinjau(self, path, img_pil, ukuran_maks, kualitas):
+        self._sumber_tampil = (path, img_pil, ukuran_maks)
+        with rentang("tampil.photoimage", kualitas=kualitas):
+            self.gambar_tk.tampilkan(img_pil)
+        if self._waktu_navigasi is not None:
+            # Key press (or click) to first frame on screen, whatever the decode path.
+            catat_durasi("tampil.latensi", time.perf_counter() - self._waktu_navigasi)
+            self._waktu_navigasi = None
+        
+        if kualitas == KUALITAS_CEPAT and self.kualitas_pratinjau == "otomatis":
+            self.jadwalkan_pratinjau_tenang()
+        self.prefetch_foto_tetangga(ukuran_maks, kualitas)
+
+    def tampilkan_pengganti(self, foto, ukuran_maks):
+        """Immediate stand-in: the current frame or the filmstrip thumbnail, scaled to the box."""
+        sumber = None
+        if self._sumber_tampil is not None and self._sumber_tampil[0] == foto.path_lengkap:
+            if self._sumber_tampil[2] == ukuran_maks:
+                return
+            sumber = self._sumber_tampil[1]
+        elif self.tampilan_foto[self.index_foto_saat_ini] is foto:
+            sumber = self.filmstrip.thumbnail(self.index_foto_saat_ini)
+
+        if sumber is None:
+            self.gambar_tk.tampilkan_teks(f"Memuat {foto.nama_file}...")
+            return
+
+        rasio = min(ukuran_maks[0] / sumber.width, ukuran_maks[1] / sumber.height)
+        ukuran = (max(1, int(sumber.width * rasio)), max(1, int(sumber.height * rasio)))
+        self.gambar_tk.tampilkan(sumber.resize(ukuran, Image.BILINEAR))
+
+    def aksi_ubah_ukuran(self, event):
+        """Debounces window resizes into one re-render once the size has settled."""
+        self._ukuran_area = (event.width, event.height)
+        if self._after_resize is not None:
+            self.master.after_cancel(self._after_resize)
+        self._after_resize = self.master.after(self.RESIZE_MS, self.aksi_resize_tenang)
+
+    def aksi_resize_tenang(self):
+        self._after_resize = None
+        if self.tampilan_foto and self._sumber_tampil is not None \
+                and self._sumber_tampil[2] != self.hitung_ukuran_pratinjau():
+            self.tampilkan_gambar(self.tampilan_foto[self.index_foto_saat_ini])
+
+    def pilih_kualitas_pratinjau(self):
+        if self.kualitas_pratinjau != "otomatis":
+            return self.kualitas_pratinjau
+        return KUALITAS_CEPAT if self.sedang_scroll else KUALITAS_TINGGI
+
+    def jadwalkan_pratinjau_tenang(self):
+        """Re-renders the current photo in full quality once navigation has paused."""
+        if self._after_settle is not None:
+            self.master.after_cancel(self._after_settle)
+        self._after_settle = self.master.after(self.SETTLE_MS, self.aksi_pratinjau_tenang)
+
+    def aksi_pratinjau_tenang(self):
+        self._after_settle = None
+        if (time.monotonic() - self.waktu_navigasi_terakhir) * 1000 < self.SETTLE_MS:
+            self.jadwalkan_pratinjau_tenang()
+            return
+
+        self.sedang_scroll = False
+        if self.tampilan_foto:
+            self.tampilkan_gambar(self.tampilan_foto[self.index_foto_saat_ini], KUALITAS_TINGGI)
             
-            ttk.Label(frame_tag, text=tag, padding=3).pack(side=tk.LEFT, fill=tk.X, expand=True)
+    def hitung_ukuran_pratinjau(self):
+        """Returns the (width, height) box available for the preview image."""
+        if self._ukuran_area is not None:
+            lebar_area, tinggi_area = self._ukuran_area
+        else:
+            # Before the first <Configure> the geometry may not be computed yet.
+            self.frame_tengah.update_idletasks() 
+            lebar_area, tinggi_area = self.frame_tengah.winfo_width(), self.frame_tengah.winfo_height()
+        
+        CONTAINER_PADDING = 40
+        
+        max_width = lebar_area - CONTAINER_PADDING
+        max_height = tinggi_area - CONTAINER_PADDING - self.filmstrip.frame.winfo_height()
+        
+        if max_width < 100 or max_height < 100:
+            max_width = 640 
+            max_height = 700 
             
-            ttk.Button(frame_tag, 
-                       text="X", 
-                       width=3, 
-                       style='Danger.TButton',
-                       command=lambda t=tag: self.aksi_hapus_tag_foto(t)
-                       ).pack(side=tk.RIGHT)
+            if self.master.winfo_width() > 100:
+                 max_width = self.master.winfo_width() - 500 
+                 max_height = self.master.winfo_height() - 100 
+
+        return (max_width, max_height)
+
+    def prefetch_foto_tetangga(self, ukuran_maks, kualitas):
+        """Queues the photos around the cursor, the direction of travel first."""
+        total_foto = len(self.tampilan_foto)
+        urutan_index = []
+        for jarak in range(1, self.prefetch_radius + 1):
+            for arah in (self.arah_navigasi, -self.arah_navigasi):
+                index = self.index_foto_saat_ini + arah * jarak
+                if 0 <= index < total_foto:
+                    urutan_index.append(index)
+
+        self.prefetcher.prefetch([self.tampilan_foto[i].path_lengkap for i in urutan_index], ukuran_maks, kualitas)
+            
+    def perbarui_tampilan_tag_metadata(self, foto):
+        """Refreshes the applied Tag display in Metadata Info (Right Panel)."""
+        self.daftar_tag_metadata.perbarui(foto.tags)
 
     def aksi_hapus_tag_foto(self, tag_yang_dihapus):
         
-        if not self.koleksi_foto: return
+        if not self.tampilan_foto: return
 
-        foto_saat_ini = self.koleksi_foto[self.index_foto_saat_ini]
-        if foto_saat_ini.hapus_tag(tag_yang_dihapus):
-            self.recalculate_unique_collection_tags()
-            self.update_dropdown_photo_group()
-            self.tampilkan_foto_saat_ini()
+        foto_saat_ini = self.tampilan_foto[self.index_foto_saat_ini]
+        if self.koleksi_foto.hapus_tag(foto_saat_ini, tag_yang_dihapus):
+            self.segarkan_tag_tampilan()
             
+    def catat_navigasi(self, arah):
+        """Remembers the direction and pace of navigation for prefetch and quality choice."""
+        sekarang = time.monotonic()
+        self.sedang_scroll = (sekarang - self.waktu_navigasi_terakhir) * 1000 < self.SETTLE_MS
+        self.waktu_navigasi_terakhir = sekarang
+        self.arah_navigasi = arah
+
+    def aksi_klik_filmstrip(self, index, event):
+        """Plain click opens the photo; Shift-click selects a range, Ctrl-click toggles one."""
+        if event.state & 0x0001:
+            self.filmstrip.pilih_rentang(index)
+            self.update_label_pilihan()
+            return
+        if event.state & 0x0004:
+            self.filmstrip.balik_pilihan(index)
+            self.update_label_pilihan()
+            return
+
+        self.filmstrip.jangkar = index
+        if index != self.index_foto_saat_ini:
+            self.catat_navigasi(1 if index > self.index_foto_saat_ini else -1)
+            self.index_foto_saat_ini = index
+            self.tampilkan_foto_saat_ini()
+
     def sebelumnya(self):
         if self.index_foto_saat_ini > 0:
             self.index_foto_saat_ini -= 1
+            self.catat_navigasi(-1)
             self.tampilkan_foto_saat_ini()
         else:
             messagebox.showinfo("Navigasi", "Ini adalah foto pertama.")
 
     def selanjutnya(self):
-        if self.index_foto_saat_ini < len(self.koleksi_foto) - 1:
+        if self.index_foto_saat_ini < len(self.tampilan_foto) - 1:
             self.index_foto_saat_ini += 1
+            self.catat_navigasi(1)
             self.tampilkan_foto_saat_ini()
         else:
             messagebox.showinfo("Navigasi", "Ini adalah foto terakhir.")
@@ -0,0 +1,378 @@
+import io
+import math
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import ExifTags, Image
+
+from instrumen import hitung, rentang
+from metadata import baca_exif
+
+# ===============================================
+# PREVIEW LOADING, CACHE & BACKGROUND PREFETCH
+# ===============================================
+
+# Quality/speed trade-off: "cepat" while the user is scrolling, "tinggi" once the cursor settles.
+KUALITAS_CEPAT = "cepat"
+KUALITAS_TINGGI = "tinggi"
+
+RESAMPLE_KUALITAS = {
+    KUALITAS_CEPAT: Image.BILINEAR,
+    KUALITAS_TINGGI: Image.LANCZOS,
+}
+
+# How much larger than the target the image may stay before the cheap reduce()/DCT
+# scaling step hands over to the real resampling filter (see Image.thumbnail).
+REDUCING_GAP_KUALITAS = {
+    KUALITAS_CEPAT: 1.0,
+    KUALITAS_TINGGI: 2.0,
+}
+
+# Memory ceiling for decoding. Uncompressed TIFFs whose full-resolution pixels would
+# take more than BATAS_STREAM_TIFF are read BARIS_PITA rows at a time and shrunk band
+# by band; any other decode bigger than BATAS_DECODE_BESAR waits for the previous big
+# one to finish, so prefetch workers never hold two huge frames at once.
+BATAS_STREAM_TIFF = 32 * 1024 * 1024
+BATAS_DECODE_BESAR = 64 * 1024 * 1024
+BARIS_PITA = 256
+_decode_besar = threading.BoundedSemaphore(1)
+
+# Modes Image.reduce() handles, for the banded TIFF path.
+MODE_PITA = ("L", "RGB", "RGBA", "CMYK", "I", "F")
+
+TAG_JPEG_THUMBNAIL_OFFSET = 0x0201
+TAG_JPEG_THUMBNAIL_LENGTH = 0x0202
+TAG_ORIENTASI = 0x0112
+
+# EXIF orientation -> transpose that makes the pixels upright (as ImageOps.exif_transpose).
+TRANSPOSE_ORIENTASI = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def hitung_ukuran_muat(ukuran_asli, ukuran_maks):
+    """Size of ukuran_asli scaled down to fit ukuran_maks, keeping the aspect ratio."""
+    lebar_asli, tinggi_asli = ukuran_asli
+    max_width, max_height = ukuran_maks
+    rasio = min(max_width / lebar_asli, max_height / tinggi_asli, 1)
+    return (max(1, int(lebar_asli * rasio)), max(1, int(tinggi_asli * rasio)))
+
+
+def load_preview(path, ukuran_maks, kualitas=KUALITAS_TINGGI):
+    """Opens an image and downsizes it to fit inside ukuran_maks (never upscales), upright.
+
+    JPEGs are decoded straight at a reduced DCT scale (Image.draft) or served from the
+    embedded EXIF thumbnail when that is already large enough; large uncompressed
+    TIFFs are shrunk band by band (muat_tiff_per_pita); other formats go through
+    thumbnail() with reducing_gap. Multi-frame files (GIF, multi-page TIFF) only have
+    their first frame decoded. 16-bit, float, bilevel and palette images come back as
+    L, RGB or RGBA (ke_mode_tampil). The EXIF orientation is applied last, on the small
+    image. The file is closed before this returns, whatever the format.
+    """
+    resample = RESAMPLE_KUALITAS[kualitas]
+    reducing_gap = REDUCING_GAP_KUALITAS[kualitas]
+
+    with Image.open(path) as img_pil:
+        with rentang("preview.buka"):
+            orientasi = baca_exif(img_pil).get(TAG_ORIENTASI, 1)
+        # Rotated by 90 degrees: the stored image must fit the box turned on its side.
+        ukuran_maks = tuple(ukuran_maks)[::-1] if orientasi in (5, 6, 7, 8) else tuple(ukuran_maks)
+
+        if img_pil.format == "JPEG":
+            with rentang("preview.thumbnail_exif"):
+                thumb = muat_thumbnail_exif(img_pil, ukuran_maks)
+            if thumb is not None:
+                hitung("preview.thumbnail_exif_dipakai")
+                thumb.thumbnail(ukuran_maks, resample)
+                return terapkan_orientasi(thumb, orientasi)
+
+            lebar_target, tinggi_target = hitung_ukuran_muat(img_pil.size, ukuran_maks)
+            img_pil.draft(None, (int(lebar_target * reducing_gap), int(tinggi_target * reducing_gap)))
+
+        elif img_pil.format == "TIFF":
+            with rentang("preview.decode_pita"):
+                kecil = muat_tiff_per_pita(img_pil, ukuran_maks, reducing_gap)
+            if kecil is not None:
+                hitung("preview.tiff_per_pita")
+                kecil = ke_mode_tampil(kecil)
+                with rentang("preview.resize", kualitas=kualitas):
+                    kecil.thumbnail(ukuran_maks, resample)
+                    return terapkan_orientasi(kecil, orientasi)
+
+        # thumbnail() swaps the full-resolution buffer for the small one in place, so
+        # the big buffer is gone before the semaphore is released.
+        besar = ukuran_byte_gambar(img_pil) > BATAS_DECODE_BESAR
+        with _decode_besar if besar else nullcontext():
+            # load() is what thumbnail() would do first; done separately so decode and
+            # resize show up as their own spans.
+            with rentang("preview.decode", format=img_pil.format):
+                img_pil.load()
+                img_pil = ke_mode_tampil(img_pil)
+            with rentang("preview.resize", kualitas=kualitas):
+                img_pil.thumbnail(ukuran_maks, resample, reducing_gap=reducing_gap)
+        return terapkan_orientasi(img_pil, orientasi)
+
+
+def muat_tiff_per_pita(img_pil, ukuran_maks, reducing_gap):
+    """Shrinks an uncompressed TIFF without ever holding it at full resolution.
+
+    Rows are read straight from the strip data BARIS_PITA at a time, box-reduced by
+    the integer factor the target size allows and pasted into an image that factor
+    smaller, which is what reduce() on the whole image would give. Returns None when
+    the image is small, compressed (libtiff decodes those in one piece) or not laid
+    out as full-width strips; the caller then decodes it normally.
+    """
+    lebar, tinggi = img_pil.size
+    lebar_target, tinggi_target = hitung_ukuran_muat(img_pil.size, ukuran_maks)
+    faktor = int(min(lebar / lebar_target, tinggi / tinggi_target) / reducing_gap)
+    if faktor < 2 or img_pil.mode not in MODE_PITA or ukuran_byte_gambar(img_pil) < BATAS_STREAM_TIFF:
+        return None
+
+    strip = []
+    for nama_decoder, (x0, y0, x1, y1), offset, args in img_pil.tile:
+        args = (args, 0, 1) if isinstance(args, str) else tuple(args)
+        if nama_decoder != "raw" or x0 != 0 or x1 != lebar or args[2:3] not in ((), (1,)):
+            return None
+        strip.append((y0, y1, offset, args[0], args[1]))
+    strip.sort()
+    if not strip or strip[0][0] != 0 or strip[-1][1] != tinggi or len({s[3:] for s in strip}) != 1:
+        return None
+
+    rawmode, stride = strip[0][3:]
+    if not stride:
+        bit = img_pil.tag_v2.get(258, (8,))
+        jumlah_sampel = img_pil.tag_v2.get(277, len(bit))
+        bit_per_piksel = sum(bit) if len(bit) == jumlah_sampel else bit[0] * jumlah_sampel
+        stride = math.ceil(lebar * bit_per_piksel / 8)
+
+    baris_pita = max(faktor, BARIS_PITA // faktor * faktor)
+    hasil = Image.new(img_pil.mode, (math.ceil(lebar / faktor), math.ceil(tinggi / faktor)))
+    fp = img_pil.fp
+    for y in range(0, tinggi, baris_pita):
+        y_akhir = min(y + baris_pita, tinggi)
+        bagian = []
+        for y0, y1, offset, _, _ in strip:
+            awal, akhir = max(y, y0), min(y_akhir, y1)
+            if awal < akhir:
+                fp.seek(offset + (awal - y0) * stride)
+                bagian.append(fp.read((akhir - awal) * stride))
+        data = b"".join(bagian)
+        if len(data) < (y_akhir - y) * stride:
+            return None   # truncated file: let the normal decode report it
+        pita = Image.frombuffer(img_pil.mode, (lebar, y_akhir - y), data, "raw", rawmode, stride, 1)
+        hasil.paste(pita.reduce(faktor), (0, y // faktor))
+    return hasil
+
+
+def ke_mode_tampil(img_pil):
+    """img_pil in a mode that thumbnail() can resample and Tk can show.
+
+    16-bit grey (I;16*, which reduce() rejects) maps its full range onto 8-bit L; 32-bit
+    and float grey have no fixed range and are stretched to what is there. Bilevel
+    images become L, palette images RGB or RGBA. Other modes are returned as they are.
+    """
+    mode = img_pil.mode
+    if mode.startswith("I;16"):
+        return img_pil.convert("I").point(lambda v: v * (1 / 257)).convert("L")
+    if mode in ("I", "F"):
+        rendah, tinggi = img_pil.getextrema()
+        skala = 255 / (tinggi - rendah) if tinggi > rendah else 0
+        return img_pil.point(lambda v: (v - rendah) * skala).convert("L")
+    if mode == "1":
+        return img_pil.convert("L")
+    if mode in ("P", "PA"):
+        transparan = mode == "PA" or "transparency" in img_pil.info
+        return img_pil.convert("RGBA" if transparan else "RGB")
+    return img_pil
+
+
+def terapkan_orientasi(img_pil, orientasi):
+    """Returns img_pil turned upright according to its EXIF orientation value."""
+    transpose = TRANSPOSE_ORIENTASI.get(orientasi)
+    return img_pil if transpose is None else img_pil.transpose(transpose)
+
+
+def muat_thumbnail_exif(img_pil, ukuran_maks):
+    """Returns the embedded EXIF (IFD1) JPEG thumbnail if it can cover the target size, else None."""
+    exif_mentah = img_pil.info.get("exif")
+    if not exif_mentah:
+        return None
+
+    try:
+        ifd1 = img_pil.getexif().get_ifd(ExifTags.IFD.IFD1)
+        offset = ifd1.get(TAG_JPEG_THUMBNAIL_OFFSET)
+        panjang = ifd1.get(TAG_JPEG_THUMBNAIL_LENGTH)
+        if not offset or not panjang:
+            return None
+
+        if exif_mentah.startswith(b"Exif\x00\x00"):
+            exif_mentah = exif_mentah[6:]
+        with Image.open(io.BytesIO(exif_mentah[offset:offset + panjang])) as thumb:
+            # Too small, or letterboxed to a different aspect ratio than the original.
+            lebar_target, tinggi_target = hitung_ukuran_muat(img_pil.size, ukuran_maks)
+            if thumb.width < lebar_target or thumb.height < tinggi_target:
+                return None
+            if abs(thumb.width / thumb.height - img_pil.width / img_pil.height) > 0.01:
+                return None
+
+            thumb.load()
+            return thumb
+    except Exception:
+        return None
+
+
+def ukuran_byte_gambar(img):
+    """Memory used by a decoded PIL image. Pillow stores 1-bit, L and P pixels in one byte,
+    16-bit integer modes in two and everything else (RGB included) in four."""
+    if img.mode in ("1", "L", "P"):
+        byte_per_piksel = 1
+    elif img.mode.startswith("I;16"):
+        byte_per_piksel = 2
+    else:
+        byte_per_piksel = 4
+    return img.width * img.height * byte_per_piksel
+
+
+class PreviewCache:
+    """Thread-safe LRU cache of decoded previews, bounded by a memory budget in bytes."""
+    def __init__(self, batas_byte=256 * 1024 * 1024):
+        self.batas_byte = batas_byte
+        self.terpakai = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def buat_kunci(path, ukuran_maks, kualitas=KUALITAS_TINGGI):
+        """Cache key: (path, mtime, target size, quality). Raises OSError if the file is gone."""
+        return (path, os.stat(path).st_mtime_ns, tuple(ukuran_maks), kualitas)
+
+    def get(self, kunci):
+        with self._lock:
+            img = self._data.get(kunci)
+            if img is not None:
+                self._data.move_to_end(kunci)
+        hitung("preview.cache_hit" if img is not None else "preview.cache_miss")
+        return img
+
+    def put(self, kunci, img):
+        ukuran = ukuran_byte_gambar(img)
+        if ukuran > self.batas_byte:
+            return
+
+        with self._lock:
+            lama = self._data.pop(kunci, None)
+            if lama is not None:
+                self.terpakai -= ukuran_byte_gambar(lama)
+
+            self._data[kunci] = img
+            self.terpakai += ukuran
+
+            while self.terpakai > self.batas_byte:
+                _, dibuang = self._data.popitem(last=False)
+                self.terpakai -= ukuran_byte_gambar(dibuang)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.terpakai = 0
+
+    def __contains__(self, kunci):
+        with self._lock:
+            return kunci in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PreviewPrefetcher:
+    """Decodes and resizes upcoming photos on a thread pool so navigation is a cache hit."""
+    def __init__(self, cache, jumlah_worker=2, pemuat=load_preview):
+        self.cache = cache
+        # Callable (path, ukuran_maks, kualitas) -> PIL image; swapped for a persistent store.
+        self.pemuat = pemuat
+        self._executor = ThreadPoolExecutor(max_workers=jumlah_worker, thread_name_prefix="prefetch")
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def muat(self, path, ukuran_maks, kualitas=KUALITAS_TINGGI):
+        """Returns the preview for path, waiting on an in-flight prefetch or decoding it now."""
+        ukuran_maks = tuple(ukuran_maks)
+
+        with self._lock:
+            future = self._pending.get((path, ukuran_maks, kualitas))
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                # Cancelled, or failed: decode here so the caller gets the error itself.
+                pass
+
+        return self._muat_dan_simpan(path, ukuran_maks, kualitas)
+
+    def minta(self, path, ukuran_maks, kualitas=KUALITAS_TINGGI):
+        """Returns a future for the preview without blocking, ahead of any queued prefetch.
+
+        Queued work for other photos is dropped (it was for a position the user already
+        left); a decode that is already running finishes and lands in the cache.
+        """
+        kunci = (path, tuple(ukuran_maks), kualitas)
+
+        with self._lock:
+            for kunci_lain, future in list(self._pending.items()):
+                if kunci_lain != kunci and future.cancel():
+                    del self._pending[kunci_lain]
+
+            future = self._pending.get(kunci)
+            if future is None:
+                future = self._pending[kunci] = self._executor.submit(self._kerjakan, *kunci)
+        return future
+
+    def dari_cache(self, path, ukuran_maks, kualitas=KUALITAS_TINGGI):
+        """Returns the cached preview without decoding anything, or None."""
+        try:
+            return self.cache.get(PreviewCache.buat_kunci(path, ukuran_maks, kualitas))
+        except OSError:
+            return None
+
+    def prefetch(self, daftar_path, ukuran_maks, kualitas=KUALITAS_TINGGI):
+        """Queues previews for daftar_path (in priority order); stale queued work is dropped."""
+        ukuran_maks = tuple(ukuran_maks)
+        diminta = [(path, ukuran_maks, kualitas) for path in daftar_path]
+
+        with self._lock:
+            for kunci, future in list(self._pending.items()):
+                if kunci not in diminta and future.cancel():
+                    del self._pending[kunci]
+
+            for kunci in diminta:
+                if kunci in self._pending:
+                    continue
+                self._pending[kunci] = self._executor.submit(self._kerjakan, *kunci)
+
+    def _kerjakan(self, path, ukuran_maks, kualitas):
+        # A failed decode stays on the future for whoever displays the photo.
+        try:
+            return self._muat_dan_simpan(path, ukuran_maks, kualitas)
+        finally:
+            with self._lock:
+                self._pending.pop((path, ukuran_maks, kualitas), None)
+
+    def _muat_dan_simpan(self, path, ukuran_maks, kualitas):
+        kunci = PreviewCache.buat_kunci(path, ukuran_maks, kualitas)
+        img = self.cache.get(kunci)
+        if img is None:
+            img = self.pemuat(path, ukuran_maks, kualitas)
+            self.cache.put(kunci, img)
+        return img
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,202 @@
+import os
+import time
+
+from exporter import MODE_SALIN, ExportJob, folder_ekspor_kueri, folder_ekspor_tag
+from importer import pindai_folder
+from koleksi import Foto, KoleksiFoto, normalisasi_tag
+from kueri import MesinKueri, teks_kueri, urai_kueri
+from session_db import SesiDB
+from sinkron import bandingkan
+
+# ===============================================
+# HEADLESS COLLECTION API (NO TKINTER, NO PIL)
+# ===============================================
+
+# Scan options of PustakaFoto.impor (see importer.pindai_folder) and their defaults.
+OPSI_PINDAI_BAWAAN = {"kedalaman_maks": 0, "include": [], "exclude": [], "cek_magic": False}
+
+
+def lengkapi_opsi_pindai(*daftar_opsi):
+    """Merges scan options over OPSI_PINDAI_BAWAAN (later ones win), with the patterns as
+    lists, so options from the GUI, the CLI and the session compare equal."""
+    opsi = dict(OPSI_PINDAI_BAWAAN)
+    for lain in daftar_opsi:
+        opsi.update(lain or {})
+    opsi["include"], opsi["exclude"] = list(opsi["include"]), list(opsi["exclude"])
+    return opsi
+
+
+class HasilImpor:
+    """Outcome of PustakaFoto.impor.
+
+    ditambah and dihapus count photos added and removed; galat holds the (path, OSError)
+    of subfolders that could not be read. tertahan counts photos that were not found
+    but kept, because the scan was partial or its options differ from the session's.
+    """
+    def __init__(self, ditambah, dihapus, galat, tertahan, opsi):
+        self.ditambah = ditambah
+        self.dihapus = dihapus
+        self.galat = galat
+        self.tertahan = tertahan
+        self.opsi = opsi
+
+
+class PustakaFoto:
+    """One photo folder and its saved session, driven without a display.
+
+    The collection is restored from <folder>/.photomanager/session.sqlite, the same
+    session the GUI opens, so tags applied here show up there and the other way
+    round. Every change is persisted through the collection listener; call tutup()
+    (or use a with block) to flush it to disk.
+    """
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        if not os.path.isdir(self.folder):
+            # SesiDB would create it (and the sidecar) along the way.
+            raise FileNotFoundError(f"Folder tidak ditemukan: {folder}")
+        self.sesi = SesiDB(self.folder)
+        self.kriteria, tags_per_foto = self.sesi.muat()
+        skor_per_foto = self.sesi.muat_skor()
+
+        self.koleksi = KoleksiFoto()
+        for path in sorted(self.sesi.muat_daftar_foto()):
+            foto = Foto(os.path.basename(path), path, tags_per_foto.get(path, ()))
+            foto.skor = skor_per_foto.get(path)
+            self.koleksi.tambah_foto(foto)
+        # Registered after loading: the restored photos are in the session already.
+        self.koleksi.tambah_pengamat(self.sesi.pengamat_koleksi)
+        self.mesin_kueri = MesinKueri(self.koleksi)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
+
+    def tutup(self):
+        self.sesi.close()
+
+    # --- Import ---
+    def impor(self, hapus_hilang=False, **opsi_pindai):
+        """Scans the folder and adds new files and drops vanished ones; photos already
+        known keep their tags. Returns a HasilImpor.
+
+        opsi_pindai are the scan options of OPSI_PINDAI_BAWAAN; any left out are those
+        of the previous import, saved in the session. A photo that was not found is only
+        removed if the scan had the same options as that import: a narrower scan (say,
+        without subfolders) would otherwise drop everything outside it, tags and all.
+        hapus_hilang=True removes them anyway. The options are saved once an import
+        has been applied in full.
+        """
+        tersimpan = self.sesi.muat_pengaturan("opsi_pindai")
+        opsi = lengkapi_opsi_pindai(tersimpan, opsi_pindai)
+
+        hasil_pindai, galat = [], []
+        for batch in pindai_folder(self.folder, dengan_tanda=True, galat=galat, **opsi):
+            hasil_pindai.extend(batch)
+
+        per_path = {foto.path_lengkap: foto for foto in self.koleksi}
+        # The session does not store file stats, so only additions and removals are diffed.
+        perubahan = bandingkan(dict.fromkeys(per_path), hasil_pindai, [path for path, _ in galat])
+        for nama_file, path, tanda in sorted(perubahan.baru, key=lambda entri: entri[1]):
+            foto = Foto(nama_file, path)
+            foto.tanda = tanda
+            self.koleksi.tambah_foto(foto)
+
+        # A partial scan removes nothing (see bandingkan); neither does one whose scope may
+        # differ from the last import's, which is also unknown without saved options (a
+        # session started in the GUI).
+        if hapus_hilang or opsi == tersimpan:
+            dihapus = self.koleksi.hapus_foto_banyak(per_path[path] for path in perubahan.hilang)
+        else:
+            dihapus = []
+        terlihat = {path for _, path, _ in hasil_pindai}
+        tertahan = sum(1 for path in per_path if path not in terlihat) - len(dihapus)
+        if not galat and not tertahan:
+            self.sesi.simpan_pengaturan("opsi_pindai", opsi)
+        return HasilImpor(len(perubahan.baru), len(dihapus), galat, tertahan, opsi)
+
+    # --- Tags ---
+    def tambah_kriteria(self, tag):
+        tag = normalisasi_tag(tag)
+        if tag and tag not in self.kriteria:
+            self.kriteria.add(tag)
+            self.sesi.tambah_kriteria(tag)
+        return tag
+
+    def hapus_kriteria(self, tag):
+        """Drops a criteria tag and removes it from every photo (as in the GUI)."""
+        self.kriteria.discard(tag)
+        self.sesi.hapus_kriteria(tag)
+        return self.koleksi.hapus_tag_dari_semua(tag)
+
+    def tag_pola(self, pola, tag):
+        """Tags every photo whose name matches the glob pola; the tag becomes a criteria
+        tag so the GUI offers it. Returns the photos that changed."""
+        tag = self.tambah_kriteria(tag)
+        cocok = [self.koleksi[i] for i in self.koleksi.index_cocok_pola(pola)]
+        return self.koleksi.tambah_tag_banyak(cocok, tag)
+
+    def hapus_tag_pola(self, pola, tag):
+        """Removes tag from every photo whose name matches pola; returns those that changed."""
+        cocok = [self.koleksi[i] for i in self.koleksi.index_cocok_pola(pola)]
+        return self.koleksi.hapus_tag_banyak(cocok, normalisasi_tag(tag))
+
+    # --- Queries ---
+    def cari(self, kueri):
+        """Photos matching a tag expression such as 'Wedding AND NOT Rejected' (see
+        kueri.py), in collection order. Raises ValueError for an invalid expression."""
+        return self.mesin_kueri.hasil(kueri)
+
+    # --- Export ---
+    def ekspor(self, tag, lokasi_dasar, **opsi):
+        """Exports the photos tagged tag into <lokasi_dasar>/KOLEKSI_<TAG> and waits for it.
+
+        Options as _ekspor. Returns the exporter.LaporanEkspor, or None if no photo
+        carries the tag.
+        """
+        daftar_foto = self.koleksi.foto_dengan_tag(normalisasi_tag(tag))
+        return self._ekspor(daftar_foto, folder_ekspor_tag(lokasi_dasar, tag), **opsi)
+
+    def ekspor_kueri(self, kueri, lokasi_dasar, **opsi):
+        """Exports the photos matching a tag expression into
+        <lokasi_dasar>/KOLEKSI_<EXPRESSION>_<HASH> (see exporter.folder_ekspor_kueri).
+
+        Returns the exporter.LaporanEkspor, or None if nothing matches. Raises ValueError
+        for an invalid expression.
+        """
+        node = urai_kueri(kueri)
+        return self._ekspor(self.mesin_kueri.hasil(node), folder_ekspor_kueri(lokasi_dasar, teks_kueri(node)), **opsi)
+
+    def _ekspor(self, daftar_foto, folder_output, jumlah_worker=4, mode=MODE_SALIN, inkremental=True,
+                saat_progres=None, interval=0.2):
+        """Copies daftar_foto into folder_output and waits for it; saat_progres(done, total, eta)
+        is called every interval seconds."""
+        daftar_foto = [(foto.nama_file, foto.path_lengkap) for foto in daftar_foto]
+        if not daftar_foto:
+            return None
+
+        os.makedirs(folder_output, exist_ok=True)
+        job = ExportJob(daftar_foto, folder_output, jumlah_worker=jumlah_worker, mode=mode,
+                        inkremental=inkremental).mulai()
+        try:
+            while not job.selesai:
+                time.sleep(interval)
+                if saat_progres is not None:
+                    saat_progres(*job.progres())
+        except KeyboardInterrupt:
+            job.batalkan()
+            while not job.selesai:
+                time.sleep(interval)
+        return job.laporan
+
+    # --- Statistics ---
+    def statistik(self):
+        """Counts for reporting: photos, scored photos, criteria tags and photos per tag."""
+        return {
+            "folder": self.folder,
+            "jumlah_foto": len(self.koleksi),
+            "foto_dinilai": sum(1 for foto in self.koleksi if foto.skor is not None),
+            "kriteria": sorted(self.kriteria),
+            "tag": {tag: self.koleksi.jumlah_tag(tag) for tag in sorted(self.koleksi.tag_unik)},
+        }
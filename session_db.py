@@ -0,0 +1,244 @@
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from fileutil import NAMA_FOLDER_SIDECAR, folder_sidecar
+from koleksi import MetadataFoto
+
+# ===============================================
+# PERSISTENT TAGGING SESSION (SQLITE WAL, BATCHED WRITES)
+# ===============================================
+
+_SELESAI = object()
+
+# Seconds between retries of changes whose transaction failed.
+JEDA_ULANG = 2.0
+
+NAMA_DB = "session.sqlite"
+
+
+def ada_sesi(folder):
+    """True if folder has a saved session; unlike SesiDB, never creates the sidecar."""
+    return os.path.isfile(os.path.join(folder, NAMA_FOLDER_SIDECAR, NAMA_DB))
+
+
+class SesiDB:
+    """Photos, criteria tags and tag assignments of one folder, in <folder>/.photomanager.
+
+    Every change is queued and a background thread writes whatever accumulated during
+    interval_flush seconds in a single transaction, so tagging never waits on disk.
+    The database runs in WAL mode; a crash loses at most the last interval of work and
+    never leaves it inconsistent. Photos are stored relative to the folder, so the
+    session survives moving the folder as a whole.
+    """
+    def __init__(self, folder, interval_flush=0.25):
+        self.folder = folder
+        self.interval_flush = interval_flush
+        self.path_db = os.path.join(folder_sidecar(folder), NAMA_DB)
+        self._awalan = os.path.join(folder, "")
+
+        conn = self._buka_koneksi()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS foto (path TEXT PRIMARY KEY) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS kriteria (tag TEXT PRIMARY KEY) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS tag_foto ("
+            " path TEXT NOT NULL, tag TEXT NOT NULL, PRIMARY KEY (path, tag)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS tag_foto_tag ON tag_foto (tag);"
+            "CREATE TABLE IF NOT EXISTS skor_foto ("
+            " path TEXT PRIMARY KEY, ketajaman REAL, kliping REAL, kecerahan REAL) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS meta_foto ("
+            " path TEXT PRIMARY KEY, file_size INTEGER, mtime_ns INTEGER, waktu TEXT, kamera TEXT,"
+            " lensa TEXT, iso INTEGER, lebar INTEGER, tinggi INTEGER, orientasi INTEGER) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS pengaturan (kunci TEXT PRIMARY KEY, nilai TEXT) WITHOUT ROWID;"
+        )
+        conn.close()
+
+        # The last write error while changes are waiting to be retried, else None;
+        # polled by the UI, which cannot see the writer thread fail otherwise.
+        self.error = None
+        self.jumlah_tertunda = 0
+        self._antrian = queue.Queue()
+        self._thread = threading.Thread(target=self._jalankan, name="session-db", daemon=True)
+        self._thread.start()
+
+    def _buka_koneksi(self):
+        conn = sqlite3.connect(self.path_db)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _relatif(self, path_lengkap):
+        if path_lengkap.startswith(self._awalan):
+            return path_lengkap[len(self._awalan):]
+        return os.path.relpath(path_lengkap, self.folder)
+
+    # --- Reading ---
+    def muat(self):
+        """Returns (criteria tags, {path_lengkap: [tags]}) as last saved."""
+        conn = self._buka_koneksi()
+        try:
+            kriteria = {tag for (tag,) in conn.execute("SELECT tag FROM kriteria")}
+            tags_per_foto = {}
+            for path, tag in conn.execute("SELECT path, tag FROM tag_foto"):
+                tags_per_foto.setdefault(os.path.join(self.folder, path), []).append(tag)
+        finally:
+            conn.close()
+        return kriteria, tags_per_foto
+
+    def muat_daftar_foto(self):
+        """Returns the path_lengkap of every photo recorded in the session."""
+        conn = self._buka_koneksi()
+        try:
+            return [os.path.join(self.folder, path) for (path,) in conn.execute("SELECT path FROM foto")]
+        finally:
+            conn.close()
+
+    def muat_skor(self):
+        """Returns {path_lengkap: (sharpness, clipped fraction, brightness)} as last saved."""
+        conn = self._buka_koneksi()
+        try:
+            return {os.path.join(self.folder, path): (ketajaman, kliping, kecerahan)
+                    for path, ketajaman, kliping, kecerahan in conn.execute("SELECT * FROM skor_foto")}
+        finally:
+            conn.close()
+
+    def muat_meta(self):
+        """Returns {path_lengkap: ((size, mtime_ns), MetadataFoto)} as last saved.
+
+        (size, mtime_ns) is the file's stat at the time it was read; an entry whose file
+        no longer matches is stale.
+        """
+        conn = self._buka_koneksi()
+        try:
+            return {os.path.join(self.folder, baris[0]): ((baris[1], baris[2]), MetadataFoto(*baris[3:]))
+                    for baris in conn.execute("SELECT * FROM meta_foto")}
+        finally:
+            conn.close()
+
+    def muat_pengaturan(self, kunci):
+        """A value saved with simpan_pengaturan, or None."""
+        conn = self._buka_koneksi()
+        try:
+            baris = conn.execute("SELECT nilai FROM pengaturan WHERE kunci = ?", (kunci,)).fetchone()
+        finally:
+            conn.close()
+        return None if baris is None else json.loads(baris[0])
+
+    # --- Writing (queued) ---
+    def catat_foto(self, path_lengkap):
+        self._antrian.put(("INSERT OR IGNORE INTO foto VALUES (?)", (self._relatif(path_lengkap),)))
+
+    def hapus_foto(self, path_lengkap):
+        """Forgets a photo whose file is gone: its row, tags, score and metadata."""
+        path = self._relatif(path_lengkap)
+        for tabel in ("foto", "tag_foto", "skor_foto", "meta_foto"):
+            self._antrian.put((f"DELETE FROM {tabel} WHERE path = ?", (path,)))
+
+    def catat_tag(self, path_lengkap, tag):
+        self._antrian.put(("INSERT OR IGNORE INTO tag_foto VALUES (?, ?)", (self._relatif(path_lengkap), tag)))
+
+    def hapus_tag(self, path_lengkap, tag):
+        self._antrian.put(("DELETE FROM tag_foto WHERE path = ? AND tag = ?", (self._relatif(path_lengkap), tag)))
+
+    def hapus_tag_dari_semua(self, tag):
+        self._antrian.put(("DELETE FROM tag_foto WHERE tag = ?", (tag,)))
+
+    def tambah_kriteria(self, tag):
+        self._antrian.put(("INSERT OR IGNORE INTO kriteria VALUES (?)", (tag,)))
+
+    def hapus_kriteria(self, tag):
+        self._antrian.put(("DELETE FROM kriteria WHERE tag = ?", (tag,)))
+
+    def catat_skor(self, path_lengkap, skor):
+        self._antrian.put(("INSERT OR REPLACE INTO skor_foto VALUES (?, ?, ?, ?)", (self._relatif(path_lengkap),) + tuple(skor)))
+
+    def hapus_skor(self, path_lengkap):
+        """Drops the score of a file that was rewritten since it was scored."""
+        self._antrian.put(("DELETE FROM skor_foto WHERE path = ?", (self._relatif(path_lengkap),)))
+
+    def catat_meta(self, path_lengkap, kunci, meta):
+        """kunci is the file's (size, mtime_ns) when meta was read."""
+        self._antrian.put(("INSERT OR REPLACE INTO meta_foto VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (self._relatif(path_lengkap),) + tuple(kunci) + tuple(meta)))
+
+    def simpan_pengaturan(self, kunci, nilai):
+        """Stores a JSON-serializable setting of the session (e.g. the scan options)."""
+        self._antrian.put(("INSERT OR REPLACE INTO pengaturan VALUES (?, ?)", (kunci, json.dumps(nilai))))
+
+    def pengamat_koleksi(self, jenis, foto, tag):
+        """Listener for KoleksiFoto.tambah_pengamat: mirrors collection changes."""
+        if jenis == "foto+":
+            self.catat_foto(foto.path_lengkap)
+        elif jenis == "foto-":
+            self.hapus_foto(foto.path_lengkap)
+        elif jenis == "tag+":
+            self.catat_tag(foto.path_lengkap, tag)
+        elif jenis == "tag-":
+            self.hapus_tag(foto.path_lengkap, tag)
+        elif jenis == "tag-semua":
+            self.hapus_tag_dari_semua(tag)
+
+    def _jalankan(self):
+        conn = None
+        tertunda = []   # changes of a failed transaction, retried ahead of newer ones
+        berhenti = False
+
+        while not berhenti:
+            try:
+                batch = [self._antrian.get(timeout=JEDA_ULANG if tertunda else None)]
+            except queue.Empty:
+                batch = []
+            if batch and batch[0] is not _SELESAI:
+                # Let changes pile up, then take them all in one go.
+                time.sleep(self.interval_flush)
+            while True:
+                try:
+                    batch.append(self._antrian.get_nowait())
+                except queue.Empty:
+                    break
+
+            berhenti = _SELESAI in batch
+            perintah = tertunda + [op for op in batch if op is not _SELESAI]
+            try:
+                if conn is None:
+                    conn = self._buka_koneksi()
+                with conn:
+                    # Consecutive changes of the same kind go through one executemany.
+                    for sql, grup in itertools.groupby(perintah, key=lambda op: op[0]):
+                        conn.executemany(sql, [parameter for _, parameter in grup])
+                tertunda = []
+                self.error = None
+            except Exception as e:
+                # Nothing is dropped: the transaction rolled back, so the same changes
+                # are retried on a fresh connection (locked or full disk, lost file).
+                # Anything else is kept and retried too, so the thread never dies
+                # silently and the GUI keeps showing the error.
+                tertunda = perintah
+                self.error = e
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                    conn = None
+            finally:
+                self.jumlah_tertunda = len(tertunda)
+                for _ in batch:
+                    self._antrian.task_done()
+
+        if conn is not None:
+            conn.close()
+
+    def flush(self):
+        """Blocks until every queued change has been written, or has failed and waits
+        for a retry (see error)."""
+        self._antrian.join()
+
+    def close(self):
+        """Writes what is queued and stops the writer; changes still failing are lost."""
+        self._antrian.put(_SELESAI)
+        self._thread.join()
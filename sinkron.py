@@ -0,0 +1,110 @@
+import os
+import threading
+from collections import namedtuple
+
+from importer import pindai_folder
+
+# ===============================================
+# INCREMENTAL FOLDER SYNC (DIFF BY INODE, SIZE, MTIME)
+# ===============================================
+
+# baru: [(nama_file, path_lengkap, tanda)] not in the collection yet
+# hilang: [path_lengkap] no longer on disk
+# berubah: [(path_lengkap, tanda)] same path, different size/mtime/inode (rewritten)
+# pindah: [(path_lama, nama_file, path_baru, tanda)] renamed/moved within the folder
+PerubahanFolder = namedtuple("PerubahanFolder", "baru hilang berubah pindah")
+
+
+def di_bawah(path, daftar_folder):
+    """True if path is one of daftar_folder or lies inside one of them."""
+    return any(path == folder or path.startswith(os.path.join(folder, "")) for folder in daftar_folder)
+
+
+def bandingkan(dikenal, hasil_pindai, tidak_terbaca=()):
+    """Diffs a scan against the known files.
+
+    dikenal is {path_lengkap: tanda} of the collection, hasil_pindai the scanned
+    (nama_file, path_lengkap, tanda) entries. A file that disappeared while another
+    path appeared with the same (inode, size, mtime) was moved, not deleted and added.
+
+    tidak_terbaca lists the paths the scan could not read (pindai_folder's galat).
+    Such a scan is partial, so nothing is reported as hilang; a file found elsewhere
+    only counts as moved if its old path was readable, else it is reported as new.
+    """
+    terlihat = set()
+    baru, berubah = [], []
+    for nama_file, path, tanda in hasil_pindai:
+        terlihat.add(path)
+        if path not in dikenal:
+            baru.append((nama_file, path, tanda))
+        elif dikenal[path] is not None and dikenal[path] != tanda:
+            berubah.append((path, tanda))
+
+    hilang_per_tanda = {dikenal[path]: path for path in dikenal
+                        if path not in terlihat and dikenal[path] is not None
+                        and not di_bawah(path, tidak_terbaca)}
+    hilang = [path for path in dikenal if path not in terlihat]
+
+    pindah, tetap_baru = [], []
+    for nama_file, path, tanda in baru:
+        path_lama = hilang_per_tanda.pop(tanda, None)
+        if path_lama is not None:
+            pindah.append((path_lama, nama_file, path, tanda))
+        else:
+            tetap_baru.append((nama_file, path, tanda))
+
+    if tidak_terbaca:
+        hilang = []
+    else:
+        dipindah = {path_lama for path_lama, _, _, _ in pindah}
+        hilang = [path for path in hilang if path not in dipindah]
+    return PerubahanFolder(tetap_baru, hilang, berubah, pindah)
+
+
+class SinkronFolder:
+    """Re-scans a folder on a background thread and diffs it against the collection.
+
+    dikenal is a {path_lengkap: tanda} snapshot taken on the Tk thread. When selesai,
+    perubahan holds the PerubahanFolder, or stays None if the scan failed or was
+    cancelled (a partial scan would report every unseen file as deleted). Subfolders
+    that could not be read are in galat; the scan is then sebagian and perubahan
+    removes nothing (see bandingkan).
+    """
+    def __init__(self, folder_path, dikenal, **opsi_pindai):
+        self.folder_path = folder_path
+        self.dikenal = dikenal
+        self.opsi_pindai = opsi_pindai
+        self.batal = threading.Event()
+        self.perubahan = None
+        self.error = None
+        self.galat = []
+        self.selesai = False
+        self._thread = threading.Thread(target=self._jalankan, name="sinkron", daemon=True)
+
+    def mulai(self):
+        self._thread.start()
+        return self
+
+    def batalkan(self):
+        self.batal.set()
+
+    @property
+    def dibatalkan(self):
+        return self.batal.is_set()
+
+    @property
+    def sebagian(self):
+        return bool(self.galat)
+
+    def _jalankan(self):
+        try:
+            hasil_pindai = []
+            for batch in pindai_folder(self.folder_path, batal=self.batal, dengan_tanda=True, galat=self.galat,
+                                       **self.opsi_pindai):
+                hasil_pindai.extend(batch)
+            if not self.dibatalkan:
+                self.perubahan = bandingkan(self.dikenal, hasil_pindai, [path for path, _ in self.galat])
+        except Exception as e:
+            self.error = e
+        finally:
+            self.selesai = True
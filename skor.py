@@ -0,0 +1,147 @@
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from paralel import petakan_per_chunk
+
+# ===============================================
+# SHARPNESS & EXPOSURE SCORING (CULLING)
+# ===============================================
+
+# Scores are computed on a grayscale decode whose longest edge is about this long, so
+# sharpness values are comparable between photos of different resolutions.
+UKURAN_ANALISIS = 512
+
+# Pixel values at or beyond these count as clipped shadows / highlights.
+BATAS_GELAP = 2
+BATAS_TERANG = 253
+
+# "Bad exposure": more than this fraction of clipped pixels, or mean brightness outside.
+BATAS_KLIPING = 0.05
+RENTANG_KECERAHAN = (0.15, 0.85)
+
+# Review orders offered in the UI (see urutan_tinjau).
+MODE_URUTAN_FOLDER = "Urutan folder"
+MODE_TAJAM_DULU = "Tertajam dulu"
+MODE_TAJAM_20 = "Hanya 20% tertajam"
+MODE_BURAM_DULU = "Terburam dulu"
+MODE_EKSPOSUR_BURUK = "Eksposur bermasalah"
+MODE_TINJAU = (MODE_URUTAN_FOLDER, MODE_TAJAM_DULU, MODE_TAJAM_20, MODE_BURAM_DULU, MODE_EKSPOSUR_BURUK)
+
+
+def skor_gambar(path):
+    """Returns (sharpness, clipped fraction, mean brightness 0..1) of the image at path.
+
+    Sharpness is the variance of the Laplacian: blurred or shaken frames have few
+    strong edges and score low.
+    """
+    with Image.open(path) as img:
+        img.draft("L", (UKURAN_ANALISIS, UKURAN_ANALISIS))
+        abu = img.convert("L")
+    abu.thumbnail((UKURAN_ANALISIS, UKURAN_ANALISIS), Image.BILINEAR)
+
+    piksel = np.asarray(abu, dtype=np.float32)
+    laplacian = (piksel[1:-1, :-2] + piksel[1:-1, 2:] + piksel[:-2, 1:-1] + piksel[2:, 1:-1]
+                 - 4 * piksel[1:-1, 1:-1])
+    ketajaman = float(laplacian.var()) if laplacian.size else 0.0
+
+    histogram = np.bincount(np.asarray(abu).ravel(), minlength=256)
+    total = histogram.sum()
+    kliping = float((histogram[:BATAS_GELAP + 1].sum() + histogram[BATAS_TERANG:].sum()) / total)
+    kecerahan = float(histogram @ np.arange(256) / (total * 255))
+
+    return ketajaman, kliping, kecerahan
+
+
+def _skor_chunk(daftar_path):
+    """Worker-process entry point: scores for a chunk of paths (None where decoding fails)."""
+    hasil = []
+    for path in daftar_path:
+        try:
+            hasil.append(skor_gambar(path))
+        except Exception:
+            hasil.append(None)
+    return hasil
+
+
+def eksposur_buruk(skor):
+    _, kliping, kecerahan = skor
+    return kliping > BATAS_KLIPING or not RENTANG_KECERAHAN[0] <= kecerahan <= RENTANG_KECERAHAN[1]
+
+
+def urutan_tinjau(daftar_skor, mode):
+    """Positions into daftar_skor in the review order of mode, or None for collection order.
+
+    daftar_skor[i] is the score of photo i or None if it has none yet. Sorting modes put
+    unscored photos last; filtering modes leave them out.
+    """
+    if mode == MODE_URUTAN_FOLDER:
+        return None
+
+    ternilai = [i for i, skor in enumerate(daftar_skor) if skor is not None]
+    belum = [i for i, skor in enumerate(daftar_skor) if skor is None]
+    ketajaman = lambda i: daftar_skor[i][0]
+
+    if mode == MODE_TAJAM_DULU:
+        return sorted(ternilai, key=ketajaman, reverse=True) + belum
+    if mode == MODE_BURAM_DULU:
+        return sorted(ternilai, key=ketajaman) + belum
+    if mode == MODE_TAJAM_20:
+        teratas = sorted(ternilai, key=ketajaman, reverse=True)[:max(1, len(ternilai) // 5)] if ternilai else []
+        return sorted(teratas)
+    if mode == MODE_EKSPOSUR_BURUK:
+        return [i for i in ternilai if eksposur_buruk(daftar_skor[i])]
+    raise ValueError(f"Unknown review mode: {mode}")
+
+
+class PenilaianFoto:
+    """Scores photos in a process pool, off the Tk thread.
+
+    skor[i] ends up as the score of daftar_path[i] (None if it couldn't be read).
+    Same progres()/batalkan()/selesai interface as duplikat.AnalisisDuplikat.
+    """
+    def __init__(self, daftar_path, jumlah_proses=None):
+        self.daftar_path = list(daftar_path)
+        self.jumlah_proses = jumlah_proses or os.cpu_count() or 1
+        self.skor = [None] * len(self.daftar_path)
+        self.jumlah_gagal = 0
+        self.error = None
+        self.batal = threading.Event()
+        self.selesai = False
+
+        self._jumlah_selesai = 0
+        self._thread = threading.Thread(target=self._jalankan, name="penilaian-foto", daemon=True)
+
+    @property
+    def total(self):
+        return len(self.daftar_path)
+
+    def mulai(self):
+        self._thread.start()
+        return self
+
+    def batalkan(self):
+        self.batal.set()
+
+    @property
+    def dibatalkan(self):
+        return self.batal.is_set()
+
+    def progres(self):
+        """Returns (photos scored, total photos)."""
+        return self._jumlah_selesai, self.total
+
+    def _jalankan(self):
+        def simpan(awal, hasil):
+            self.skor[awal:awal + len(hasil)] = hasil
+            self.jumlah_gagal += hasil.count(None)
+            self._jumlah_selesai += len(hasil)
+
+        try:
+            petakan_per_chunk(_skor_chunk, self.daftar_path, self.jumlah_proses, self.batal, simpan)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.selesai = True
@@ -0,0 +1,174 @@
+import io
+import os
+import sqlite3
+import threading
+import time
+
+from PIL import Image
+
+from fileutil import folder_sidecar, hash_konten
+from instrumen import diukur, hitung
+from preview import KUALITAS_TINGGI, RESAMPLE_KUALITAS, load_preview
+
+# ===============================================
+# PERSISTENT THUMBNAIL STORE (SIDECAR SQLITE FILE)
+# ===============================================
+
+# Fixed thumbnail sizes (longest edge, in pixels). A request is served from the
+# smallest size that covers it, so a 700px preview comes from the 1024 entry.
+UKURAN_THUMBNAIL = (256, 1024, 2048)
+
+KUALITAS_JPEG_THUMBNAIL = 88
+
+# Bumped when stored thumbnails must be regenerated (1: EXIF orientation applied).
+VERSI_SKEMA = 1
+
+# Access times of hits are written in one transaction once this many are pending
+# (and before every put, GC and close), not one commit per read.
+BATAS_AKSES_TERTUNDA = 256
+
+
+class ThumbnailStore:
+    """Thumbnails of several fixed sizes kept in one SQLite file, with a size cap and LRU GC.
+
+    Entries are validated against (file size, mtime) or, with pakai_hash=True, keyed
+    by a content hash so renamed or touched-but-identical files still hit.
+    """
+    def __init__(self, folder, batas_byte=512 * 1024 * 1024, pakai_hash=False):
+        self.batas_byte = batas_byte
+        self.pakai_hash = pakai_hash
+        self.path_db = os.path.join(folder_sidecar(folder), "thumbs.sqlite")
+
+        self._lock = threading.Lock()
+        self._akses_tertunda = {}   # rowid -> access time not yet written
+        self._conn = sqlite3.connect(self.path_db, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS thumbs ("
+            " path TEXT NOT NULL, ukuran INTEGER NOT NULL,"
+            " file_size INTEGER, mtime_ns INTEGER, hash TEXT,"
+            " data BLOB NOT NULL, nbytes INTEGER NOT NULL, akses REAL NOT NULL,"
+            " PRIMARY KEY (path, ukuran))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS thumbs_hash ON thumbs (hash, ukuran)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS thumbs_akses ON thumbs (akses)")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < VERSI_SKEMA:
+            self._conn.execute("DELETE FROM thumbs")
+            self._conn.execute(f"PRAGMA user_version = {VERSI_SKEMA}")
+        self._conn.commit()
+
+        self.terpakai = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM thumbs").fetchone()[0]
+
+    @staticmethod
+    def pilih_ukuran(ukuran_maks):
+        """Smallest fixed thumbnail size that covers the (width, height) box."""
+        sisi_terpanjang = max(ukuran_maks)
+        for ukuran in UKURAN_THUMBNAIL:
+            if ukuran >= sisi_terpanjang:
+                return ukuran
+        return UKURAN_THUMBNAIL[-1]
+
+    @diukur("thumbstore.get")
+    def get(self, path, ukuran):
+        """Returns the stored thumbnail as a PIL image, or None if missing or stale."""
+        st = os.stat(path)
+        # Hashing reads the whole file: keep it outside the lock so other readers wait
+        # on SQLite only.
+        digest = hash_konten(path) if self.pakai_hash else None
+
+        with self._lock:
+            if self.pakai_hash:
+                baris = self._conn.execute(
+                    "SELECT rowid, data FROM thumbs WHERE hash = ? AND ukuran = ?", (digest, ukuran)
+                ).fetchone()
+            else:
+                baris = self._conn.execute(
+                    "SELECT rowid, data FROM thumbs WHERE path = ? AND ukuran = ? AND file_size = ? AND mtime_ns = ?",
+                    (path, ukuran, st.st_size, st.st_mtime_ns)
+                ).fetchone()
+
+            if baris is None:
+                return None
+
+            self._akses_tertunda[baris[0]] = time.time()
+            if len(self._akses_tertunda) >= BATAS_AKSES_TERTUNDA:
+                self._tulis_akses()
+                self._conn.commit()
+
+        img = Image.open(io.BytesIO(baris[1]))
+        img.load()
+        return img
+
+    @diukur("thumbstore.put")
+    def put(self, path, ukuran, img):
+        st = os.stat(path)
+        digest = hash_konten(path) if self.pakai_hash else None
+
+        buffer = io.BytesIO()
+        img.convert("RGB").save(buffer, "JPEG", quality=KUALITAS_JPEG_THUMBNAIL)
+        data = buffer.getvalue()
+
+        with self._lock:
+            self._tulis_akses()
+            lama = self._conn.execute(
+                "SELECT nbytes FROM thumbs WHERE path = ? AND ukuran = ?", (path, ukuran)
+            ).fetchone()
+            if lama is not None:
+                self.terpakai -= lama[0]
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, ukuran, st.st_size, st.st_mtime_ns, digest, data, len(data), time.time())
+            )
+            self.terpakai += len(data)
+
+            if self.terpakai > self.batas_byte:
+                self._gc()
+            self._conn.commit()
+
+    def _tulis_akses(self):
+        """Writes the pending access times (the caller holds the lock and commits)."""
+        if self._akses_tertunda:
+            self._conn.executemany(
+                "UPDATE thumbs SET akses = ? WHERE rowid = ?",
+                [(akses, rowid) for rowid, akses in self._akses_tertunda.items()]
+            )
+            self._akses_tertunda.clear()
+
+    def _gc(self):
+        """Deletes least recently used entries until the store is 10% under its cap."""
+        target = self.batas_byte * 0.9
+        baris_baris = self._conn.execute("SELECT rowid, nbytes FROM thumbs ORDER BY akses").fetchall()
+
+        dihapus = []
+        for rowid, nbytes in baris_baris:
+            if self.terpakai <= target:
+                break
+            dihapus.append((rowid,))
+            self.terpakai -= nbytes
+
+        self._conn.executemany("DELETE FROM thumbs WHERE rowid = ?", dihapus)
+
+    def muat_pratinjau(self, path, ukuran_maks, kualitas=KUALITAS_TINGGI):
+        """Drop-in replacement for preview.load_preview that reads/fills the store."""
+        ukuran = self.pilih_ukuran(ukuran_maks)
+
+        img = self.get(path, ukuran)
+        hitung("thumbstore.hit" if img is not None else "thumbstore.miss")
+        if img is None:
+            img = load_preview(path, (ukuran, ukuran), KUALITAS_TINGGI)
+            self.put(path, ukuran, img)
+
+        img.thumbnail(tuple(ukuran_maks), RESAMPLE_KUALITAS[kualitas])
+        return img
+
+    def close(self):
+        with self._lock:
+            try:
+                self._tulis_akses()
+                self._conn.commit()
+            except sqlite3.Error:
+                # Only LRU order is lost.
+                pass
+            self._conn.close()